@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark and parity check for the resume section parser
+Run this from the backend directory: python benchmarks/bench_parsing.py [iterations]
+
+Compares resumes.parsing with the original parser, kept verbatim below, on
+the fixture corpus in benchmarks/fixtures/resumes and on resumes shuffled
+together from its lines. Any difference in output is printed and makes the
+script exit with status 1.
+"""
+
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resumes.parsing import SECTION_KEYWORDS, match_section_header, parse_resume_sections
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'resumes')
+REPEATS = 5
+SHUFFLED = 2000
+
+
+# The parser before precompiled patterns, unchanged apart from the legacy_ prefix
+
+def legacy_match_section_header(line):
+    """Return the section a header line introduces, or None if it is not a header"""
+    for section, keywords in SECTION_KEYWORDS.items():
+        if any(keyword in line.lower() for keyword in keywords) and (line.isupper() or line.startswith('**') or len(line.split()) <= 3):
+            return section
+    return None
+
+
+def legacy_parse_resume_sections(lines):
+    """Parse resume text into structured sections"""
+    sections = {}
+    current_section = None
+    current_content = []
+
+    name_found = False
+    contact_info = []
+
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+
+        # First non-empty line is likely the name
+        if not name_found and line and not any(keyword in line.lower() for keywords in SECTION_KEYWORDS.values() for keyword in keywords):
+            sections['name'] = line
+            name_found = True
+            continue
+
+        # Detect contact information (email, phone, address)
+        if not current_section and (
+            '@' in line or
+            any(char.isdigit() for char in line) and ('(' in line or '-' in line) or
+            any(word in line.lower() for word in ['street', 'ave', 'rd', 'blvd', 'city', 'state'])
+        ):
+            contact_info.append(line)
+            continue
+
+        # Detect section headers
+        section = legacy_match_section_header(line)
+        if section:
+            # Save previous section
+            if current_section and current_content:
+                sections[current_section] = _legacy_process_section_content(current_section, current_content)
+
+            current_section = section
+            current_content = []
+        else:
+            if current_section:
+                current_content.append(line)
+            elif contact_info:
+                # If we have contact info, this might be additional contact details
+                if len(contact_info) < 3:  # Limit contact info lines
+                    contact_info.append(line)
+
+    # Save the last section
+    if current_section and current_content:
+        sections[current_section] = _legacy_process_section_content(current_section, current_content)
+
+    # Add contact info if found
+    if contact_info:
+        sections['contact'] = contact_info
+
+    return sections
+
+
+def _legacy_process_section_content(section_type, content):
+    """Process content based on section type"""
+    if section_type == 'experience':
+        return legacy_parse_experience_entries(content)
+    elif section_type == 'education':
+        return legacy_parse_education_entries(content)
+    elif section_type == 'projects':
+        return legacy_parse_project_entries(content)
+    elif section_type == 'skills':
+        # Join skills and split by common delimiters
+        skills_text = ' '.join(content)
+        skills = [skill.strip() for skill in skills_text.replace('•', ',').replace('-', ',').split(',') if skill.strip()]
+        return skills
+    else:
+        # For summary and other sections, return as list
+        return content
+
+
+def legacy_parse_experience_entries(content):
+    """Parse experience section into structured entries"""
+    entries = []
+    current_entry = {}
+
+    for line in content:
+        # Check if line contains job title and company (usually bold or structured)
+        if '|' in line or (' at ' in line and not line.startswith('•') and not line.startswith('-')):
+            # Save previous entry
+            if current_entry:
+                entries.append(current_entry)
+
+            # Parse new entry
+            current_entry = {}
+            parts = line.split('|') if '|' in line else line.split(' at ')
+            current_entry['title'] = parts[0].strip()
+            if len(parts) > 1:
+                company_and_date = parts[1].strip()
+                # Try to extract dates (look for years)
+                import re
+                date_pattern = r'\d{4}[-–]\d{4}|\d{4}[-–]Present|Present|\d{4}'
+                dates = re.findall(date_pattern, company_and_date)
+                if dates:
+                    current_entry['dates'] = dates[0]
+                    current_entry['company'] = re.sub(date_pattern, '', company_and_date).strip(' |-')
+                else:
+                    current_entry['company'] = company_and_date
+        elif line.startswith('•') or line.startswith('-') or line.startswith('*'):
+            # Bullet point - add to current entry description
+            if 'description' not in current_entry:
+                current_entry['description'] = []
+            bullet_text = line.lstrip('•-* ').strip()
+            if bullet_text:
+                current_entry['description'].append(bullet_text)
+        elif current_entry and not line.strip().isupper():
+            # Continuation of description or additional info
+            if 'description' not in current_entry:
+                current_entry['description'] = []
+            current_entry['description'].append(line)
+
+    # Add last entry
+    if current_entry:
+        entries.append(current_entry)
+
+    return entries
+
+
+def legacy_parse_education_entries(content):
+    """Parse education section"""
+    entries = []
+    for line in content:
+        if line and not line.startswith('•'):
+            entry = {}
+            # Try to parse degree | school | year format
+            if '|' in line:
+                parts = [part.strip() for part in line.split('|')]
+                entry['degree'] = parts[0]
+                if len(parts) > 1:
+                    entry['school'] = parts[1]
+                if len(parts) > 2:
+                    entry['year'] = parts[2]
+            else:
+                entry['degree'] = line
+            entries.append(entry)
+    return entries
+
+
+def legacy_parse_project_entries(content):
+    """Parse projects section"""
+    entries = []
+    current_project = {}
+
+    for line in content:
+        if not line.startswith('•') and not line.startswith('-') and line:
+            # New project
+            if current_project:
+                entries.append(current_project)
+            current_project = {'name': line, 'description': []}
+        elif (line.startswith('•') or line.startswith('-')) and current_project:
+            # Project description
+            desc = line.lstrip('•- ').strip()
+            if desc:
+                current_project['description'].append(desc)
+
+    if current_project:
+        entries.append(current_project)
+
+    return entries
+
+
+def load_corpus():
+    """(name, lines) for every fixture, stripped the way pdf.render_resume_pdf strips them"""
+    corpus = []
+    for filename in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, filename), encoding='utf-8') as handle:
+            corpus.append((filename, [line.strip() for line in handle.read().split('\n')]))
+    return corpus
+
+
+def shuffled_corpus(corpus, count, seed=0):
+    """Resumes assembled from random runs of fixture lines, to reach states the fixtures do not"""
+    rng = random.Random(seed)
+    pool = [line for _, lines in corpus for line in lines]
+    resumes = []
+    for _ in range(count):
+        start = rng.randrange(len(pool))
+        lines = pool[start:start + rng.randint(5, 40)]
+        if rng.random() < 0.5:
+            rng.shuffle(lines)
+        resumes.append(lines)
+    return resumes
+
+
+def timed(fn, resumes, iterations):
+    """Best wall-clock time of REPEATS runs of fn over every resume, iterations times"""
+    best = None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for lines in resumes:
+                fn(lines)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = load_corpus()
+    mismatches = 0
+
+    print("Parity on fixtures")
+    for name, lines in corpus:
+        same = parse_resume_sections(lines) == legacy_parse_resume_sections(lines)
+        mismatches += not same
+        print(f"  {name:<32} {'ok' if same else 'DIFFERENT'}")
+
+    shuffled = shuffled_corpus(corpus, SHUFFLED)
+    different = [lines for lines in shuffled if parse_resume_sections(lines) != legacy_parse_resume_sections(lines)]
+    mismatches += len(different)
+    print(f"  {SHUFFLED} shuffled resumes{'':<11} {len(different)} different")
+    for lines in different[:3]:
+        print('   ', lines)
+
+    headers = sorted({line for _, lines in corpus for line in lines})
+    different = [line for line in headers if match_section_header(line) != legacy_match_section_header(line)]
+    mismatches += len(different)
+    print(f"  {len(headers)} lines as headers{'':<11} {len(different)} different {different[:3]}")
+
+    line_count = sum(len(lines) for _, lines in corpus)
+    print(f"\nParsing the {len(corpus)} fixtures ({line_count} lines) {iterations} times, best of {REPEATS}")
+    print(f"{'parser':<12} {'total ms':>9} {'us/line':>8}")
+    resumes = [lines for _, lines in corpus]
+    results = {}
+    for label, fn in (('original', legacy_parse_resume_sections), ('precompiled', parse_resume_sections)):
+        elapsed = timed(fn, resumes, iterations)
+        results[label] = elapsed
+        print(f"{label:<12} {elapsed * 1000:>9.1f} {elapsed / (iterations * line_count) * 1e6:>8.2f}")
+    print(f"speedup {results['original'] / results['precompiled']:.1f}x")
+
+    if mismatches:
+        print(f"\n{mismatches} parity failure(s)")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+"""
+Celery application for resumebuilder.
+
+Only needed when TAILORING_TASK_BACKEND is 'celery'. Start a worker with:
+    celery -A resumebuilder worker -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'resumebuilder.settings')
+
+app = Celery('resumebuilder')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 from decouple import config
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -187,13 +188,118 @@ CORS_ALLOWED_HEADERS = [
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 ANTHROPIC_API_KEY = config('ANTHROPIC_API_KEY', default='')
 
+# Cache used for cross-process coordination (single-flight locks). Per-process
+# memory by default; set CACHE_REDIS_URL to share it between workers.
+CACHE_REDIS_URL = config('CACHE_REDIS_URL', default='')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds an identical tailoring request waits on one already in flight
+TAILORING_SINGLE_FLIGHT_TIMEOUT = config('TAILORING_SINGLE_FLIGHT_TIMEOUT', default=180, cast=int)
+
+# Generate Summary, Skills, Experience and Projects as separate concurrent model calls
+TAILORING_SECTION_MODE = config('TAILORING_SECTION_MODE', default=False, cast=bool)
+# Ask for a schema-constrained JSON resume and render it without re-parsing text (ignored in section mode)
+TAILORING_STRUCTURED_OUTPUT = config('TAILORING_STRUCTURED_OUTPUT', default=False, cast=bool)
+
+# Shared HTTP connection pool for LLM calls (timeouts and keep-alive expiry in seconds)
+LLM_HTTP_MAX_CONNECTIONS = config('LLM_HTTP_MAX_CONNECTIONS', default=20, cast=int)
+LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS = config('LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS', default=10, cast=int)
+LLM_HTTP_KEEPALIVE_EXPIRY = config('LLM_HTTP_KEEPALIVE_EXPIRY', default=30.0, cast=float)
+LLM_HTTP_TIMEOUT = config('LLM_HTTP_TIMEOUT', default=120.0, cast=float)
+LLM_HTTP_CONNECT_TIMEOUT = config('LLM_HTTP_CONNECT_TIMEOUT', default=10.0, cast=float)
+LLM_HTTP2 = config('LLM_HTTP2', default=False, cast=bool)  # requires the 'h2' package
+# Retries the OpenAI client makes itself (each holds its concurrency slot)
+LLM_MAX_RETRIES = config('LLM_MAX_RETRIES', default=2, cast=int)
+
+# Admission control for LLM calls: adaptive concurrency per process (latency in seconds)
+LLM_CONCURRENCY_INITIAL = config('LLM_CONCURRENCY_INITIAL', default=4, cast=int)
+LLM_CONCURRENCY_MIN = config('LLM_CONCURRENCY_MIN', default=1, cast=int)
+LLM_CONCURRENCY_MAX = config('LLM_CONCURRENCY_MAX', default=16, cast=int)
+LLM_TARGET_LATENCY = config('LLM_TARGET_LATENCY', default=60.0, cast=float)
+LLM_QUEUE_TIMEOUT = config('LLM_QUEUE_TIMEOUT', default=30.0, cast=float)
+# Per-minute request/token budgets shared through CACHES (0 disables)
+LLM_RPM_LIMIT = config('LLM_RPM_LIMIT', default=0, cast=int)
+LLM_TPM_LIMIT = config('LLM_TPM_LIMIT', default=0, cast=int)
+LLM_RATE_LIMIT_WAIT = config('LLM_RATE_LIMIT_WAIT', default=5.0, cast=float)
+# Circuit breaker: consecutive backend failures before failing fast, and for how long
+LLM_BREAKER_FAILURE_THRESHOLD = config('LLM_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+LLM_BREAKER_COOLDOWN = config('LLM_BREAKER_COOLDOWN', default=30.0, cast=float)
+
 # Celery Configuration (Optional)
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
 
+# Prompt compaction: fit the CV and job description into this many tokens,
+# dropping boilerplate and the least relevant content first
+PROMPT_COMPACTION_ENABLED = config('PROMPT_COMPACTION_ENABLED', default=True, cast=bool)
+PROMPT_TOKEN_BUDGET = config('PROMPT_TOKEN_BUDGET', default=6000, cast=int)
+
+# Prompt layout: 'prefix' puts the system prompt and CV first and the per-job
+# content last so the provider's prompt cache can reuse the shared prefix;
+# 'classic' keeps company and job description before the CV
+PROMPT_LAYOUT = config('PROMPT_LAYOUT', default='prefix')
+
+# Async resume tailoring
+# 'thread' runs tasks in an in-process pool, 'db' leaves them queued in the
+# database for `manage.py run_tailoring_worker`, 'celery' sends them to the broker
+TAILORING_TASK_BACKEND = config('TAILORING_TASK_BACKEND', default='thread')
+TAILORING_WORKERS = config('TAILORING_WORKERS', default=4, cast=int)
+
+# Batch tailoring: concurrent LLM calls per batch and maximum jobs per request
+TAILORING_BATCH_CONCURRENCY = config('TAILORING_BATCH_CONCURRENCY', default=5, cast=int)
+TAILORING_BATCH_MAX_JOBS = config('TAILORING_BATCH_MAX_JOBS', default=50, cast=int)
+
+# Cache of model output for identical tailoring requests (TTL in seconds)
+TAILORING_CACHE_ENABLED = config('TAILORING_CACHE_ENABLED', default=True, cast=bool)
+TAILORING_CACHE_TTL = config('TAILORING_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+TAILORING_CACHE_MAX_ENTRIES = config('TAILORING_CACHE_MAX_ENTRIES', default=1000, cast=int)
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+# Hash uploads while they stream in, so identical CVs are stored and extracted once
+FILE_UPLOAD_HANDLERS = [
+    'resumes.uploads.ChecksumUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# PDF text extraction: worker processes that parse uploaded PDFs (0 = in-process, without the time and memory limits)
+PDF_EXTRACTION_WORKERS = config('PDF_EXTRACTION_WORKERS', default=min(4, os.cpu_count() or 1), cast=int)
+PDF_PARALLEL_MIN_PAGES = config('PDF_PARALLEL_MIN_PAGES', default=4, cast=int)
+PDF_MAX_PAGES = config('PDF_MAX_PAGES', default=30, cast=int)
+PDF_MAX_CHARS = config('PDF_MAX_CHARS', default=200000, cast=int)  # also applies to DOCX
+PDF_PAGE_TIMEOUT = config('PDF_PAGE_TIMEOUT', default=10.0, cast=float)  # seconds per page
+PDF_WORKER_MEMORY_MB = config('PDF_WORKER_MEMORY_MB', default=512, cast=int)  # also caps render workers; not enforced on Windows
+# 'pypdf2' (default, fastest) or 'pdfplumber' (position-based; for PDFs whose content stream order is scrambled)
+PDF_EXTRACTION_ENGINE = config('PDF_EXTRACTION_ENGINE', default='pypdf2')
+
+# Write rendered tailored resume PDFs to MEDIA_ROOT in a background thread instead of on the request path
+PDF_ASYNC_WRITES = config('PDF_ASYNC_WRITES', default=True, cast=bool)
+# Render a saved tailored resume's PDF when it is first viewed rather than right after tailoring
+PDF_LAZY_RENDERING = config('PDF_LAZY_RENDERING', default=True, cast=bool)
+# Processes that lay out tailored resume PDFs, off the request threads' GIL (0 = render in-process)
+PDF_RENDER_WORKERS = config('PDF_RENDER_WORKERS', default=min(2, os.cpu_count() or 1), cast=int)
+PDF_RENDER_TIMEOUT = config('PDF_RENDER_TIMEOUT', default=30.0, cast=float)  # seconds per render
+# Tighten spacing, type and margins (within limits) until a resume fits this many pages (0 = never)
+PDF_FIT_PAGES = config('PDF_FIT_PAGES', default=1, cast=int)
+
+# Chunked, resumable CV uploads: largest chunk per request, where partial files live and for how long
+CV_UPLOAD_CHUNK_SIZE = config('CV_UPLOAD_CHUNK_SIZE', default=1024 * 1024, cast=int)
+CV_UPLOAD_TEMP_DIR = config('CV_UPLOAD_TEMP_DIR', default=os.path.join(tempfile.gettempdir(), 'resumebuilder_uploads'))
+CV_UPLOAD_SESSION_TTL = config('CV_UPLOAD_SESSION_TTL', default=24 * 3600, cast=int)
 
 # Media files
 MEDIA_URL = '/media/'
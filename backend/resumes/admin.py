@@ -3,16 +3,20 @@ from .models import BaseCV
 
 @admin.register(BaseCV)
 class BaseCVAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'file_size', 'content_type', 'uploaded_at']
-    list_filter = ['content_type', 'uploaded_at']
+    list_display = ['filename', 'file_size', 'content_type', 'extraction_status', 'uploaded_at']
+    list_filter = ['content_type', 'extraction_status', 'uploaded_at']
     search_fields = ['filename']
-    readonly_fields = ['filename', 'file_size', 'content_type', 'uploaded_at', 'updated_at']
+    readonly_fields = ['filename', 'file_size', 'content_type', 'content_checksum', 'extraction_status',
+                       'extraction_error', 'extracted_at', 'uploaded_at', 'updated_at']
     ordering = ['-uploaded_at']
     
     fieldsets = (
         ('File Information', {
             'fields': ('file', 'filename', 'file_size', 'content_type')
         }),
+        ('Text Extraction', {
+            'fields': ('extraction_status', 'extraction_error', 'extracted_at', 'content_checksum')
+        }),
         ('Timestamps', {
             'fields': ('uploaded_at', 'updated_at'),
             'classes': ('collapse',)
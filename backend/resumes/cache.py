@@ -0,0 +1,140 @@
+"""Persistent, content-addressed cache of tailoring results
+
+Entries are keyed by a SHA-256 of the normalised prompt inputs together with
+the model name, temperature and prompt version, so any change to what would be
+sent to the model produces a new key.
+"""
+import hashlib
+import json
+import re
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import TailoringCacheEntry
+
+_counters = {'hits': 0, 'misses': 0, 'bypasses': 0}
+_counters_lock = threading.Lock()
+
+_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def normalize_text(text):
+    """Normalise whitespace so cosmetic differences map to the same key"""
+    if not text:
+        return ''
+    lines = [_WHITESPACE_RE.sub(' ', line).strip() for line in text.replace('\r\n', '\n').split('\n')]
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def make_cache_key(cv_text, company, job_description, additional_feedback, model, temperature, prompt_version,
+                   prompt_options=None):
+    """Return the hex SHA-256 identifying one tailoring request
+
+    prompt_options holds any settings that change how the prompt is built
+    from the inputs (e.g. compaction), so changing them changes the key.
+    """
+    payload = json.dumps({
+        'prompt_options': prompt_options or {},
+        'cv_text': normalize_text(cv_text),
+        'company': normalize_text(company).casefold(),
+        'job_description': normalize_text(job_description),
+        'additional_feedback': normalize_text(additional_feedback),
+        'model': model,
+        'temperature': temperature,
+        'prompt_version': prompt_version,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_enabled():
+    return settings.TAILORING_CACHE_ENABLED
+
+
+def get(key):
+    """Return the cached content for key, or None on a miss or expired entry"""
+    entry = TailoringCacheEntry.objects.filter(key=key).first()
+    if entry is None:
+        _count('misses')
+        return None
+
+    if entry.created_at < timezone.now() - timedelta(seconds=settings.TAILORING_CACHE_TTL):
+        entry.delete()
+        _count('misses')
+        return None
+
+    TailoringCacheEntry.objects.filter(pk=entry.pk).update(
+        hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+    )
+    _count('hits')
+    return entry.tailored_content
+
+
+def peek(key):
+    """Return the content for key without touching counters or usage time"""
+    return TailoringCacheEntry.objects.filter(key=key).values_list('tailored_content', flat=True).first()
+
+
+def record_bypass():
+    """Count a request that skipped the lookup because regeneration was requested"""
+    _count('bypasses')
+
+
+def set(key, tailored_content, model, prompt_version):
+    """Store (or replace) the content for key and evict stale entries"""
+    try:
+        TailoringCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={
+                'tailored_content': tailored_content,
+                'model_name': model,
+                'prompt_version': prompt_version,
+                'created_at': timezone.now(),
+                'last_used_at': timezone.now(),
+            }
+        )
+    except IntegrityError:
+        # A concurrent request stored the same key first; its content is equivalent
+        pass
+    evict()
+
+
+def evict():
+    """Drop expired entries, then the least recently used ones above the size limit"""
+    cutoff = timezone.now() - timedelta(seconds=settings.TAILORING_CACHE_TTL)
+    TailoringCacheEntry.objects.filter(created_at__lt=cutoff).delete()
+
+    max_entries = settings.TAILORING_CACHE_MAX_ENTRIES
+    stale_ids = list(
+        TailoringCacheEntry.objects.order_by('-last_used_at').values_list('id', flat=True)[max_entries:]
+    )
+    if stale_ids:
+        TailoringCacheEntry.objects.filter(id__in=stale_ids).delete()
+
+
+def stats():
+    """Hit/miss counters for this process plus totals stored in the database"""
+    with _counters_lock:
+        counters = dict(_counters)
+    lookups = counters['hits'] + counters['misses']
+    return {
+        'enabled': is_enabled(),
+        'entries': TailoringCacheEntry.objects.count(),
+        'stored_hits': TailoringCacheEntry.objects.aggregate(total=Sum('hit_count'))['total'] or 0,
+        'process_hits': counters['hits'],
+        'process_misses': counters['misses'],
+        'process_bypasses': counters['bypasses'],
+        'process_hit_rate': round(counters['hits'] / lookups, 3) if lookups else None,
+        'ttl_seconds': settings.TAILORING_CACHE_TTL,
+        'max_entries': settings.TAILORING_CACHE_MAX_ENTRIES,
+    }
@@ -0,0 +1,120 @@
+"""Streaming ZIP export of tailored resume PDFs
+
+ZipFile writes into a buffer that is emptied after every entry, so the
+archive goes out as it is built: only one PDF is held at a time (rendered
+first if it was never viewed) and rows are read from the database in
+chunks. The buffer has no tell() or seek(), so ZipFile writes each entry
+with a data descriptor instead of going back to patch its header. The
+central directory it keeps for the end of the archive is the only part
+that grows with the number of resumes, at about a hundred bytes each.
+"""
+import json
+import zipfile
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .pdf import load_tailored_pdf
+from .pdf_render import DEFAULT_TEMPLATE
+from .tailoring import record_rendered_pdf
+
+MANIFEST_NAME = 'manifest.jsonl'
+FAILURES_NAME = 'failures.txt'
+
+# Rows fetched from the database per query while exporting
+EXPORT_CHUNK_SIZE = 100
+
+
+class _ZipBuffer:
+    """Write-only file object collecting ZipFile output until the generator drains it"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_filename(tailored_resume):
+    """Name of a tailored resume's PDF inside the archive, unique through the row id"""
+    job = tailored_resume.job
+    stem = '-'.join(part for part in (slugify(job.company.name), slugify(job.title)) if part) or 'resume'
+    return f"{stem}-{tailored_resume.pk}.pdf"
+
+
+def _zip_info(name, moment):
+    return zipfile.ZipInfo(name, date_time=timezone.localtime(moment).timetuple()[:6])
+
+
+def iter_export_zip(queryset, template=DEFAULT_TEMPLATE, manifest=False):
+    """Yield a ZIP of the PDFs of a TailoredResume queryset, in one template, as bytes chunks
+
+    PDFs are stored rather than deflated, as their content is compressed
+    already. A resume whose PDF could not be rendered is left out and listed
+    in a failures.txt at the end, as "<id>: <error>" lines. With
+    manifest=True a manifest.jsonl follows too, with one line per resume:
+    its fields, tailored_content and the name of its PDF ('pdf' is None and
+    'error' says why when it could not be rendered).
+    """
+    queryset = queryset.select_related('job__company')
+    buffer = _ZipBuffer()
+    failures = {}
+    last_pk = None
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for tailored_resume in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            if last_pk is None or tailored_resume.pk > last_pk:
+                last_pk = tailored_resume.pk
+            try:
+                pdf_path, pdf_bytes = load_tailored_pdf(
+                    tailored_resume.file_path, tailored_resume.tailored_content, template,
+                    tailored_resume.structured_content,
+                )
+            except ValueError as e:
+                print(f"Warning: Could not export tailored resume {tailored_resume.pk}: {e}")
+                failures[tailored_resume.pk] = str(e)
+                continue
+            if template == DEFAULT_TEMPLATE and (tailored_resume.file_path, tailored_resume.pdf_size) != (pdf_path, len(pdf_bytes)):
+                record_rendered_pdf(tailored_resume.pk, pdf_path, pdf_bytes)
+            archive.writestr(_zip_info(export_filename(tailored_resume), tailored_resume.updated_at), pdf_bytes)
+            yield buffer.drain()
+
+        if failures:
+            info = _zip_info(FAILURES_NAME, timezone.now())
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, ''.join(f"{pk}: {error}\n" for pk, error in failures.items()))
+            yield buffer.drain()
+
+        if manifest and last_pk is not None:
+            info = _zip_info(MANIFEST_NAME, timezone.now())
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, 'w') as manifest_file:
+                # Second pass over the same rows, leaving out any created after the PDFs were written
+                for tailored_resume in queryset.filter(pk__lte=last_pk).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                    error = failures.get(tailored_resume.pk)
+                    line = {
+                        'id': tailored_resume.pk,
+                        'job': tailored_resume.job_id,
+                        'job_title': tailored_resume.job.title,
+                        'company_name': tailored_resume.job.company.name,
+                        'parent': tailored_resume.parent_id,
+                        'created_at': tailored_resume.created_at.isoformat(),
+                        'pdf': None if error else export_filename(tailored_resume),
+                        'tailored_content': tailored_resume.tailored_content,
+                    }
+                    if error:
+                        line['error'] = error
+                    manifest_file.write((json.dumps(line) + '\n').encode('utf-8'))
+                    # The compressor holds on to small writes, so most lines add nothing to send yet
+                    data = buffer.drain()
+                    if data:
+                        yield data
+    yield buffer.drain()
@@ -0,0 +1,125 @@
+"""Text extraction from uploaded CV files
+
+Uploaded base CVs are extracted once, in the background right after upload
+(see tasks.enqueue_extraction). The raw text and a SHA-256 of the file are
+stored on the BaseCV row and every consumer reads them from there instead of
+parsing the file again; files with the same SHA-256 share one extraction.
+"""
+import hashlib
+import io
+import time
+
+from django.utils import timezone
+
+from .models import BaseCV
+from .extractors import extract_text
+from .uploads import cache_uploaded_text, get_cached_uploaded_text
+
+# How long a consumer waits for a background extraction before doing it itself
+EXTRACTION_WAIT_TIMEOUT = 30
+EXTRACTION_POLL_INTERVAL = 0.2
+
+
+def extract_text_from_cv(cv_file):
+    """Extract text from uploaded CV file"""
+    try:
+        # Pick the extractor from the file's content, not just its extension
+        return extract_text(cv_file, cv_file.name)
+    except Exception as e:
+        raise ValueError(f"Failed to extract text from CV: {str(e)}")
+
+
+def file_checksum(data):
+    """Hex SHA-256 of file contents"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def extract_text_from_bytes(data, filename):
+    """Extract text from file contents; filename only selects the format"""
+    buffer = io.BytesIO(data)
+    buffer.name = filename
+    return extract_text_from_cv(buffer)
+
+
+def claim_extraction(base_cv_id, statuses=(BaseCV.EXTRACTION_PENDING,)):
+    """Atomically mark a CV's extraction as running; returns False if it is not in one of statuses"""
+    claimed = BaseCV.objects.filter(
+        pk=base_cv_id, extraction_status__in=statuses
+    ).update(extraction_status=BaseCV.EXTRACTION_RUNNING)
+    return claimed == 1
+
+
+def run_claimed_extraction(base_cv_id):
+    """Read the file once, then store its checksum, raw text and the outcome"""
+    base_cv = BaseCV.objects.get(pk=base_cv_id)
+    # update() rather than save() so a concurrent user correction of extracted_text is not overwritten
+    fields = {'extracted_at': timezone.now()}
+    if base_cv.content_checksum:
+        # An identical file may have been extracted since this one was uploaded
+        extracted = BaseCV.objects.filter(
+            content_checksum=base_cv.content_checksum, extraction_status=BaseCV.EXTRACTION_DONE
+        ).exclude(pk=base_cv_id).values_list('raw_text', flat=True).first()
+        if extracted is not None:
+            BaseCV.objects.filter(pk=base_cv_id).update(
+                raw_text=extracted, extraction_status=BaseCV.EXTRACTION_DONE, extraction_error='', **fields
+            )
+            return
+    try:
+        with base_cv.file.open('rb') as cv_file:
+            data = cv_file.read()
+        fields['content_checksum'] = file_checksum(data)
+        fields['raw_text'] = extract_text_from_bytes(data, base_cv.file.name)
+    except Exception as e:
+        fields['extraction_status'] = BaseCV.EXTRACTION_FAILED
+        fields['extraction_error'] = str(e)
+    else:
+        fields['extraction_status'] = BaseCV.EXTRACTION_DONE
+        fields['extraction_error'] = ''
+    BaseCV.objects.filter(pk=base_cv_id).update(**fields)
+
+
+def extract_base_cv(base_cv_id):
+    """Extract a pending CV unless another worker already started it"""
+    if claim_extraction(base_cv_id):
+        run_claimed_extraction(base_cv_id)
+
+
+def ensure_extracted(base_cv):
+    """Return base_cv refreshed with a finished extraction, extracting inline if nobody else is"""
+    if base_cv.extraction_status == BaseCV.EXTRACTION_DONE:
+        return base_cv
+
+    if claim_extraction(base_cv.pk, (BaseCV.EXTRACTION_PENDING, BaseCV.EXTRACTION_FAILED)):
+        run_claimed_extraction(base_cv.pk)
+    else:
+        # A background worker is on it; wait for it, then take over if it seems stuck
+        deadline = time.monotonic() + EXTRACTION_WAIT_TIMEOUT
+        while BaseCV.objects.filter(pk=base_cv.pk, extraction_status=BaseCV.EXTRACTION_RUNNING).exists():
+            if time.monotonic() > deadline:
+                if claim_extraction(base_cv.pk, (BaseCV.EXTRACTION_RUNNING,)):
+                    run_claimed_extraction(base_cv.pk)
+                break
+            time.sleep(EXTRACTION_POLL_INTERVAL)
+
+    base_cv.refresh_from_db()
+    return base_cv
+
+
+def get_base_cv_text(base_cv):
+    """Return the stored (possibly user-corrected) text of a BaseCV without re-parsing its file"""
+    if base_cv.extracted_text:
+        return base_cv.extracted_text
+    base_cv = ensure_extracted(base_cv)
+    if base_cv.extraction_status != BaseCV.EXTRACTION_DONE:
+        raise ValueError(base_cv.extraction_error or "Failed to extract text from CV")
+    return base_cv.raw_text or ''
+
+
+def get_uploaded_cv_text(cv_file, checksum):
+    """Text of a CV uploaded with a request, reusing any earlier extraction of the same file"""
+    known = get_cached_uploaded_text(checksum)
+    if known is not None:
+        return known
+    text = extract_text_from_cv(cv_file)
+    cache_uploaded_text(checksum, text)
+    return text
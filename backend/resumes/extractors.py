@@ -0,0 +1,189 @@
+"""Per-format CV text extractors
+
+The format of a file is sniffed from its leading bytes rather than trusted
+from its extension, then the extractor registered for that format reads it.
+Extractors take a seekable binary file object and return plain text.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from xml.etree import ElementTree
+
+from django.conf import settings
+
+from .pdf_text import extract_pdf_text
+
+# Bytes read to identify a file; PDF allows some junk before the header
+SNIFF_BYTES = 1024
+
+_PDF_MAGIC = b'%PDF-'
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE2_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Seconds antiword may take on one .doc file
+DOC_TIMEOUT = 30
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Format name -> function(fileobj) returning text
+EXTRACTORS = {}
+
+# Formats whose extractor also needs an external program
+_REQUIREMENTS = {}
+
+
+def register_extractor(name, requires=None):
+    """Register the decorated function as the text extractor for a format"""
+    def decorator(func):
+        EXTRACTORS[name] = func
+        if requires:
+            _REQUIREMENTS[name] = requires
+        return func
+    return decorator
+
+
+def _looks_like_text(head):
+    if b'\x00' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sniffed block is fine
+        return e.start >= len(head) - 3 and e.reason == 'unexpected end of data'
+    return True
+
+
+def sniff_format(head, filename=''):
+    """Return the format of a file from its first bytes, or None if it is not supported
+
+    Binary formats are recognised by their magic bytes only. Text is
+    accepted only for files named .txt, so a corrupt PDF is not silently
+    read as text.
+    """
+    if _PDF_MAGIC in head[:SNIFF_BYTES]:
+        return 'pdf'
+    if head.startswith(_ZIP_MAGIC):
+        return 'docx'
+    if head.startswith(_OLE2_MAGIC):
+        return 'doc'
+    if os.path.splitext(filename)[1].lower() == '.txt' and _looks_like_text(head):
+        return 'txt'
+    return None
+
+
+def detect_format(fileobj, filename=''):
+    """Sniff the format of a file object, raising ValueError if it cannot be extracted"""
+    fileobj.seek(0)
+    head = fileobj.read(SNIFF_BYTES)
+    fileobj.seek(0)
+    file_format = sniff_format(head, filename)
+    if file_format is None:
+        raise ValueError("File content is not a PDF, DOCX, DOC or UTF-8 text file")
+    if file_format == 'docx':
+        # Only the zip directory is read here
+        try:
+            with zipfile.ZipFile(fileobj) as archive:
+                is_word = 'word/document.xml' in archive.namelist()
+        except zipfile.BadZipFile:
+            is_word = False
+        fileobj.seek(0)
+        if not is_word:
+            raise ValueError("File is a zip archive but not a Word document")
+    require_extractor(file_format)
+    return file_format
+
+
+def require_extractor(file_format):
+    """Raise ValueError if the extractor for a format cannot run on this server"""
+    requirement = _REQUIREMENTS.get(file_format)
+    if requirement and shutil.which(requirement) is None:
+        raise ValueError(f"{file_format.upper()} files are not supported on this server ({requirement} is not installed)")
+
+
+def extract_text(fileobj, filename=''):
+    """Extract text from a file object with the extractor for its sniffed format"""
+    file_format = detect_format(fileobj, filename)
+    return EXTRACTORS[file_format](fileobj)
+
+
+@register_extractor('pdf')
+def extract_pdf(fileobj):
+    """Extract text from a PDF with the configured engine, page-parallel for long documents"""
+    return extract_pdf_text(
+        fileobj.read(),
+        workers=settings.PDF_EXTRACTION_WORKERS,
+        max_pages=settings.PDF_MAX_PAGES,
+        max_chars=settings.PDF_MAX_CHARS,
+        page_timeout=settings.PDF_PAGE_TIMEOUT,
+        parallel_min_pages=settings.PDF_PARALLEL_MIN_PAGES,
+        memory_limit_mb=settings.PDF_WORKER_MEMORY_MB,
+        engine=settings.PDF_EXTRACTION_ENGINE
+    )
+
+
+def iter_docx_paragraphs(fileobj):
+    """Yield the paragraphs of a DOCX body, streaming word/document.xml out of the archive
+
+    Only the zip directory and the one member are read; images and other
+    parts are never decompressed, and parsed elements are discarded as soon
+    as their paragraph is complete.
+    """
+    with zipfile.ZipFile(fileobj) as archive:
+        try:
+            document = archive.open('word/document.xml')
+        except KeyError:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+        with document:
+            parts = []
+            for event, element in ElementTree.iterparse(document, events=('end',)):
+                tag = element.tag
+                if tag == _WORD_NS + 't':
+                    parts.append(element.text or '')
+                elif tag == _WORD_NS + 'tab':
+                    parts.append('\t')
+                elif tag in (_WORD_NS + 'br', _WORD_NS + 'cr'):
+                    parts.append('\n')
+                elif tag == _WORD_NS + 'p':
+                    yield ''.join(parts)
+                    parts = []
+                    element.clear()
+
+
+@register_extractor('docx')
+def extract_docx(fileobj):
+    """Extract text from a DOCX file, one line per paragraph"""
+    max_chars = settings.PDF_MAX_CHARS
+    lines = []
+    total = 0
+    for paragraph in iter_docx_paragraphs(fileobj):
+        lines.append(paragraph)
+        total += len(paragraph) + 1
+        if max_chars and total >= max_chars:
+            break
+    return '\n'.join(lines)[:max_chars or None].strip()
+
+
+@register_extractor('doc', requires='antiword')
+def extract_doc(fileobj):
+    """Extract text from a legacy Word 97-2003 file with antiword"""
+    # Closed before antiword runs: Windows does not let another process open it otherwise
+    with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as source:
+        shutil.copyfileobj(fileobj, source)
+    try:
+        result = subprocess.run(
+            ['antiword', '-w', '0', source.name],
+            capture_output=True, timeout=DOC_TIMEOUT
+        )
+    finally:
+        os.remove(source.name)
+    if result.returncode != 0:
+        raise ValueError(f"antiword failed: {result.stderr.decode('utf-8', 'replace').strip()}")
+    return result.stdout.decode('utf-8', 'replace').strip()
+
+
+@register_extractor('txt')
+def extract_txt(fileobj):
+    """Read a UTF-8 text file"""
+    return fileobj.read().decode('utf-8-sig').strip()
@@ -0,0 +1,183 @@
+"""Process-wide pooled OpenAI client
+
+A single httpx connection pool is shared by every LLM call in a worker
+process so requests reuse keep-alive connections instead of paying TCP and
+TLS setup each time. The client is created lazily (after any fork) and
+closed at interpreter exit.
+"""
+import atexit
+import importlib.util
+import os
+import threading
+
+import httpx
+from django.conf import settings
+from openai import OpenAI
+
+_client = None
+_client_pid = None
+_http_client = None
+_client_lock = threading.Lock()
+
+_stats = {'requests': 0, 'new_connections': 0}
+_stats_lock = threading.Lock()
+
+_usage_stats = {
+    'completions': 0,
+    'prompt_tokens': 0,
+    'cached_prompt_tokens': 0,
+    'completion_tokens': 0,
+    'cache_hit_completions': 0,
+    'cache_hit_latency_ms': 0,
+    'cache_miss_latency_ms': 0,
+}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _trace(event_name, info):
+    """httpcore trace hook: a completed TCP connect means the pool opened a new connection"""
+    if event_name == 'connection.connect_tcp.complete':
+        _count('new_connections')
+
+
+def _on_request(request):
+    """httpx request hook that counts requests and attaches the trace hook"""
+    _count('requests')
+    previous_trace = request.extensions.get('trace')
+    if previous_trace is None:
+        request.extensions['trace'] = _trace
+    else:
+        def chained_trace(event_name, info):
+            _trace(event_name, info)
+            previous_trace(event_name, info)
+        request.extensions['trace'] = chained_trace
+
+
+def _http2_available():
+    return importlib.util.find_spec('h2') is not None
+
+
+def _build_http_client():
+    http2 = settings.LLM_HTTP2
+    if http2 and not _http2_available():
+        print("Warning: LLM_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.LLM_HTTP_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT),
+        http2=http2,
+        event_hooks={'request': [_on_request]},
+    )
+
+
+def get_openai_client():
+    """Return the shared OpenAI client for this process, creating it on first use"""
+    global _client, _client_pid, _http_client
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                # Sockets inherited from a parent process must not be reused
+                _http_client = _build_http_client()
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    http_client=_http_client,
+                    max_retries=settings.LLM_MAX_RETRIES
+                )
+                _client_pid = pid
+    return _client
+
+
+def close_openai_client():
+    """Close the shared connection pool (registered to run at exit)"""
+    global _client, _client_pid, _http_client
+    with _client_lock:
+        if _http_client is not None and _client_pid == os.getpid():
+            _http_client.close()
+        _client = None
+        _client_pid = None
+        _http_client = None
+
+
+atexit.register(close_openai_client)
+
+
+def connection_stats():
+    """Request and connection counters for this process"""
+    with _stats_lock:
+        stats = dict(_stats)
+    requests = stats['requests']
+    reused = max(requests - stats['new_connections'], 0)
+    return {
+        'requests': requests,
+        'new_connections': stats['new_connections'],
+        'reused_connections': reused,
+        'connection_reuse_rate': round(reused / requests, 3) if requests else None,
+        'max_connections': settings.LLM_HTTP_MAX_CONNECTIONS,
+        'max_keepalive_connections': settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        'http2': settings.LLM_HTTP2,
+    }
+
+
+def usage_to_dict(usage, latency_ms):
+    """Flatten an OpenAI usage object, including prompt-cache hits, into a plain dict"""
+    if usage is None:
+        return None
+    details = getattr(usage, 'prompt_tokens_details', None)
+    # Older SDK versions keep unknown fields as plain dicts
+    if isinstance(details, dict):
+        cached_tokens = details.get('cached_tokens')
+    else:
+        cached_tokens = getattr(details, 'cached_tokens', None)
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        'cached_prompt_tokens': cached_tokens or 0,
+        'latency_ms': latency_ms,
+    }
+
+
+def record_usage(usage):
+    """Add one completion's usage dict (see usage_to_dict) to this process's totals"""
+    if not usage:
+        return
+    cache_hit = usage['cached_prompt_tokens'] > 0
+    with _stats_lock:
+        _usage_stats['completions'] += 1
+        _usage_stats['prompt_tokens'] += usage['prompt_tokens'] or 0
+        _usage_stats['cached_prompt_tokens'] += usage['cached_prompt_tokens']
+        _usage_stats['completion_tokens'] += usage['completion_tokens'] or 0
+        if cache_hit:
+            _usage_stats['cache_hit_completions'] += 1
+            _usage_stats['cache_hit_latency_ms'] += usage['latency_ms']
+        else:
+            _usage_stats['cache_miss_latency_ms'] += usage['latency_ms']
+
+
+def usage_stats():
+    """Token totals and average latency with and without provider prompt-cache hits"""
+    with _stats_lock:
+        stats = dict(_usage_stats)
+    hits = stats['cache_hit_completions']
+    misses = stats['completions'] - hits
+    return {
+        'completions': stats['completions'],
+        'prompt_tokens': stats['prompt_tokens'],
+        'cached_prompt_tokens': stats['cached_prompt_tokens'],
+        'completion_tokens': stats['completion_tokens'],
+        'cached_prompt_token_rate': (
+            round(stats['cached_prompt_tokens'] / stats['prompt_tokens'], 3) if stats['prompt_tokens'] else None
+        ),
+        'prompt_cache_hit_completions': hits,
+        'avg_latency_ms_with_cache_hit': round(stats['cache_hit_latency_ms'] / hits) if hits else None,
+        'avg_latency_ms_without_cache_hit': round(stats['cache_miss_latency_ms'] / misses) if misses else None,
+    }
@@ -0,0 +1,257 @@
+"""Admission control around the LLM backend
+
+Every model call goes through guarded_call(), which applies, in order:
+
+- a circuit breaker that fails fast while the backend is unhealthy,
+- per-minute request/token budgets (LLM_RPM_LIMIT / LLM_TPM_LIMIT) counted in
+  the Django cache, so they are shared by all workers when the cache is,
+- an adaptive concurrency limit (AIMD): it grows by one slot per window of
+  fast successful calls and halves on rate limits, timeouts or slow calls.
+
+When a call cannot be admitted LLMUnavailable is raised with a retry-after
+hint instead of letting the request block until its own timeout.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import openai
+from django.conf import settings
+from django.core.cache import cache
+
+
+class LLMUnavailable(Exception):
+    """The LLM backend is overloaded or unhealthy; retry after `retry_after` seconds"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+
+
+def _is_overload(error):
+    """Errors that mean the backend is saturated (back off concurrency)"""
+    return isinstance(error, (openai.RateLimitError, openai.APITimeoutError))
+
+
+def _is_backend_failure(error):
+    """Errors that count towards opening the circuit breaker"""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_after_from(error, default):
+    """Use the provider's Retry-After header when a 429 carries one"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            return float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    return default
+
+
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to observed latency and overload signals (AIMD)"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._limit = None
+        self._in_flight = 0
+        self._successes = 0
+
+    @property
+    def limit(self):
+        if self._limit is None:
+            self._limit = float(settings.LLM_CONCURRENCY_INITIAL)
+        return self._limit
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise LLMUnavailable("Too many concurrent LLM calls; the backend is slow", timeout)
+                self._condition.wait(remaining)
+            self._in_flight += 1
+
+    def release(self, latency, overloaded):
+        with self._condition:
+            self._in_flight -= 1
+            if overloaded or latency > settings.LLM_TARGET_LATENCY:
+                # Multiplicative decrease
+                self._limit = max(float(settings.LLM_CONCURRENCY_MIN), self.limit / 2)
+                self._successes = 0
+            else:
+                # Additive increase: one more slot after a full window of good calls
+                self._successes += 1
+                if self._successes >= int(self.limit):
+                    self._limit = min(float(settings.LLM_CONCURRENCY_MAX), self.limit + 1)
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {'limit': int(self.limit), 'in_flight': self._in_flight}
+
+
+class CircuitBreaker:
+    """Opens after consecutive backend failures; the open-until time is shared through the cache"""
+
+    OPEN_UNTIL_KEY = 'llm_guard:breaker_open_until'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._half_open_trial = False
+
+    def before_call(self):
+        """Raise LLMUnavailable while open; returns True when this call is the half-open trial"""
+        open_until = cache.get(self.OPEN_UNTIL_KEY)
+        if open_until is None:
+            return False
+        remaining = open_until - time.time()
+        if remaining > 0:
+            raise LLMUnavailable("LLM backend is unavailable (circuit open)", remaining)
+        # Cooldown over: let a single trial call through (half-open)
+        with self._lock:
+            if self._half_open_trial:
+                raise LLMUnavailable("LLM backend is recovering; retry shortly", 1)
+            self._half_open_trial = True
+        return True
+
+    def abandon_trial(self):
+        """The trial call ended without an outcome (not admitted, or cancelled); let another call try"""
+        with self._lock:
+            self._half_open_trial = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._half_open_trial:
+                self._half_open_trial = False
+                cache.delete(self.OPEN_UNTIL_KEY)
+
+    def record_failure(self, retry_after=None):
+        with self._lock:
+            self._failures += 1
+            trial_failed = self._half_open_trial
+            self._half_open_trial = False
+            if trial_failed or self._failures >= settings.LLM_BREAKER_FAILURE_THRESHOLD:
+                cooldown = max(retry_after or 0, settings.LLM_BREAKER_COOLDOWN)
+                cache.set(self.OPEN_UNTIL_KEY, time.time() + cooldown, timeout=int(cooldown) + 60)
+                self._failures = 0
+
+    def state(self):
+        open_until = cache.get(self.OPEN_UNTIL_KEY)
+        if open_until is None:
+            return 'closed'
+        return 'open' if open_until > time.time() else 'half-open'
+
+
+def _window_key(kind, window):
+    return f'llm_guard:{kind}:{window}'
+
+
+def _take(kind, amount, limit, window):
+    """Atomically add amount to this minute's counter; False if it would exceed limit"""
+    key = _window_key(kind, window)
+    cache.add(key, 0, timeout=120)
+    try:
+        used = cache.incr(key, amount)
+    except ValueError:
+        # The counter expired between add() and incr(); start it again
+        cache.add(key, amount, timeout=120)
+        used = amount
+    if used > limit:
+        cache.decr(key, amount)
+        return False
+    return True
+
+
+def reserve_rate_budget(estimated_tokens):
+    """Reserve one request and estimated_tokens from the shared per-minute budgets
+
+    Waits for the next minute when the current one is exhausted, up to
+    LLM_RATE_LIMIT_WAIT seconds, then raises LLMUnavailable.
+    """
+    rpm, tpm = settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT
+    if not rpm and not tpm:
+        return
+    deadline = time.monotonic() + settings.LLM_RATE_LIMIT_WAIT
+    while True:
+        now = time.time()
+        window = int(now // 60)
+        if not rpm or _take('requests', 1, rpm, window):
+            if not tpm or _take('tokens', estimated_tokens, tpm, window):
+                return
+            if rpm:
+                cache.decr(_window_key('requests', window), 1)
+        retry_after = 60 - (now % 60)
+        if time.monotonic() + retry_after > deadline:
+            raise LLMUnavailable("LLM request or token budget for this minute is used up", retry_after)
+        time.sleep(retry_after)
+
+
+def rate_budget_stats():
+    window = int(time.time() // 60)
+    return {
+        'rpm_limit': settings.LLM_RPM_LIMIT,
+        'tpm_limit': settings.LLM_TPM_LIMIT,
+        'requests_this_minute': cache.get(_window_key('requests', window), 0),
+        'tokens_this_minute': cache.get(_window_key('tokens', window), 0),
+    }
+
+
+limiter = AdaptiveLimiter()
+breaker = CircuitBreaker()
+
+
+@contextmanager
+def guarded_call(estimated_tokens):
+    """Admit one LLM call through the breaker, rate budgets and concurrency limit
+
+    The concurrency slot is released however the call ends, including when
+    a streaming generator is closed mid-call (GeneratorExit); such calls
+    count as neither a success nor a failure for the breaker.
+    """
+    trial = breaker.before_call()
+    try:
+        reserve_rate_budget(estimated_tokens)
+        limiter.acquire(settings.LLM_QUEUE_TIMEOUT)
+    except BaseException:
+        if trial:
+            breaker.abandon_trial()
+        raise
+    started = time.monotonic()
+    overloaded = False
+    try:
+        yield
+    except Exception as e:
+        overloaded = _is_overload(e)
+        if _is_backend_failure(e):
+            breaker.record_failure(_retry_after_from(e, None))
+        else:
+            breaker.record_success()
+        if isinstance(e, openai.RateLimitError):
+            # Pass the provider's own back-off on to the client
+            raise LLMUnavailable("LLM provider rate limit reached", _retry_after_from(e, 1)) from e
+        raise
+    except BaseException:
+        if trial:
+            breaker.abandon_trial()
+        raise
+    else:
+        breaker.record_success()
+    finally:
+        limiter.release(time.monotonic() - started, overloaded=overloaded)
+
+
+def stats():
+    return dict(
+        limiter.stats(),
+        breaker=breaker.state(),
+        **rate_budget_stats()
+    )
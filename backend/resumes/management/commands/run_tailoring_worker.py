@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from resumes.tasks import run_next_pending_extraction, run_next_queued_task
+
+
+class Command(BaseCommand):
+    help = "Run queued tailoring tasks and CV text extractions from the database (TAILORING_TASK_BACKEND='db')"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.TAILORING_WORKERS,
+                            help='Number of tasks to run concurrently')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Drain the queue and exit instead of polling forever')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Tailoring worker started with {workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tailoring') as executor:
+            list(executor.map(lambda _: self._work(options), range(workers)))
+
+    def _work(self, options):
+        """Worker loop: keep claiming work until the queue is empty (extractions first, they are quick)"""
+        while True:
+            close_old_connections()
+            try:
+                ran = run_next_pending_extraction() or run_next_queued_task()
+            except Exception as e:
+                self.stderr.write(f"Tailoring worker error: {e}")
+                ran = False
+            finally:
+                close_old_connections()
+            if not ran:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0003_basecv_extracted_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TailoringTask',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('company', models.CharField(max_length=255)),
+                ('job_description', models.TextField()),
+                ('additional_feedback', models.TextField(blank=True, default='')),
+                ('cv_text', models.TextField()),
+                ('file_path', models.CharField(blank=True, default='', max_length=500)),
+                ('tailored_content', models.TextField(blank=True, default='')),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('tailored_resume', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tasks', to='resumes.tailoredresume')),
+            ],
+            options={
+                'verbose_name': 'Tailoring Task',
+                'verbose_name_plural': 'Tailoring Tasks',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0004_tailoringtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TailoringCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('tailored_content', models.TextField()),
+                ('model_name', models.CharField(max_length=100)),
+                ('prompt_version', models.PositiveIntegerField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Tailoring Cache Entry',
+                'verbose_name_plural': 'Tailoring Cache Entries',
+                'ordering': ['-last_used_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='tailoringtask',
+            name='regenerate',
+            field=models.BooleanField(default=False, help_text='Bypass the tailoring cache'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0005_tailoringcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='cached_prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, help_text="Prompt tokens served from the provider's prompt cache", null=True),
+        ),
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='completion_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='llm_latency_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='prompt_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0006_tailoredresume_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revisions', to='resumes.tailoredresume'),
+        ),
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='revision_feedback',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
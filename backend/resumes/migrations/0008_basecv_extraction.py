@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0007_tailoredresume_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='basecv',
+            name='content_checksum',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 of the file contents', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='basecv',
+            name='extracted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='basecv',
+            name='extraction_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='basecv',
+            name='extraction_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='basecv',
+            name='raw_text',
+            field=models.TextField(blank=True, help_text='Text extracted from the uploaded file, before any user correction', null=True),
+        ),
+    ]
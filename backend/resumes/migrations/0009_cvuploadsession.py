@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 05:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0008_basecv_extraction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVUploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.PositiveIntegerField(help_text='Declared total file size in bytes')),
+                ('offset', models.PositiveIntegerField(default=0, help_text='Bytes received so far')),
+                ('file_format', models.CharField(blank=True, default='', help_text='Format sniffed from the first chunk', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('base_cv', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to='resumes.basecv')),
+            ],
+            options={
+                'verbose_name': 'CV Upload Session',
+                'verbose_name_plural': 'CV Upload Sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
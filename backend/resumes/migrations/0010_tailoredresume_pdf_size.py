@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0009_cvuploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='pdf_size',
+            field=models.PositiveIntegerField(blank=True, help_text='Bytes of the rendered PDF in the default template (empty until first rendered)', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0010_tailoredresume_pdf_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='structured_content',
+            field=models.JSONField(blank=True, help_text='Sections of a structured (JSON) model reply, rendered instead of re-parsing tailored_content', null=True),
+        ),
+    ]
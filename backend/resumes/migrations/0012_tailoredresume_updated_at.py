@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    TailoredResume = apps.get_model('resumes', 'TailoredResume')
+    TailoredResume.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0011_tailoredresume_structured_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tailoredresume',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        # Existing resumes have not been edited since they were created
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,28 @@
 from django.db import models
 from django.core.validators import FileExtensionValidator
 import os
+import uuid
 
 def cv_upload_path(instance, filename):
-    """Generate upload path for CV files"""
+    """Generate upload path for CV files, derived from the content hash when it is known"""
+    if instance.content_checksum:
+        extension = os.path.splitext(filename)[1].lower()
+        return f'cvs/{instance.content_checksum[:2]}/{instance.content_checksum}{extension}'
     return f'cvs/{instance.id}_{filename}'
 
 class BaseCV(models.Model):
     """Model to store uploaded base CV files"""
+    EXTRACTION_PENDING = 'pending'
+    EXTRACTION_RUNNING = 'running'
+    EXTRACTION_DONE = 'done'
+    EXTRACTION_FAILED = 'failed'
+    EXTRACTION_STATUS_CHOICES = [
+        (EXTRACTION_PENDING, 'Pending'),
+        (EXTRACTION_RUNNING, 'Running'),
+        (EXTRACTION_DONE, 'Done'),
+        (EXTRACTION_FAILED, 'Failed'),
+    ]
+
     file = models.FileField(
         upload_to=cv_upload_path,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx', 'txt'])],
@@ -17,6 +32,11 @@ class BaseCV(models.Model):
     file_size = models.PositiveIntegerField(help_text="File size in bytes")
     content_type = models.CharField(max_length=100)
     extracted_text = models.TextField(blank=True, null=True, help_text="Extracted and potentially user-corrected text content")
+    raw_text = models.TextField(blank=True, null=True, help_text="Text extracted from the uploaded file, before any user correction")
+    content_checksum = models.CharField(max_length=64, blank=True, default='', db_index=True, help_text="SHA-256 of the file contents")
+    extraction_status = models.CharField(max_length=20, choices=EXTRACTION_STATUS_CHOICES, default=EXTRACTION_PENDING)
+    extraction_error = models.TextField(blank=True, default='')
+    extracted_at = models.DateTimeField(null=True, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -30,7 +50,9 @@ class BaseCV(models.Model):
     
     def save(self, *args, **kwargs):
         if self.file:
-            self.filename = os.path.basename(self.file.name)
+            # Keep the name the file was uploaded under; the stored file may be shared
+            if not self.filename:
+                self.filename = os.path.basename(self.file.name)
             self.file_size = self.file.size
             # Get content type from the file object
             if hasattr(self.file, 'content_type'):
@@ -43,6 +65,29 @@ class BaseCV(models.Model):
                     self.content_type = 'application/octet-stream'
         super().save(*args, **kwargs)
 
+class CVUploadSession(models.Model):
+    """Chunked, resumable upload of a CV file; becomes a BaseCV once all bytes have arrived"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField(help_text="Declared total file size in bytes")
+    offset = models.PositiveIntegerField(default=0, help_text="Bytes received so far")
+    file_format = models.CharField(max_length=10, blank=True, default='', help_text="Format sniffed from the first chunk")
+    base_cv = models.ForeignKey(BaseCV, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "CV Upload Session"
+        verbose_name_plural = "CV Upload Sessions"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.offset}/{self.size} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.base_cv_id is not None
+
 def tailored_resume_upload_path(instance, filename):
     """Generate upload path for tailored resume files"""
     return f'tailored_resumes/{filename}'
@@ -52,7 +97,18 @@ class TailoredResume(models.Model):
     job = models.ForeignKey('jobs.Job', on_delete=models.CASCADE, related_name='tailored_resumes')
     file_path = models.CharField(max_length=500)
     tailored_content = models.TextField()
+    structured_content = models.JSONField(null=True, blank=True, help_text="Sections of a structured (JSON) model reply, rendered instead of re-parsing tailored_content")
+    pdf_size = models.PositiveIntegerField(null=True, blank=True, help_text="Bytes of the rendered PDF in the default template (empty until first rendered)")
+    # Model usage for the call that produced this resume (empty when served from cache)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    cached_prompt_tokens = models.PositiveIntegerField(null=True, blank=True, help_text="Prompt tokens served from the provider's prompt cache")
+    llm_latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    # Set on revisions produced by editing an earlier tailored resume
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='revisions')
+    revision_feedback = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Tailored Resume"
@@ -61,3 +117,66 @@ class TailoredResume(models.Model):
     
     def __str__(self):
         return f"Tailored Resume for {self.job.title} at {self.job.company.name}"
+
+
+class TailoringTask(models.Model):
+    """Tailoring request submitted in async mode and executed by a worker"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    FINISHED_STATUSES = (STATUS_DONE, STATUS_FAILED)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    company = models.CharField(max_length=255)
+    job_description = models.TextField()
+    additional_feedback = models.TextField(blank=True, default='')
+    cv_text = models.TextField()
+    regenerate = models.BooleanField(default=False, help_text="Bypass the tailoring cache")
+    tailored_resume = models.ForeignKey(
+        TailoredResume, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks'
+    )
+    file_path = models.CharField(max_length=500, blank=True, default='')
+    tailored_content = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tailoring Task"
+        verbose_name_plural = "Tailoring Tasks"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Tailoring task {self.id} for {self.company} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+
+class TailoringCacheEntry(models.Model):
+    """Cached model output keyed by a hash of everything that shapes the prompt"""
+    key = models.CharField(max_length=64, unique=True)
+    tailored_content = models.TextField()
+    model_name = models.CharField(max_length=100)
+    prompt_version = models.PositiveIntegerField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Tailoring Cache Entry"
+        verbose_name_plural = "Tailoring Cache Entries"
+        ordering = ['-last_used_at']
+
+    def __str__(self):
+        return f"Tailoring cache entry {self.key[:12]} ({self.hit_count} hits)"
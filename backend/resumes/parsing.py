@@ -0,0 +1,219 @@
+"""Heuristic parsing of free-form resume text into structured sections
+
+Each line is lower-cased once and classified in a single pass. Section
+keywords are found with one precompiled pattern, and only in lines shaped
+like a header (upper case, bold or at most three words), so body text is
+never scanned for them.
+"""
+import re
+
+
+# Common section keywords
+SECTION_KEYWORDS = {
+    'summary': ['summary', 'profile', 'objective', 'overview'],
+    'experience': ['experience', 'work', 'employment', 'career'],
+    'education': ['education', 'academic', 'degree'],
+    'skills': ['skills', 'competencies', 'technologies', 'technical'],
+    'projects': ['projects', 'portfolio'],
+    'certifications': ['certifications', 'certificates', 'licenses']
+}
+
+# Keyword -> section, and section -> position in SECTION_KEYWORDS (earlier sections win ties)
+_KEYWORD_SECTIONS = {keyword: section for section, keywords in SECTION_KEYWORDS.items() for keyword in keywords}
+_SECTION_ORDER = {section: index for index, section in enumerate(SECTION_KEYWORDS)}
+
+# Zero-width so overlapping keywords ("overwork") are all found; no keyword is a prefix of
+# one from another section, so one match per position is enough
+_KEYWORD_RE = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in _KEYWORD_SECTIONS) + '))')
+
+_ADDRESS_RE = re.compile('street|ave|rd|blvd|city|state')
+_DATE_RE = re.compile(r'\d{4}[-–]\d{4}|\d{4}[-–]Present|Present|\d{4}')
+_SKILL_SEPARATORS_RE = re.compile('[•,-]')
+
+
+def _keyword_section(lower_line):
+    """The first section, in SECTION_KEYWORDS order, with a keyword anywhere in a lower-cased line"""
+    found = _KEYWORD_RE.findall(lower_line)
+    if not found:
+        return None
+    return min((_KEYWORD_SECTIONS[keyword] for keyword in found), key=_SECTION_ORDER.__getitem__)
+
+
+def _header_section(line, lower_line):
+    # The shape test is cheap and rules out most lines before any keyword is looked for
+    if line.isupper() or line.startswith('**') or len(line.split()) <= 3:
+        return _keyword_section(lower_line)
+    return None
+
+
+def match_section_header(line):
+    """Return the section a header line introduces, or None if it is not a header"""
+    return _header_section(line, line.lower())
+
+
+def _is_contact_line(line, lower_line):
+    return (
+        '@' in line or
+        ('(' in line or '-' in line) and any(map(str.isdigit, line)) or
+        _ADDRESS_RE.search(lower_line) is not None
+    )
+
+
+def parse_resume_sections(lines):
+    """Parse resume text into structured sections"""
+    sections = {}
+    current_section = None
+    current_content = []
+
+    name_found = False
+    contact_info = []
+
+    for line in lines:
+        if not line:
+            continue
+
+        lower_line = line.lower()
+
+        # First non-empty line without a section keyword is likely the name
+        if not name_found and _KEYWORD_RE.search(lower_line) is None:
+            sections['name'] = line
+            name_found = True
+            continue
+
+        # Detect contact information (email, phone, address)
+        if not current_section and _is_contact_line(line, lower_line):
+            contact_info.append(line)
+            continue
+
+        # Detect section headers
+        section = _header_section(line, lower_line)
+        if section:
+            # Save previous section
+            if current_section and current_content:
+                sections[current_section] = _process_section_content(current_section, current_content)
+
+            current_section = section
+            current_content = []
+        else:
+            if current_section:
+                current_content.append(line)
+            elif contact_info:
+                # If we have contact info, this might be additional contact details
+                if len(contact_info) < 3:  # Limit contact info lines
+                    contact_info.append(line)
+
+    # Save the last section
+    if current_section and current_content:
+        sections[current_section] = _process_section_content(current_section, current_content)
+
+    # Add contact info if found
+    if contact_info:
+        sections['contact'] = contact_info
+
+    return sections
+
+
+def _process_section_content(section_type, content):
+    """Process content based on section type"""
+    if section_type == 'experience':
+        return parse_experience_entries(content)
+    elif section_type == 'education':
+        return parse_education_entries(content)
+    elif section_type == 'projects':
+        return parse_project_entries(content)
+    elif section_type == 'skills':
+        # Join skills and split by common delimiters
+        skills_text = ' '.join(content)
+        skills = [skill.strip() for skill in _SKILL_SEPARATORS_RE.split(skills_text) if skill.strip()]
+        return skills
+    else:
+        # For summary and other sections, return as list
+        return content
+
+
+def parse_experience_entries(content):
+    """Parse experience section into structured entries"""
+    entries = []
+    current_entry = {}
+
+    for line in content:
+        # Check if line contains job title and company (usually bold or structured)
+        if '|' in line or (' at ' in line and not line.startswith(('•', '-'))):
+            # Save previous entry
+            if current_entry:
+                entries.append(current_entry)
+
+            # Parse new entry
+            current_entry = {}
+            parts = line.split('|') if '|' in line else line.split(' at ')
+            current_entry['title'] = parts[0].strip()
+            if len(parts) > 1:
+                company_and_date = parts[1].strip()
+                # Try to extract dates (look for years)
+                dates = _DATE_RE.search(company_and_date)
+                if dates:
+                    current_entry['dates'] = dates.group()
+                    current_entry['company'] = _DATE_RE.sub('', company_and_date).strip(' |-')
+                else:
+                    current_entry['company'] = company_and_date
+        elif line.startswith(('•', '-', '*')):
+            # Bullet point - add to current entry description
+            if 'description' not in current_entry:
+                current_entry['description'] = []
+            bullet_text = line.lstrip('•-* ').strip()
+            if bullet_text:
+                current_entry['description'].append(bullet_text)
+        elif current_entry and not line.strip().isupper():
+            # Continuation of description or additional info
+            if 'description' not in current_entry:
+                current_entry['description'] = []
+            current_entry['description'].append(line)
+
+    # Add last entry
+    if current_entry:
+        entries.append(current_entry)
+
+    return entries
+
+
+def parse_education_entries(content):
+    """Parse education section"""
+    entries = []
+    for line in content:
+        if line and not line.startswith('•'):
+            entry = {}
+            # Try to parse degree | school | year format
+            if '|' in line:
+                parts = [part.strip() for part in line.split('|')]
+                entry['degree'] = parts[0]
+                if len(parts) > 1:
+                    entry['school'] = parts[1]
+                if len(parts) > 2:
+                    entry['year'] = parts[2]
+            else:
+                entry['degree'] = line
+            entries.append(entry)
+    return entries
+
+
+def parse_project_entries(content):
+    """Parse projects section"""
+    entries = []
+    current_project = {}
+
+    for line in content:
+        if line and not line.startswith(('•', '-')):
+            # New project
+            if current_project:
+                entries.append(current_project)
+            current_project = {'name': line, 'description': []}
+        elif line.startswith(('•', '-')) and current_project:
+            # Project description
+            desc = line.lstrip('•- ').strip()
+            if desc:
+                current_project['description'].append(desc)
+
+    if current_project:
+        entries.append(current_project)
+
+    return entries
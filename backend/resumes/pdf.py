@@ -0,0 +1,178 @@
+"""PDF rendering of tailored resumes with ReportLab
+
+PDFs are rendered into memory, in a pool of render processes when
+PDF_RENDER_WORKERS is set (see pdf_render). The bytes can go straight back
+to the client while the file is written to MEDIA_ROOT by a background
+thread; until that write lands, pending_pdf() serves the bytes from memory.
+
+Rendered files are cached under a hash of the resume text and
+PDF_TEMPLATE_VERSION, so identical content is rendered once and, with
+PDF_LAZY_RENDERING, only when somebody first opens it.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .parsing import parse_resume_sections
+from .pdf_render import DEFAULT_TEMPLATE, render_sections, require_template
+
+# Bump whenever pdf_render changes the output of an existing template so cached PDFs are not reused
+PDF_TEMPLATE_VERSION = 3
+
+# How long the layout report of a rendered PDF (page count, fit adjustments) is remembered
+PDF_LAYOUT_CACHE_TIMEOUT = 30 * 24 * 3600
+
+_PAGE_OBJECT_RE = re.compile(rb'/Type\s*/Page(?!s)')
+
+PDF_WRITER_THREADS = 2
+
+# Relative path -> PDF bytes for files queued for writing but not yet on disk
+_pending_writes = {}
+_pending_lock = threading.Lock()
+_writer = None
+
+
+def render_key(tailored_resume, template=DEFAULT_TEMPLATE, sections=None):
+    """Hex SHA-256 identifying the PDF of some resume text in a template, fitted to PDF_FIT_PAGES
+
+    Structured sections lay out differently from the parsed text, so a
+    resume rendered from them gets its own key.
+    """
+    payload = f"{PDF_TEMPLATE_VERSION}\n{template}\n{settings.PDF_FIT_PAGES}\n{tailored_resume}"
+    if sections is not None:
+        payload += '\n' + json.dumps(sections, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def rendered_pdf_path(tailored_resume, template=DEFAULT_TEMPLATE, sections=None):
+    """Relative storage path of the (possibly not yet rendered) PDF of some resume text"""
+    return os.path.join('tailored_resumes', 'rendered', f"{render_key(tailored_resume, template, sections)}.pdf")
+
+
+def render_resume_pdf(tailored_resume, sections=None, template=DEFAULT_TEMPLATE):
+    """Render a tailored resume in memory; returns (PDF bytes, layout) as pdf_render.build_pdf does"""
+    # Parse the tailored resume text into structured sections unless the
+    # caller already has them (e.g. from structured model output)
+    if sections is None:
+        lines = [line.strip() for line in tailored_resume.split('\n')]
+        sections = parse_resume_sections(lines)
+
+    return render_sections(
+        sections,
+        template=template,
+        max_pages=settings.PDF_FIT_PAGES,
+        workers=settings.PDF_RENDER_WORKERS,
+        timeout=settings.PDF_RENDER_TIMEOUT,
+        memory_limit_mb=settings.PDF_WORKER_MEMORY_MB
+    )
+
+
+def _get_writer():
+    global _writer
+    with _pending_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=PDF_WRITER_THREADS, thread_name_prefix='pdf-writer')
+        return _writer
+
+
+def _write_pdf(relative_path, data):
+    """Write PDF bytes under MEDIA_ROOT atomically, so readers never see a partial file"""
+    file_path = os.path.join(settings.MEDIA_ROOT, relative_path)
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(temp_path, 'wb') as pdf_file:
+            pdf_file.write(data)
+        os.replace(temp_path, file_path)
+    finally:
+        with _pending_lock:
+            _pending_writes.pop(relative_path, None)
+
+
+def _write_pdf_in_background(relative_path, data):
+    try:
+        _write_pdf(relative_path, data)
+    except Exception as e:
+        print(f"Warning: Could not write tailored resume {relative_path}: {e}")
+
+
+def store_pdf(relative_path, data):
+    """Write PDF bytes to MEDIA_ROOT, in a background thread when PDF_ASYNC_WRITES is on"""
+    if not settings.PDF_ASYNC_WRITES:
+        _write_pdf(relative_path, data)
+        return
+    # Served from memory by pending_pdf until the file is on disk
+    with _pending_lock:
+        _pending_writes[relative_path] = data
+    _get_writer().submit(_write_pdf_in_background, relative_path, data)
+
+
+def pending_pdf(relative_path):
+    """Bytes of a PDF that is still being written by this process, or None"""
+    with _pending_lock:
+        return _pending_writes.get(relative_path)
+
+
+def get_rendered_pdf(tailored_resume, sections=None, template=DEFAULT_TEMPLATE):
+    """Return (relative_path, pdf_bytes) for some resume text, rendering it only if no cached copy exists
+
+    sections may carry the already-structured resume (e.g. structured model
+    output) so the text does not have to be parsed again.
+    """
+    require_template(template)
+    relative_path = rendered_pdf_path(tailored_resume, template, sections)
+    data = pending_pdf(relative_path)
+    if data is not None:
+        return relative_path, data
+    try:
+        with open(os.path.join(settings.MEDIA_ROOT, relative_path), 'rb') as pdf_file:
+            return relative_path, pdf_file.read()
+    except FileNotFoundError:
+        pass
+
+    try:
+        data, layout = render_resume_pdf(tailored_resume, sections, template)
+    except Exception as e:
+        raise ValueError(f"Failed to save tailored resume: {str(e)}")
+    cache.set(_layout_cache_key(relative_path), layout, PDF_LAYOUT_CACHE_TIMEOUT)
+    store_pdf(relative_path, data)
+    return relative_path, data
+
+
+def _layout_cache_key(relative_path):
+    return f'pdf_layout:{relative_path}'
+
+
+def pdf_layout(relative_path, data):
+    """Layout report of a rendered PDF: 'pages', plus 'natural_pages' and 'adjustments' when known
+
+    The full report is kept from render time; for PDFs rendered elsewhere or
+    long ago only the page count, read from the bytes, is available.
+    """
+    layout = cache.get(_layout_cache_key(relative_path))
+    if layout is None:
+        layout = {'pages': len(_PAGE_OBJECT_RE.findall(data))}
+    return layout
+
+
+def load_tailored_pdf(file_path, tailored_resume, template=DEFAULT_TEMPLATE, sections=None):
+    """(relative_path, pdf_bytes) of a saved tailored resume in a template, rendering it on first use
+
+    Resumes saved before rendering was cached keep their own file for the
+    default template; everything else comes from the render cache. sections
+    are the resume's stored structured_content, if any.
+    """
+    if template == DEFAULT_TEMPLATE and file_path and not file_path.startswith(os.path.join('tailored_resumes', 'rendered')):
+        try:
+            with open(os.path.join(settings.MEDIA_ROOT, file_path), 'rb') as pdf_file:
+                return file_path, pdf_file.read()
+        except FileNotFoundError:
+            pass
+    return get_rendered_pdf(tailored_resume, sections, template)
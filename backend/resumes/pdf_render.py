@@ -0,0 +1,505 @@
+"""ReportLab layout of structured resumes, in-process or in a render process pool
+
+ReportLab's document build is CPU-bound pure Python and holds the GIL, so
+under a threaded server one render stalls every other request in the
+process. render_sections() hands the parsed sections (plain dicts, lists and
+strings, so they pickle cheaply) to a pool of worker processes instead. Like
+pdf_text, this module imports nothing from Django so that the 'spawn'ed
+workers only need ReportLab.
+
+Each look is a template in TEMPLATES. Its styles are built the first time a
+process uses it and shared by every later render, rather than rebuilt per
+document.
+
+Output is kept small: content streams are Flate-compressed without
+ReportLab's default ASCII85 layer, and the document info carries the
+candidate's name instead of placeholder values. The templates only use the
+standard PDF fonts, which viewers supply, so no font data is embedded.
+"""
+import io
+import multiprocessing
+import threading
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+
+from . import worker_pool
+
+# ASCII85 only keeps streams 7-bit clean, which neither disk nor HTTP needs, and
+# makes every compressed stream a quarter larger; it is read at build time, so
+# this covers the render workers too as they import this module
+rl_config.useA85 = 0
+
+# Name of the render pool in worker_pool
+POOL = 'pdf_render'
+
+# Recycle render processes periodically so ReportLab's caches do not grow without bound
+WORKER_MAX_TASKS = 200
+
+DEFAULT_TEMPLATE = 'classic'
+
+# Template name -> function building its styles and page layout
+TEMPLATES = {}
+
+# Ways to tighten an overflowing resume, mildest first: (spacing scale, font scale, margin in inches or None)
+FIT_STEPS = [
+    (0.75, 1.0, None),
+    (0.5, 1.0, None),
+    (0.5, 1.0, 0.6),
+    (0.4, 0.95, 0.5),
+    (0.3, 0.9, 0.5),
+    (0.25, 0.85, 0.4),
+]
+# Fitting never shrinks text below this size (points)
+MIN_FIT_FONT_SIZE = 8
+
+# Template name (or (name, fit step)) -> built template, for this process
+_built_templates = {}
+_templates_lock = threading.Lock()
+
+# Renders submitted to the pool and not yet returned, and running totals
+_stats = {
+    'queued': 0, 'peak_queued': 0, 'pool_renders': 0, 'in_process_renders': 0, 'timeouts': 0, 'failures': 0,
+    'fitted': 0, 'overflowing': 0,
+}
+_stats_lock = threading.Lock()
+
+
+def register_template(name):
+    """Register the decorated function as the builder of a resume template
+
+    The builder returns a dict with 'pagesize', 'margin' (points, all four
+    sides), 'entry_gap' (points after each experience entry),
+    'section_header' (markup around a {title} placeholder) and 'styles',
+    ParagraphStyles keyed 'name', 'contact', 'section_header', 'subsection',
+    'body' and 'bullet'. It runs once per process; every
+    render then shares what it built.
+    """
+    def decorator(func):
+        TEMPLATES[name] = func
+        return func
+    return decorator
+
+
+def require_template(name):
+    """Raise ValueError if no template of that name is registered"""
+    if name not in TEMPLATES:
+        raise ValueError(f"Unknown resume template '{name}' (available: {', '.join(sorted(TEMPLATES))})")
+
+
+def get_template(name=DEFAULT_TEMPLATE):
+    """Return a template's layout and styles, building them on first use in this process"""
+    template = _built_templates.get(name)
+    if template is not None:
+        return template
+    require_template(name)
+    with _templates_lock:
+        if name not in _built_templates:
+            _built_templates[name] = TEMPLATES[name]()
+        return _built_templates[name]
+
+
+@register_template('classic')
+def classic_template():
+    """Centred header, navy underlined section titles, justified body"""
+    name_style = ParagraphStyle(
+        'NameStyle',
+        fontSize=20,
+        textColor=colors.HexColor('#2E4057'),
+        spaceAfter=4,
+        alignment=TA_CENTER,
+        fontName='Helvetica-Bold'
+    )
+
+    contact_style = ParagraphStyle(
+        'ContactStyle',
+        fontSize=10,
+        textColor=colors.HexColor('#666666'),
+        spaceAfter=20,
+        alignment=TA_CENTER,
+        fontName='Helvetica'
+    )
+
+    section_header_style = ParagraphStyle(
+        'SectionHeaderStyle',
+        fontSize=14,
+        textColor=colors.HexColor('#2E4057'),
+        spaceAfter=8,
+        spaceBefore=16,
+        fontName='Helvetica-Bold',
+        borderWidth=0,
+        borderColor=colors.HexColor('#2E4057'),
+        underlineProportion=0.3,
+        underlineGap=2
+    )
+
+    subsection_style = ParagraphStyle(
+        'SubsectionStyle',
+        fontSize=11,
+        textColor=colors.black,
+        spaceAfter=4,
+        spaceBefore=8,
+        fontName='Helvetica-Bold'
+    )
+
+    body_style = ParagraphStyle(
+        'BodyStyle',
+        fontSize=10,
+        textColor=colors.black,
+        spaceAfter=6,
+        leading=14,
+        fontName='Helvetica',
+        alignment=TA_JUSTIFY
+    )
+
+    bullet_style = ParagraphStyle(
+        'BulletStyle',
+        fontSize=10,
+        textColor=colors.black,
+        spaceAfter=4,
+        leading=14,
+        fontName='Helvetica',
+        leftIndent=20,
+        bulletIndent=10
+    )
+
+    return {
+        'pagesize': letter,
+        'margin': 0.75*inch,
+        'entry_gap': 6,
+        'section_header': '<u>{title}</u>',
+        'styles': {
+            'name': name_style,
+            'contact': contact_style,
+            'section_header': section_header_style,
+            'subsection': subsection_style,
+            'body': body_style,
+            'bullet': bullet_style,
+        },
+    }
+
+
+@register_template('modern')
+def modern_template():
+    """Left-aligned header, teal section titles without underline, ragged-right body"""
+    accent = colors.HexColor('#0F766E')
+    return {
+        'pagesize': letter,
+        'margin': 0.7*inch,
+        'entry_gap': 6,
+        'section_header': '{title}',
+        'styles': {
+            'name': ParagraphStyle('ModernName', fontSize=22, leading=26, textColor=colors.HexColor('#1F2937'),
+                                   spaceAfter=2, fontName='Helvetica-Bold'),
+            'contact': ParagraphStyle('ModernContact', fontSize=9.5, textColor=colors.HexColor('#4B5563'),
+                                      spaceAfter=14, fontName='Helvetica'),
+            'section_header': ParagraphStyle('ModernSectionHeader', fontSize=11.5, textColor=accent,
+                                             spaceBefore=12, spaceAfter=6, fontName='Helvetica-Bold'),
+            'subsection': ParagraphStyle('ModernSubsection', fontSize=10.5, textColor=colors.black,
+                                         spaceBefore=6, spaceAfter=2, fontName='Helvetica-Bold'),
+            'body': ParagraphStyle('ModernBody', fontSize=10, leading=13.5, textColor=colors.black,
+                                   spaceAfter=6, fontName='Helvetica'),
+            'bullet': ParagraphStyle('ModernBullet', fontSize=10, leading=13.5, textColor=colors.black,
+                                     spaceAfter=2, fontName='Helvetica', leftIndent=14, bulletIndent=6),
+        },
+    }
+
+
+@register_template('compact')
+def compact_template():
+    """Times, smaller type and narrow margins, for fitting long resumes on fewer pages"""
+    return {
+        'pagesize': letter,
+        'margin': 0.5*inch,
+        'entry_gap': 4,
+        'section_header': '<u>{title}</u>',
+        'styles': {
+            'name': ParagraphStyle('CompactName', fontSize=16, leading=19, spaceAfter=2,
+                                   alignment=TA_CENTER, fontName='Times-Bold'),
+            'contact': ParagraphStyle('CompactContact', fontSize=9, textColor=colors.HexColor('#444444'),
+                                      spaceAfter=8, alignment=TA_CENTER, fontName='Times-Roman'),
+            'section_header': ParagraphStyle('CompactSectionHeader', fontSize=11, spaceBefore=8, spaceAfter=4,
+                                             fontName='Times-Bold'),
+            'subsection': ParagraphStyle('CompactSubsection', fontSize=10, spaceBefore=4, spaceAfter=2,
+                                         fontName='Times-Bold'),
+            'body': ParagraphStyle('CompactBody', fontSize=9.5, leading=11.5, spaceAfter=3,
+                                   fontName='Times-Roman', alignment=TA_JUSTIFY),
+            'bullet': ParagraphStyle('CompactBullet', fontSize=9.5, leading=11.5, spaceAfter=1,
+                                     fontName='Times-Roman', leftIndent=14, bulletIndent=6),
+        },
+    }
+
+
+def build_story(sections, template):
+    """Build the ReportLab flowables for a structured resume with a built template
+
+    sections has the shape returned by parse_resume_sections: 'name',
+    'contact' (list of lines), 'summary' and 'skills' (lists of strings),
+    'experience', 'education' and 'projects' (lists of entry dicts), plus any
+    other section as a list of items.
+    """
+    styles = template['styles']
+
+    def section_header(title):
+        return Paragraph(template['section_header'].format(title=title), styles['section_header'])
+
+    story = []
+
+    # Header - Name and Contact Info
+    if 'name' in sections:
+        story.append(Paragraph(sections['name'], styles['name']))
+
+    if 'contact' in sections:
+        contact_info = ' | '.join(sections['contact'])
+        story.append(Paragraph(contact_info, styles['contact']))
+
+    # Professional Summary
+    if 'summary' in sections:
+        story.append(section_header('PROFESSIONAL SUMMARY'))
+        summary_text = ' '.join(sections['summary'])
+        story.append(Paragraph(summary_text, styles['body']))
+
+    # Skills Section with organized layout
+    if 'skills' in sections:
+        story.append(section_header('CORE COMPETENCIES'))
+        skills_text = ', '.join(sections['skills'])
+        story.append(Paragraph(skills_text, styles['body']))
+
+    # Experience Section with proper formatting
+    if 'experience' in sections:
+        story.append(section_header('PROFESSIONAL EXPERIENCE'))
+        for exp in sections['experience']:
+            if 'title' in exp and 'company' in exp:
+                title_company = f"<b>{exp['title']}</b> | {exp['company']}"
+                if 'dates' in exp:
+                    title_company += f" | {exp['dates']}"
+                story.append(Paragraph(title_company, styles['subsection']))
+
+            if 'description' in exp:
+                for bullet in exp['description']:
+                    story.append(Paragraph(f"• {bullet}", styles['bullet']))
+
+            story.append(Spacer(1, template['entry_gap']))
+
+    # Education Section
+    if 'education' in sections:
+        story.append(section_header('EDUCATION'))
+        for edu in sections['education']:
+            edu_text = f"<b>{edu.get('degree', '')}</b>"
+            if 'school' in edu:
+                edu_text += f" | {edu['school']}"
+            if 'year' in edu:
+                edu_text += f" | {edu['year']}"
+            story.append(Paragraph(edu_text, styles['body']))
+
+    # Projects Section
+    if 'projects' in sections:
+        story.append(section_header('KEY PROJECTS'))
+        for project in sections['projects']:
+            if isinstance(project, dict):
+                if 'name' in project:
+                    story.append(Paragraph(f"<b>{project['name']}</b>", styles['subsection']))
+                if 'description' in project:
+                    for desc in project['description']:
+                        story.append(Paragraph(f"• {desc}", styles['bullet']))
+            else:
+                story.append(Paragraph(f"• {project}", styles['bullet']))
+
+    # Additional sections (Certifications, etc.)
+    for section_name, section_content in sections.items():
+        if section_name not in ['name', 'contact', 'summary', 'skills', 'experience', 'education', 'projects']:
+            story.append(section_header(section_name.upper()))
+            if isinstance(section_content, list):
+                for item in section_content:
+                    story.append(Paragraph(f"• {item}", styles['bullet']))
+            else:
+                story.append(Paragraph(str(section_content), styles['body']))
+
+    return story
+
+
+def tightened_template(name, step):
+    """A template with FIT_STEPS[step] applied to its spacing, type size and margins, built once per process"""
+    key = (name, step)
+    template = _built_templates.get(key)
+    if template is not None:
+        return template
+    base = get_template(name)
+    spacing, font_scale, margin = FIT_STEPS[step]
+    styles = {}
+    for role, style in base['styles'].items():
+        font_size = max(MIN_FIT_FONT_SIZE, style.fontSize * font_scale) if font_scale < 1 else style.fontSize
+        styles[role] = ParagraphStyle(
+            f'{style.name}Fit{step}',
+            parent=style,
+            fontSize=font_size,
+            leading=style.leading * font_size / style.fontSize,
+            spaceBefore=style.spaceBefore * spacing,
+            spaceAfter=style.spaceAfter * spacing
+        )
+    template = dict(
+        base,
+        styles=styles,
+        margin=min(base['margin'], margin * inch) if margin else base['margin'],
+        entry_gap=base['entry_gap'] * spacing
+    )
+    with _templates_lock:
+        return _built_templates.setdefault(key, template)
+
+
+def _new_document(buffer, template, title=''):
+    margin = template['margin']
+    return SimpleDocTemplate(
+        buffer,
+        pagesize=template['pagesize'],
+        rightMargin=margin,
+        leftMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin,
+        pageCompression=1,
+        # Empty rather than ReportLab's "(anonymous)"/"(unspecified)" placeholders
+        title=title,
+        author=title,
+        subject='',
+        creator=''
+    )
+
+
+def _render(sections, template):
+    """(PDF bytes, page count) of sections laid out with a built template"""
+    buffer = io.BytesIO()
+    doc = _new_document(buffer, template, sections.get('name', ''))
+    doc.build(build_story(sections, template))
+    return buffer.getvalue(), doc.page
+
+
+def story_height(sections, template):
+    """(height the story needs, height of one page's frame) in points, measured without drawing
+
+    Mirrors how a ReportLab frame stacks flowables: the space between two
+    is the larger of the first one's spaceAfter and the next one's
+    spaceBefore, and nothing is added above the first or below the last.
+    Splitting across pages is ignored, so this is an estimate.
+    """
+    doc = _new_document(io.BytesIO(), template)
+    # SimpleDocTemplate's frame has 6 points of padding on every side
+    width = doc.width - 12
+    height = 0
+    previous_after = 0
+    for index, flowable in enumerate(build_story(sections, template)):
+        _, flowable_height = flowable.wrap(width, doc.height)
+        if index:
+            height += max(flowable.getSpaceBefore(), previous_after)
+        height += flowable_height
+        previous_after = flowable.getSpaceAfter()
+    return height, doc.height - 12
+
+
+def build_pdf(sections, template_name=DEFAULT_TEMPLATE, max_pages=0):
+    """Render structured resume sections to (PDF bytes, layout); runs in a render worker when the pool is enabled
+
+    When the resume runs past max_pages (0 = no limit) it is re-laid out
+    with the mildest of FIT_STEPS that makes it fit. layout reports
+    'pages', 'natural_pages' and the 'adjustments' applied (None when the
+    template was used as is, including when even the tightest step does not
+    fit and the untouched rendering is returned).
+    """
+    template = get_template(template_name)
+    data, pages = _render(sections, template)
+    layout = {'pages': pages, 'natural_pages': pages, 'adjustments': None}
+    if not max_pages or pages <= max_pages:
+        return data, layout
+
+    def fits(step):
+        # Exact for a single page; a lower bound for more, since page breaks only waste space
+        needed, available = story_height(sections, tightened_template(template_name, step))
+        return needed <= available * max_pages
+
+    # Each step is tighter than the one before: give up early if even the last cannot fit, take the
+    # first when it does (slight overflows are the common case), else binary-search for the mildest
+    last = len(FIT_STEPS) - 1
+    if not fits(last):
+        return data, layout
+    low, high = 0, last
+    if not fits(low):
+        low = 1
+        while low < high:
+            middle = (low + high) // 2
+            if fits(middle):
+                high = middle
+            else:
+                low = middle + 1
+
+    for step in range(low, last + 1):
+        tightened = tightened_template(template_name, step)
+        fitted, fitted_pages = _render(sections, tightened)
+        if fitted_pages <= max_pages:
+            spacing, font_scale, _ = FIT_STEPS[step]
+            layout.update(pages=fitted_pages, adjustments={
+                'spacing_scale': spacing,
+                'font_scale': font_scale,
+                'margin_inches': round(tightened['margin'] / inch, 2),
+            })
+            return fitted, layout
+    return data, layout
+
+
+def _count(name, delta=1):
+    with _stats_lock:
+        _stats[name] += delta
+        if name == 'queued':
+            _stats['peak_queued'] = max(_stats['peak_queued'], _stats['queued'])
+
+
+def render_sections(sections, template=DEFAULT_TEMPLATE, max_pages=0, workers=0, timeout=None,
+                    memory_limit_mb=None):
+    """Render structured resume sections with one of TEMPLATES; returns (PDF bytes, layout) as build_pdf does
+
+    With workers > 0 the build runs in a pool of that many processes and
+    may take up to timeout seconds; with workers <= 0, or inside a daemonic
+    process (e.g. a Celery prefork worker) that may not start children, it
+    runs in the calling thread.
+    """
+    require_template(template)
+    if workers <= 0 or multiprocessing.current_process().daemon:
+        _count('in_process_renders')
+        return _counted_fit(build_pdf(sections, template, max_pages), max_pages)
+
+    _count('queued')
+    try:
+        task = worker_pool.submit(POOL, build_pdf, (sections, template, max_pages), workers, memory_limit_mb,
+                                  WORKER_MAX_TASKS)
+        result = task.get(timeout)
+    except multiprocessing.TimeoutError:
+        _count('timeouts')
+        # The stuck worker's pool has been retired; renders already running in it still finish
+        raise ValueError(f"PDF rendering timed out after {timeout}s")
+    except Exception:
+        _count('failures')
+        raise
+    finally:
+        _count('queued', -1)
+    _count('pool_renders')
+    return _counted_fit(result, max_pages)
+
+
+def _counted_fit(result, max_pages):
+    _, layout = result
+    if layout['adjustments']:
+        _count('fitted')
+    elif max_pages and layout['pages'] > max_pages:
+        _count('overflowing')
+    return result
+
+
+def render_stats():
+    """Render pool queue depth (renders waiting or running in the pool) and totals since start"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['workers'] = worker_pool.pool_size(POOL)
+    return stats
@@ -0,0 +1,175 @@
+"""Page-parallel PDF text extraction with page, size, time and memory limits
+
+Uploaded PDFs are untrusted, so with workers configured nothing parses them
+in the calling process: one worker task counts the pages (and extracts short
+documents outright), then longer documents are split into contiguous ranges
+that workers extract concurrently; page texts are collected in a list and
+joined once, in page order. Text comes from one of PDF_ENGINES (PyPDF2, or pdfplumber when it is
+installed). This module deliberately imports nothing from Django so that
+worker processes, which are started with 'spawn' (the only start method on
+Windows), only need the PDF libraries.
+"""
+import io
+import multiprocessing
+import sys
+
+import PyPDF2
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+from . import worker_pool
+
+# Name of the extraction pool in worker_pool
+POOL = 'pdf_text'
+
+# Recycle worker processes periodically so memory from large documents is returned
+WORKER_MAX_TASKS = 50
+
+
+def _pypdf2_page_count(data):
+    return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+def _pypdf2_pages(data, start, stop):
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    for index in range(start, min(stop, len(reader.pages))):
+        yield reader.pages[index].extract_text() or ''
+
+
+def _pdfplumber_page_count(data):
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfplumber_pages(data, start, stop):
+    # Orders text by its position on the page rather than by content stream order; much slower
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[start:stop]:
+            yield page.extract_text() or ''
+            page.flush_cache()
+
+
+# Engine name -> (page count, page text iterator over [start, stop))
+PDF_ENGINES = {'pypdf2': (_pypdf2_page_count, _pypdf2_pages)}
+if pdfplumber is not None:
+    PDF_ENGINES['pdfplumber'] = (_pdfplumber_page_count, _pdfplumber_pages)
+
+
+def get_engine(name):
+    """Return the (page count, page iterator) pair of a PDF engine"""
+    try:
+        return PDF_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"PDF engine '{name}' is not available (installed: {', '.join(sorted(PDF_ENGINES))})")
+
+
+def extract_page_range(data, start, stop, max_chars=None, engine='pypdf2'):
+    """Return the text of pages [start, stop) of a PDF; runs in a worker process"""
+    _, iter_pages = get_engine(engine)
+    return [text[:max_chars] if max_chars else text for text in iter_pages(data, start, stop)]
+
+
+def count_and_extract(data, max_pages=None, extract_below=0, max_chars=None, engine='pypdf2'):
+    """Return (page count, texts) of a PDF; runs in a worker process
+
+    The count is capped at max_pages. texts holds the page texts when the
+    document has fewer than extract_below pages and is None otherwise.
+    """
+    page_count, iter_pages = get_engine(engine)
+    pages = page_count(data)
+    if max_pages:
+        pages = min(pages, max_pages)
+    if pages >= extract_below:
+        return pages, None
+    return pages, _serial_texts(iter_pages, data, pages, max_chars)
+
+
+def _page_ranges(pages, workers):
+    """Split pages into at most `workers` contiguous, nearly equal ranges"""
+    chunks = min(workers, pages)
+    size, extra = divmod(pages, chunks)
+    ranges = []
+    start = 0
+    for index in range(chunks):
+        stop = start + size + (1 if index < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _join_pages(texts, max_chars=None):
+    """Join page texts with newlines, stopping once max_chars is reached"""
+    parts = []
+    total = 0
+    for text in texts:
+        if max_chars and total + len(text) >= max_chars:
+            parts.append(text[:max_chars - total])
+            break
+        parts.append(text)
+        total += len(text) + 1
+    return '\n'.join(parts).strip()
+
+
+def _serial_texts(iter_pages, data, pages, max_chars=None):
+    texts = []
+    total = 0
+    for text in iter_pages(data, 0, pages):
+        texts.append(text)
+        total += len(text)
+        if max_chars and total >= max_chars:
+            break
+    return texts
+
+
+def _wait(task, timeout, page_timeout):
+    try:
+        return task.get(timeout)
+    except multiprocessing.TimeoutError:
+        # The stuck worker's pool has been retired; other extractions in it still finish
+        raise ValueError(f"PDF text extraction timed out (limit {page_timeout}s per page)")
+
+
+def extract_pdf_text(data, workers=0, max_pages=None, max_chars=None, page_timeout=None,
+                     parallel_min_pages=4, memory_limit_mb=None, engine='pypdf2'):
+    """Return the text of a PDF given as bytes
+
+    Only the first max_pages pages are read and the result is cut at
+    max_chars. With workers >= 1 all parsing happens in worker processes
+    capped at memory_limit_mb, with page_timeout seconds per page: documents
+    under parallel_min_pages pages are counted and extracted by one task,
+    longer ones are spread over `workers` processes. With workers <= 0, or
+    inside a daemonic process (e.g. a Celery prefork worker) that may not
+    start children, the PDF is parsed in the calling thread without those
+    limits. engine is a key of PDF_ENGINES.
+    """
+    _, iter_pages = get_engine(engine)
+    if workers <= 0 or multiprocessing.current_process().daemon:
+        return _join_pages(_serial_texts(iter_pages, data, max_pages or sys.maxsize, max_chars), max_chars)
+
+    def submit(func, *args):
+        return worker_pool.submit(POOL, func, args, workers, memory_limit_mb, WORKER_MAX_TASKS)
+
+    # Counting parses the document too, so it runs under the same limits as extraction
+    first_pages = max(parallel_min_pages, 1)
+    pages, texts = _wait(
+        submit(count_and_extract, data, max_pages, parallel_min_pages, max_chars, engine),
+        page_timeout * first_pages if page_timeout else None,
+        page_timeout
+    )
+    if texts is not None:
+        return _join_pages(texts, max_chars)
+
+    ranges = _page_ranges(pages, workers)
+    tasks = [submit(extract_page_range, data, start, stop, max_chars, engine) for start, stop in ranges]
+    texts = []
+    try:
+        for (start, stop), task in zip(ranges, tasks):
+            texts.extend(_wait(task, page_timeout * (stop - start) if page_timeout else None, page_timeout))
+    finally:
+        # After a failure nobody reads the remaining ranges
+        for task in tasks:
+            task.abandon()
+    return _join_pages(texts, max_chars)
@@ -0,0 +1,239 @@
+"""Relevance-driven compaction of the CV and job description before prompting
+
+The CV is split into sections with the same header detection as the resume
+parser, job descriptions are split into paragraphs and stripped of boilerplate
+(EEO statements, benefits, application instructions), and the least relevant
+lines and paragraphs are dropped until both fit the configured token budget.
+Original order is always preserved.
+"""
+import re
+from collections import Counter
+
+from .parsing import match_section_header
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; fall back to a character estimate
+    tiktoken = None
+
+_encoding = None
+_encoding_failed = False
+
+# Lines at the top of the CV (name, contact details) that are never dropped
+HEADER_LINES_PINNED = 5
+
+# Share of the token budget the job description may use when the CV needs the rest
+JOB_DESCRIPTION_SHARE = 0.4
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#.\-]*[a-z0-9+#]|[a-z]")
+_PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be been being both but by can could did do
+does doing during each for from further had has have having he her here hers him his how i if in into
+is it its itself just me more most my no nor not of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this those through
+to too under until up very was we were what when where which while who whom why will with would you
+your yours ability able across etc including include includes using use within well work working
+""".split())
+
+# Paragraphs matching these are dropped from job descriptions outright
+BOILERPLATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r'equal (employment )?opportunity',
+    r'\beeo\b',
+    r'without regard to (race|age|sex|gender|religion)',
+    r'(race|color|religion|national origin|sexual orientation|gender identity|veteran status|disability)'
+    r'.{0,80}(race|color|religion|national origin|sexual orientation|gender identity|veteran status|disability)',
+    r'reasonable accommodation',
+    r'^\s*(benefits|perks|what we offer|why join us)\b',
+    r'\b(401\(?k\)?|dental|vision|paid time off|pto|parental leave|health insurance|stock options)\b'
+    r'.{0,120}\b(401\(?k\)?|dental|vision|paid time off|pto|parental leave|health insurance|stock options)\b',
+    r'privacy (notice|policy)',
+    r'e-?verify',
+    r'^\s*(how to apply|to apply|apply now)\b',
+    r'recruit(ing|ment) agencies',
+]]
+
+# Cues that mark job description paragraphs describing the actual role
+REQUIREMENT_CUES = ('require', 'qualif', 'responsib', 'experience', 'skill', 'must', 'you will', 'you\'ll',
+                    'proficien', 'knowledge', 'degree', 'familiar')
+
+
+def estimate_tokens(text):
+    """Count tokens with tiktoken when available, otherwise estimate ~4 characters per token"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def _get_encoding():
+    """Load the gpt-4o tokenizer once; None if tiktoken is missing or cannot load it"""
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding('o200k_base')
+        except Exception as e:
+            # The encoding file is downloaded on first use and may be unavailable offline
+            print(f"Warning: Could not load tiktoken encoding, estimating tokens instead: {e}")
+            _encoding_failed = True
+    return _encoding
+
+
+def _terms(text):
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+def is_boilerplate(paragraph):
+    return any(pattern.search(paragraph) for pattern in BOILERPLATE_PATTERNS)
+
+
+def split_cv_sections(cv_text):
+    """Split CV text into (section, lines) blocks; the header block before any section is 'header'"""
+    blocks = [('header', [])]
+    for line in cv_text.split('\n'):
+        stripped = line.strip()
+        section = match_section_header(stripped) if stripped else None
+        if section:
+            blocks.append((section, [line]))
+        else:
+            blocks[-1][1].append(line)
+    return blocks
+
+
+def _score(terms, weights):
+    """Weighted keyword overlap, normalised so long units don't win by size alone"""
+    if not terms:
+        return 0.0
+    hits = sum(weights.get(term, 0) for term in terms)
+    return hits / (len(terms) ** 0.5)
+
+
+def _fit(units, budget):
+    """Keep the highest scoring units that fit in budget; pinned units are always kept
+
+    units is a list of dicts with 'tokens', 'score' and 'pinned'. Returns the
+    set of indices to keep.
+    """
+    keep = {i for i, unit in enumerate(units) if unit['pinned']}
+    used = sum(units[i]['tokens'] for i in keep)
+    candidates = sorted(
+        (i for i, unit in enumerate(units) if not unit['pinned']),
+        key=lambda i: units[i]['score'],
+        reverse=True
+    )
+    for i in candidates:
+        if used + units[i]['tokens'] <= budget:
+            keep.add(i)
+            used += units[i]['tokens']
+    return keep
+
+
+def compact_job_description(job_description, cv_weights, budget):
+    """Strip boilerplate and keep the most role-relevant paragraphs within budget"""
+    paragraphs = [p.strip() for p in _PARAGRAPH_SPLIT_RE.split(job_description) if p.strip()]
+    separator = '\n\n'
+    if len(paragraphs) <= 1:
+        # No blank lines to split on; treat each line as a paragraph instead
+        paragraphs = [line.strip() for line in job_description.split('\n') if line.strip()]
+        separator = '\n'
+    kept = [p for p in paragraphs if not is_boilerplate(p)]
+    removed_boilerplate = len(paragraphs) - len(kept)
+
+    units = []
+    for index, paragraph in enumerate(kept):
+        lowered = paragraph.lower()
+        cue_bonus = sum(1 for cue in REQUIREMENT_CUES if cue in lowered)
+        units.append({
+            'tokens': estimate_tokens(paragraph) + 1,
+            'score': _score(_terms(paragraph), cv_weights) + cue_bonus,
+            # The opening paragraph usually carries the role title and summary
+            'pinned': index == 0,
+        })
+    keep = _fit(units, budget)
+    text = separator.join(p for i, p in enumerate(kept) if i in keep)
+    return text, removed_boilerplate, len(kept) - len(keep)
+
+
+def compact_cv(cv_text, jd_weights, budget):
+    """Keep headers and the CV lines most relevant to the job within budget"""
+    units = []
+    lines = []
+    for section, block_lines in split_cv_sections(cv_text):
+        block_terms = _terms(' '.join(block_lines))
+        section_score = _score(block_terms, jd_weights)
+        for position, line in enumerate(block_lines):
+            stripped = line.strip()
+            lines.append(line)
+            units.append({
+                'tokens': estimate_tokens(line) + 1,
+                # Line relevance plus a share of its section's relevance
+                'score': _score(_terms(stripped), jd_weights) + 0.5 * section_score,
+                # Keep name/contact lines, blank separators, and each section's
+                # header plus first entry so no section disappears entirely
+                'pinned': (position < HEADER_LINES_PINNED if section == 'header' else position <= 1) or not stripped,
+            })
+    keep = _fit(units, budget)
+    text = '\n'.join(line for i, line in enumerate(lines) if i in keep)
+    text = re.sub(r'\n{3,}', '\n\n', text).strip()
+    return text, sum(1 for i, line in enumerate(lines) if i not in keep)
+
+
+def compact_prompt_inputs(cv_text, job_description, token_budget, job_independent_cv=False):
+    """Return (cv_text, job_description, report) fitted into token_budget tokens
+
+    With job_independent_cv=True the CV is compacted first, into its own
+    share of the budget and ranked by how often its terms recur in the CV
+    rather than by relevance to the job, so the same CV compacts to the same
+    text for every job (keeping a shared prompt prefix); the job description
+    gets the rest. report['over_budget'] is set when pinned content (headers,
+    the opening paragraph) still does not fit.
+    """
+    original_cv_tokens = estimate_tokens(cv_text)
+    original_jd_tokens = estimate_tokens(job_description)
+
+    cv_weights = Counter(_terms(cv_text))
+    jd_weights = Counter(_terms(job_description))
+    # Cap per-term weight so a repeated word can't dominate the score
+    cv_weights = {term: min(count, 3) for term, count in cv_weights.items()}
+    jd_weights = {term: min(count, 3) for term, count in jd_weights.items()}
+
+    if job_independent_cv:
+        cv_budget = token_budget - int(token_budget * JOB_DESCRIPTION_SHARE)
+        if original_cv_tokens <= cv_budget:
+            new_cv, dropped_lines = cv_text, 0
+        else:
+            new_cv, dropped_lines = compact_cv(cv_text, cv_weights, cv_budget)
+        jd_budget = max(token_budget - estimate_tokens(new_cv), 0)
+        new_jd, boilerplate_paragraphs, dropped_paragraphs = compact_job_description(
+            job_description, cv_weights, jd_budget
+        )
+    else:
+        # A short CV leaves more room for the job description
+        jd_budget = max(int(token_budget * JOB_DESCRIPTION_SHARE), token_budget - original_cv_tokens)
+        new_jd, boilerplate_paragraphs, dropped_paragraphs = compact_job_description(
+            job_description, cv_weights, jd_budget
+        )
+        # The CV gets whatever the job description did not use
+        cv_budget = max(token_budget - estimate_tokens(new_jd), 0)
+        if original_cv_tokens <= cv_budget:
+            new_cv, dropped_lines = cv_text, 0
+        else:
+            new_cv, dropped_lines = compact_cv(cv_text, jd_weights, cv_budget)
+
+    compacted_tokens = estimate_tokens(new_cv) + estimate_tokens(new_jd)
+    original_tokens = original_cv_tokens + original_jd_tokens
+    report = {
+        'token_budget': token_budget,
+        'original_tokens': original_tokens,
+        'compacted_tokens': compacted_tokens,
+        'tokens_saved': original_tokens - compacted_tokens,
+        'over_budget': compacted_tokens > token_budget,
+        'boilerplate_paragraphs_removed': boilerplate_paragraphs,
+        'job_paragraphs_dropped': dropped_paragraphs,
+        'cv_lines_dropped': dropped_lines,
+        'token_counter': 'tiktoken' if _get_encoding() is not None else 'estimate',
+    }
+    return new_cv, new_jd, report
@@ -0,0 +1,109 @@
+"""Section-level assembly of tailored resumes
+
+In section mode Summary, Skills, Experience and Projects are generated by
+separate model calls; the name/contact header and Education are carried over
+from the candidate's CV. The pieces are merged in the order the PDF builder
+renders them.
+"""
+import re
+
+from .parsing import match_section_header
+from .prompting import split_cv_sections
+
+# Sections produced by their own model call
+GENERATED_SECTIONS = ('summary', 'skills', 'experience', 'projects')
+
+# Order sections appear in the merged text (same as the PDF layout)
+SECTION_ORDER = ('summary', 'skills', 'experience', 'education', 'projects')
+
+SECTION_TITLES = {
+    'summary': 'SUMMARY',
+    'skills': 'SKILLS',
+    'experience': 'EXPERIENCE',
+    'education': 'EDUCATION',
+    'projects': 'PROJECTS',
+}
+
+# Per-section instructions, written for the formats the resume parser understands
+SECTION_INSTRUCTIONS = {
+    'summary': "Write a professional summary of 2-3 sentences aimed at this role.",
+    'skills': "List the candidate's most relevant skills as a single comma-separated line.",
+    'experience': (
+        "Rewrite the work experience, most recent first. Start each role with a line "
+        "'Job Title | Company | Dates' followed by 2-4 quantified bullet points starting with '- '."
+    ),
+    'projects': (
+        "Select up to 3 projects relevant to this role. Start each with a line 'Project Name | Technologies' "
+        "followed by 1-2 bullet points starting with '- '. If the CV lists no projects, output nothing."
+    ),
+}
+
+# Completion limit per section, sized to what each section needs
+SECTION_MAX_TOKENS = {
+    'summary': 200,
+    'skills': 200,
+    'experience': 1200,
+    'projects': 500,
+}
+
+
+def section_request(section):
+    """Closing prompt asking the model for one section only"""
+    return (
+        f"\n\nWrite only the {SECTION_TITLES[section]} section of a tailored resume for this position. "
+        f"{SECTION_INSTRUCTIONS[section]} Output the section content only, without the heading or any commentary."
+    )
+
+
+def clean_section(section, text):
+    """Drop a heading the model repeated anyway, and surrounding blank lines"""
+    lines = text.strip().split('\n')
+    if lines and match_section_header(lines[0].strip().strip('*#: ')) == section:
+        lines = lines[1:]
+    return '\n'.join(lines).strip()
+
+
+def cv_section_bodies(cv_text):
+    """Return (header, bodies) from CV text: the lines before any section and each section's body"""
+    blocks = split_cv_sections(cv_text)
+    header = '\n'.join(blocks[0][1]).strip()
+    bodies = {}
+    for section, lines in blocks[1:]:
+        # Keep the first block when a section header appears twice
+        bodies.setdefault(section, '\n'.join(lines[1:]).strip())
+    return header, bodies
+
+
+def merge_sections(cv_text, generated):
+    """Assemble a resume from generated section bodies plus the CV's header and education"""
+    header, cv_bodies = cv_section_bodies(cv_text)
+    parts = [header] if header else []
+    for section in SECTION_ORDER:
+        body = generated.get(section) if section in GENERATED_SECTIONS else cv_bodies.get(section)
+        if body:
+            parts.append(f"{SECTION_TITLES[section]}\n{body}")
+    return '\n\n'.join(parts)
+
+
+def replace_section(resume_text, section, body):
+    """Return resume_text with one section's body replaced (or inserted in layout order)"""
+    blocks = split_cv_sections(resume_text)
+    new_block = (section, [SECTION_TITLES[section]] + body.split('\n') + [''])
+    for index, (name, lines) in enumerate(blocks):
+        if name == section:
+            # Keep the resume's own heading line
+            new_block[1][0] = lines[0]
+            blocks[index] = new_block
+            break
+    else:
+        position = SECTION_ORDER.index(section)
+        index = next(
+            (i for i, (name, _) in enumerate(blocks)
+             if name in SECTION_ORDER and SECTION_ORDER.index(name) > position),
+            len(blocks)
+        )
+        if index == len(blocks) and blocks[-1][1] and blocks[-1][1][-1].strip():
+            blocks[-1][1].append('')
+        blocks.insert(index, new_block)
+    text = '\n'.join(line for _, lines in blocks for line in lines)
+    return re.sub(r'\n{3,}', '\n\n', text).strip()
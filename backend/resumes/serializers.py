@@ -1,11 +1,28 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
-from .models import BaseCV, TailoredResume
+from .models import BaseCV, CVUploadSession, TailoredResume, TailoringTask
+from .extractors import detect_format
+from .pdf import rendered_pdf_path
+from .pdf_render import DEFAULT_TEMPLATE, TEMPLATES
+from .sections import GENERATED_SECTIONS
+from .structured import sections_from_text
+from .uploads import create_base_cv, start_upload_session
+
+def check_cv_format(value):
+    """Raise a validation error unless the file's content can be extracted"""
+    try:
+        detect_format(value, value.name)
+    except ValueError as e:
+        raise serializers.ValidationError(str(e))
 
 class BaseCVSerializer(serializers.ModelSerializer):
     class Meta:
         model = BaseCV
-        fields = ['id', 'filename', 'file_size', 'content_type', 'extracted_text', 'uploaded_at', 'updated_at']
-        read_only_fields = ['id', 'filename', 'file_size', 'content_type', 'uploaded_at', 'updated_at']
+        fields = ['id', 'filename', 'file_size', 'content_type', 'extracted_text', 'content_checksum',
+                  'extraction_status', 'extraction_error', 'extracted_at', 'uploaded_at', 'updated_at']
+        read_only_fields = ['id', 'filename', 'file_size', 'content_type', 'content_checksum',
+                            'extraction_status', 'extraction_error', 'extracted_at', 'uploaded_at', 'updated_at']
 
 class BaseCVUploadSerializer(serializers.ModelSerializer):
     class Meta:
@@ -26,26 +43,70 @@ class BaseCVUploadSerializer(serializers.ModelSerializer):
                 f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"
             )
         
+        # Reject files we could not extract before storing them
+        check_cv_format(value)
+        
+        return value
+    
+    def create(self, validated_data):
+        """Store identical files once; the view passes the upload's content_checksum"""
+        return create_base_cv(validated_data['file'], validated_data['content_checksum'])
+
+class CVUploadSessionSerializer(serializers.ModelSerializer):
+    """Start a chunked upload by declaring the file name and size"""
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = CVUploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'chunk_size', 'file_format', 'base_cv', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'chunk_size', 'file_format', 'base_cv', 'created_at', 'updated_at']
+    
+    def get_chunk_size(self, obj):
+        return settings.CV_UPLOAD_CHUNK_SIZE
+    
+    def validate_filename(self, value):
+        """Validate the file extension before any bytes are sent"""
+        allowed_extensions = ['pdf', 'doc', 'docx', 'txt']
+        file_extension = value.split('.')[-1].lower()
+        if file_extension not in allowed_extensions:
+            raise serializers.ValidationError(
+                f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"
+            )
+        return value
+    
+    def validate_size(self, value):
+        """Validate the declared file size (max 10MB)"""
+        if value <= 0:
+            raise serializers.ValidationError("File size must be positive")
+        if value > 10 * 1024 * 1024:
+            raise serializers.ValidationError("File size cannot exceed 10MB")
         return value
+    
+    def create(self, validated_data):
+        return start_upload_session(validated_data['filename'], validated_data['size'])
 
 class TailorResumeSerializer(serializers.Serializer):
     """Serializer for tailoring resume endpoint"""
-    cv = serializers.FileField(required=False, help_text="Upload your CV (PDF or TXT)")
+    cv = serializers.FileField(required=False, help_text="Upload your CV (PDF, DOCX, DOC or TXT)")
     cv_text = serializers.CharField(required=False, help_text="CV text content (alternative to file upload)")
+    base_cv = serializers.PrimaryKeyRelatedField(queryset=BaseCV.objects.all(), required=False, help_text="Previously uploaded base CV (alternative to file upload)")
     company = serializers.CharField(max_length=255, help_text="Target company name")
     job_description = serializers.CharField(help_text="Full job description")
     additional_feedback = serializers.CharField(required=False, allow_blank=True, help_text="Additional feedback for resume tailoring")
+    regenerate = serializers.BooleanField(required=False, default=False, help_text="Ignore any cached result and call the model again")
+    run_async = serializers.BooleanField(required=False, default=False, help_text="Queue the job and return a task id instead of waiting for the result")
+    response_format = serializers.ChoiceField(choices=['json', 'pdf'], required=False, default='json', help_text="'pdf' returns the rendered PDF itself instead of JSON")
+    template = serializers.ChoiceField(choices=sorted(TEMPLATES), required=False, default=DEFAULT_TEMPLATE, help_text="PDF template for response_format=pdf and the returned pdf_url")
     
     def validate(self, data):
-        """Ensure either cv file or cv_text is provided, but not both"""
-        cv = data.get('cv')
-        cv_text = data.get('cv_text')
+        """Ensure exactly one of cv file, cv_text or base_cv is provided"""
+        provided = [field for field in ('cv', 'cv_text', 'base_cv') if data.get(field)]
         
-        if not cv and not cv_text:
-            raise serializers.ValidationError("Either 'cv' file or 'cv_text' must be provided")
+        if not provided:
+            raise serializers.ValidationError("Either 'cv' file, 'cv_text' or 'base_cv' must be provided")
         
-        if cv and cv_text:
-            raise serializers.ValidationError("Provide either 'cv' file or 'cv_text', not both")
+        if len(provided) > 1:
+            raise serializers.ValidationError("Provide only one of 'cv' file, 'cv_text' or 'base_cv'")
         
         return data
     
@@ -56,13 +117,15 @@ class TailorResumeSerializer(serializers.Serializer):
             raise serializers.ValidationError("File size cannot exceed 10MB")
         
         # Check file extension
-        allowed_extensions = ['pdf', 'txt']
+        allowed_extensions = ['pdf', 'doc', 'docx', 'txt']
         file_extension = value.name.split('.')[-1].lower()
         if file_extension not in allowed_extensions:
             raise serializers.ValidationError(
                 f"File type not supported. Allowed types: {', '.join(allowed_extensions)}"
             )
         
+        check_cv_format(value)
+        
         return value
     
     def validate_company(self, value):
@@ -77,11 +140,63 @@ class TailorResumeSerializer(serializers.Serializer):
             raise serializers.ValidationError("Job description cannot be empty")
         return value.strip()
 
+class BatchTailorSerializer(serializers.Serializer):
+    """Serializer for tailoring one base CV against many jobs"""
+    base_cv = serializers.PrimaryKeyRelatedField(queryset=BaseCV.objects.all(), help_text="Base CV to tailor")
+    job_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, help_text="Jobs to tailor the CV for")
+    additional_feedback = serializers.CharField(required=False, allow_blank=True, help_text="Additional feedback applied to every job")
+    regenerate = serializers.BooleanField(required=False, default=False, help_text="Ignore any cached result and call the model again")
+    
+    def validate_job_ids(self, value):
+        """Drop duplicates and enforce the batch size limit"""
+        job_ids = list(dict.fromkeys(value))
+        if len(job_ids) > settings.TAILORING_BATCH_MAX_JOBS:
+            raise serializers.ValidationError(
+                f"A batch can contain at most {settings.TAILORING_BATCH_MAX_JOBS} jobs"
+            )
+        return job_ids
+
 class TailoredResumeSerializer(serializers.ModelSerializer):
     job_title = serializers.CharField(source='job.title', read_only=True)
     company_name = serializers.CharField(source='job.company.name', read_only=True)
+    pdf_url = serializers.SerializerMethodField()
     
     class Meta:
         model = TailoredResume
-        fields = ['id', 'job', 'job_title', 'company_name', 'file_path', 'tailored_content', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        fields = ['id', 'job', 'job_title', 'company_name', 'file_path', 'pdf_url', 'pdf_size', 'tailored_content', 'structured_content',
+                  'prompt_tokens', 'completion_tokens', 'cached_prompt_tokens', 'llm_latency_ms',
+                  'parent', 'revision_feedback', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'pdf_size', 'structured_content', 'prompt_tokens', 'completion_tokens', 'cached_prompt_tokens',
+                            'llm_latency_ms',
+                            'parent', 'revision_feedback', 'created_at', 'updated_at']
+    
+    def get_pdf_url(self, obj):
+        """Endpoint that renders the PDF on first use (file_path may not exist yet)"""
+        return reverse('tailoredresume-view', kwargs={'pk': obj.pk})
+    
+    def update(self, instance, validated_data):
+        """Keep structured_content and the PDF in step with edited tailored_content"""
+        content = validated_data.get('tailored_content')
+        if content is not None and content != instance.tailored_content:
+            # Sections that no longer describe the text are dropped, so the edit is what gets rendered
+            sections = sections_from_text(content, instance.structured_content)
+            validated_data['structured_content'] = sections
+            validated_data['file_path'] = rendered_pdf_path(content, sections=sections)
+            validated_data['pdf_size'] = None
+        return super().update(instance, validated_data)
+
+class ReviseTailoredResumeSerializer(serializers.Serializer):
+    feedback = serializers.CharField(help_text="What to change in the existing tailored resume")
+
+class RegenerateSectionSerializer(serializers.Serializer):
+    """Serializer for regenerating one section of a tailored resume"""
+    section = serializers.ChoiceField(choices=GENERATED_SECTIONS, help_text="Section to regenerate")
+    base_cv = serializers.PrimaryKeyRelatedField(queryset=BaseCV.objects.all(), required=False, help_text="Base CV to generate from (defaults to the tailored resume itself)")
+    additional_feedback = serializers.CharField(required=False, allow_blank=True, help_text="Additional feedback for this section")
+
+class TailoringTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TailoringTask
+        fields = ['id', 'status', 'company', 'tailored_resume', 'file_path', 'tailored_content',
+                  'error', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
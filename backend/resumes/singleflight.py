@@ -0,0 +1,68 @@
+"""Coalescing of identical in-flight work
+
+SingleFlight shares one computation between threads of a process that ask for
+the same key at the same time. distributed_lock uses the Django cache so that
+workers in different processes can tell when one of them is already busy with
+a key (shared across processes only when CACHES points at a shared backend
+such as Redis).
+"""
+import threading
+import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+
+class SingleFlight:
+    """Run fn once per key at a time; concurrent callers with the same key share the result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True if another caller computed it"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+@contextmanager
+def distributed_lock(name, timeout):
+    """Try to take a cache-backed lock; yields whether it was acquired (never blocks)"""
+    lock_key = f'lock:{name}'
+    token = uuid.uuid4().hex
+    acquired = cache.add(lock_key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        # Only release the lock if it is still ours (it may have expired and been retaken)
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def is_locked(name):
+    return cache.get(f'lock:{name}') is not None
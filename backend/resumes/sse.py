@@ -0,0 +1,32 @@
+"""Helpers for server-sent event (text/event-stream) responses"""
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF accept `Accept: text/event-stream` and render errors as a single event"""
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
+
+
+def format_event(event, data):
+    """Format one SSE message; dict/list payloads are sent as JSON"""
+    if not isinstance(data, str):
+        data = json.dumps(data, default=str)
+    lines = ''.join(f"data: {line}\n" for line in data.split('\n'))
+    return f"event: {event}\n{lines}\n"
+
+
+def event_stream_response(events):
+    """Wrap an iterator of formatted events in an unbuffered streaming response"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx and similar proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,258 @@
+"""Schema-constrained JSON resumes
+
+In structured output mode the model returns a JSON resume that matches
+RESUME_SCHEMA. It is validated once and converted straight into the sections
+dict the PDF builder takes, so the heuristic text parser is not involved. A
+plain-text rendering in the parser's format is still kept as the stored
+tailored content.
+"""
+import json
+
+from .sections import SECTION_TITLES
+
+# Keys of the sections dict with a fixed shape; additional sections may not use them
+RESERVED_SECTIONS = ('name', 'contact', 'summary', 'skills', 'experience', 'education', 'projects')
+
+_STRING = {"type": "string"}
+_STRINGS = {"type": "array", "items": _STRING}
+
+
+def _object(**properties):
+    # Strict structured outputs require every property to be listed as required
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+RESUME_SCHEMA = _object(
+    name=_STRING,
+    contact=_STRINGS,
+    summary=_STRING,
+    skills=_STRINGS,
+    experience={"type": "array", "items": _object(title=_STRING, company=_STRING, dates=_STRING, bullets=_STRINGS)},
+    education={"type": "array", "items": _object(degree=_STRING, school=_STRING, year=_STRING)},
+    projects={"type": "array", "items": _object(name=_STRING, bullets=_STRINGS)},
+    additional_sections={"type": "array", "items": _object(title=_STRING, items=_STRINGS)},
+)
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "tailored_resume", "strict": True, "schema": RESUME_SCHEMA},
+}
+
+STRUCTURED_REQUEST = (
+    "\n\nPlease create a tailored resume for this position and return it as JSON matching the resume schema. "
+    "Use empty strings or lists for anything that does not apply."
+)
+
+
+def looks_structured(content):
+    """True if model output is a JSON resume rather than resume text"""
+    return bool(content) and content.lstrip().startswith('{')
+
+
+def _text(value, field):
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ValueError(f"'{field}' must be a string")
+    return value.strip()
+
+
+def _texts(value, field):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"'{field}' must be a list")
+    return [item for item in (_text(item, field) for item in value) if item]
+
+
+def _entries(value, field):
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, dict) for item in value):
+        raise ValueError(f"'{field}' must be a list of objects")
+    return value
+
+
+def parse_structured_resume(content):
+    """Validate a JSON resume and return it as the sections dict used by the PDF builder"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid structured resume: {str(e)}")
+    if not isinstance(data, dict):
+        raise ValueError("Invalid structured resume: expected a JSON object")
+
+    try:
+        sections = {}
+        name = _text(data.get('name'), 'name')
+        if name:
+            sections['name'] = name
+        contact = _texts(data.get('contact'), 'contact')
+        if contact:
+            sections['contact'] = contact
+        summary = _text(data.get('summary'), 'summary')
+        if summary:
+            sections['summary'] = [summary]
+        skills = _texts(data.get('skills'), 'skills')
+        if skills:
+            sections['skills'] = skills
+
+        experience = []
+        for item in _entries(data.get('experience'), 'experience'):
+            entry = {
+                'title': _text(item.get('title'), 'experience.title'),
+                'company': _text(item.get('company'), 'experience.company'),
+            }
+            dates = _text(item.get('dates'), 'experience.dates')
+            if dates:
+                entry['dates'] = dates
+            bullets = _texts(item.get('bullets'), 'experience.bullets')
+            if bullets:
+                entry['description'] = bullets
+            if entry['title'] or entry['company'] or bullets:
+                experience.append(entry)
+        if experience:
+            sections['experience'] = experience
+
+        education = []
+        for item in _entries(data.get('education'), 'education'):
+            entry = {'degree': _text(item.get('degree'), 'education.degree')}
+            for key in ('school', 'year'):
+                value = _text(item.get(key), f'education.{key}')
+                if value:
+                    entry[key] = value
+            if any(entry.values()):
+                education.append(entry)
+        if education:
+            sections['education'] = education
+
+        projects = []
+        for item in _entries(data.get('projects'), 'projects'):
+            name = _text(item.get('name'), 'projects.name')
+            bullets = _texts(item.get('bullets'), 'projects.bullets')
+            if name or bullets:
+                projects.append({'name': name, 'description': bullets})
+        if projects:
+            sections['projects'] = projects
+
+        for item in _entries(data.get('additional_sections'), 'additional_sections'):
+            title = _text(item.get('title'), 'additional_sections.title').lower()
+            items = _texts(item.get('items'), 'additional_sections.items')
+            if title in RESERVED_SECTIONS:
+                # A list of strings under e.g. 'name' or 'experience' would not fit that section's shape
+                title = f'additional {title}'
+            if title and items and title not in sections:
+                sections[title] = items
+    except ValueError as e:
+        raise ValueError(f"Invalid structured resume: {str(e)}")
+
+    if not sections:
+        raise ValueError("Invalid structured resume: it has no content")
+    return sections
+
+
+def resume_to_text(sections):
+    """Plain-text rendering of a sections dict, in the format the resume parser reads"""
+    parts = []
+    header = '\n'.join(line for line in (sections.get('name'), ' | '.join(sections.get('contact', []))) if line)
+    if header:
+        parts.append(header)
+
+    if 'summary' in sections:
+        parts.append(f"{SECTION_TITLES['summary']}\n" + ' '.join(sections['summary']))
+    if 'skills' in sections:
+        parts.append(f"{SECTION_TITLES['skills']}\n" + ', '.join(sections['skills']))
+    if 'experience' in sections:
+        lines = []
+        for entry in sections['experience']:
+            lines.append(' | '.join(entry[key] for key in ('title', 'company', 'dates') if entry.get(key)))
+            lines.extend(f"- {bullet}" for bullet in entry.get('description', []))
+        parts.append(f"{SECTION_TITLES['experience']}\n" + '\n'.join(lines))
+    if 'education' in sections:
+        lines = [' | '.join(entry[key] for key in ('degree', 'school', 'year') if entry.get(key))
+                 for entry in sections['education']]
+        parts.append(f"{SECTION_TITLES['education']}\n" + '\n'.join(lines))
+    if 'projects' in sections:
+        lines = []
+        for entry in sections['projects']:
+            if entry['name']:
+                lines.append(entry['name'])
+            lines.extend(f"- {bullet}" for bullet in entry['description'])
+        parts.append(f"{SECTION_TITLES['projects']}\n" + '\n'.join(lines))
+
+    for title, items in sections.items():
+        if title not in RESERVED_SECTIONS:
+            parts.append(title.upper() + '\n' + '\n'.join(f"- {item}" for item in items))
+    return '\n\n'.join(parts)
+
+
+def _fields(line, keys):
+    # resume_to_text leaves empty fields out, so fields are read in order
+    return dict(zip(keys, line.split(' | ')))
+
+
+def _bullet(line):
+    return line[2:] if line.startswith('- ') else line
+
+
+def sections_from_text(text, previous):
+    """Sections of resume text edited from resume_to_text(previous), or None if they cannot be recovered exactly
+
+    Edited text (a revision, a regenerated section or a manual edit) of a
+    structured resume is read back in the format resume_to_text writes,
+    with previous supplying the titles of its additional sections. The
+    result is only returned when it writes out to the same text again;
+    anything else has to go through the heuristic parser.
+    """
+    if previous is None:
+        return None
+    titles = {title: key for key, title in SECTION_TITLES.items()}
+    titles.update({key.upper(): key for key in previous if key not in RESERVED_SECTIONS})
+
+    blocks = [(None, [])]
+    for line in text.split('\n'):
+        if line in titles:
+            blocks.append((titles[line], []))
+        elif line.strip():
+            blocks[-1][1].append(line)
+
+    sections = {}
+    header = blocks[0][1]
+    if header and 'name' in previous:
+        sections['name'] = header.pop(0)
+    if header:
+        sections['contact'] = header[0].split(' | ')
+    for key, lines in blocks[1:]:
+        if key == 'summary':
+            sections[key] = [' '.join(lines)]
+        elif key == 'skills':
+            sections[key] = ', '.join(lines).split(', ')
+        elif key == 'experience':
+            entries = []
+            for line in lines:
+                if line.startswith('- ') and entries:
+                    entries[-1].setdefault('description', []).append(line[2:])
+                else:
+                    entries.append(dict({'title': '', 'company': ''}, **_fields(line, ('title', 'company', 'dates'))))
+            sections[key] = entries
+        elif key == 'education':
+            sections[key] = [dict({'degree': ''}, **_fields(line, ('degree', 'school', 'year'))) for line in lines]
+        elif key == 'projects':
+            entries = []
+            for line in lines:
+                if line.startswith('- ') and entries:
+                    entries[-1]['description'].append(line[2:])
+                else:
+                    entries.append({'name': line, 'description': []})
+            sections[key] = entries
+        else:
+            sections[key] = [_bullet(line) for line in lines]
+
+    if resume_to_text(sections) != text.strip():
+        return None
+    return sections
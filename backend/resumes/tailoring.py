@@ -0,0 +1,704 @@
+"""Resume tailoring pipeline: LLM call, rendering and persistence"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+
+from jobs.models import Job
+from . import cache as tailoring_cache
+from .llm_client import get_openai_client, record_usage, usage_to_dict
+from .llm_guard import LLMUnavailable, guarded_call
+from .models import TailoredResume
+from .pdf import get_rendered_pdf, rendered_pdf_path
+from .prompting import compact_prompt_inputs, estimate_tokens
+from .sections import (
+    GENERATED_SECTIONS, SECTION_MAX_TOKENS, SECTION_TITLES, clean_section, merge_sections, replace_section,
+    section_request
+)
+from .singleflight import SingleFlight, distributed_lock, is_locked
+from .structured import (
+    RESPONSE_FORMAT, STRUCTURED_REQUEST, looks_structured, parse_structured_resume, resume_to_text, sections_from_text
+)
+
+# Identical tailoring requests currently running in this process
+_in_flight = SingleFlight()
+SINGLE_FLIGHT_POLL_INTERVAL = 0.5
+
+
+# Model settings shared by the blocking and streaming calls
+OPENAI_MODEL = "gpt-4o"
+OPENAI_MAX_TOKENS = 2000
+OPENAI_TEMPERATURE = 0.3
+
+# Bump whenever SYSTEM_PROMPT or build_messages changes so cached results are not reused
+PROMPT_VERSION = 1
+
+# System prompt for resume tailoring
+SYSTEM_PROMPT = """You are an expert resume writer. Create a concise, ATS-friendly, single-page resume tailored to the target role and company, based on the format of the candidate's CV, using keywords from the job description and the candidate's CV. Keep it within one page, prioritize relevant achievements with quantified impact, and use clean sections.
+
+Instructions:
+- Output ONLY the final resume text (no commentary).
+- Keep it to one page.
+- Use strong, quantified bullet points where possible.
+- Emphasize keywords from the job description.
+- Include sections like Summary, Skills, Experience, Education (and Projects if relevant).
+- Remove irrelevant details."""
+
+
+def _prompt_options():
+    """Settings that change the prompt built for the same inputs"""
+    options = {'layout': settings.PROMPT_LAYOUT}
+    if settings.PROMPT_COMPACTION_ENABLED:
+        options['compaction_budget'] = settings.PROMPT_TOKEN_BUDGET
+        options['cv_compaction'] = 'job-independent' if settings.PROMPT_LAYOUT == 'prefix' else 'job-relevance'
+    if settings.TAILORING_SECTION_MODE:
+        options['sections'] = list(GENERATED_SECTIONS)
+    elif settings.TAILORING_STRUCTURED_OUTPUT:
+        options['output'] = 'json'
+    return options
+
+
+def _feedback_prompt(additional_feedback):
+    """Prompt fragment carrying the user's extra feedback, if any"""
+    if additional_feedback and additional_feedback.strip():
+        return f"""
+
+Additional Feedback for this version:
+{additional_feedback.strip()}"""
+    return ""
+
+
+def build_messages(cv_text, company, job_description, additional_feedback=None, report=None, request_prompt=None):
+    """Build the chat messages for a tailoring request
+
+    When prompt compaction is enabled the CV and job description are first
+    fitted into PROMPT_TOKEN_BUDGET; the compaction report is stored under
+    report['prompt'] if a report dict is given.
+
+    With PROMPT_LAYOUT 'prefix' the stable content (system prompt, then the
+    whitespace-normalised CV, compacted the same way for every job) comes
+    first and the per-job content last, so repeat and batch requests for the
+    same CV share a prefix the provider can serve from its prompt cache.
+    'classic' keeps the original company / job description / CV order and
+    compacts the CV by relevance to the job.
+
+    request_prompt replaces the closing request (e.g. to ask for one section).
+    """
+    prefix_layout = settings.PROMPT_LAYOUT == 'prefix'
+    if prefix_layout:
+        cv_text = tailoring_cache.normalize_text(cv_text)
+
+    if settings.PROMPT_COMPACTION_ENABLED:
+        cv_text, job_description, compaction = compact_prompt_inputs(
+            cv_text, job_description, settings.PROMPT_TOKEN_BUDGET, job_independent_cv=prefix_layout
+        )
+        if compaction['over_budget']:
+            print(f"Warning: Prompt is {compaction['compacted_tokens']} tokens after compaction, "
+                  f"over PROMPT_TOKEN_BUDGET={settings.PROMPT_TOKEN_BUDGET}")
+        if report is not None:
+            report['prompt'] = compaction
+
+    job_prompt = f"""Target Company: {company}
+
+Job Description:
+{job_description}"""
+    if request_prompt is None:
+        request_prompt = "\n\nPlease create a tailored resume for this position."
+
+    if prefix_layout:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Candidate's Current CV:\n{cv_text}"},
+            {"role": "user", "content": job_prompt + _feedback_prompt(additional_feedback) + request_prompt}
+        ]
+
+    # User prompt with CV text and job description
+    user_prompt = f"""{job_prompt}
+
+Candidate's Current CV:
+{cv_text}"""
+    user_prompt += _feedback_prompt(additional_feedback) + request_prompt
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _record_usage(report, usage, started):
+    """Store a completion's token usage and latency in report and the process totals"""
+    usage = usage_to_dict(usage, round((time.monotonic() - started) * 1000))
+    record_usage(usage)
+    if report is not None:
+        report['usage'] = usage
+
+
+def _estimated_tokens(messages, max_tokens=OPENAI_MAX_TOKENS):
+    """Tokens to reserve against the TPM budget: the prompt plus the completion limit"""
+    return sum(estimate_tokens(message['content']) for message in messages) + max_tokens
+
+
+def _create_completion(messages, report=None, max_tokens=OPENAI_MAX_TOKENS, **options):
+    """Run one blocking chat completion through the LLM guard and record its usage"""
+    client = get_openai_client()
+    with guarded_call(_estimated_tokens(messages, max_tokens)):
+        started = time.monotonic()
+        response = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=OPENAI_TEMPERATURE,
+            **options
+        )
+    _record_usage(report, response.usage, started)
+    return response
+
+
+def _output_options():
+    """Closing request and completion options for the configured output format"""
+    if settings.TAILORING_STRUCTURED_OUTPUT:
+        return STRUCTURED_REQUEST, {'response_format': RESPONSE_FORMAT}
+    return None, {}
+
+
+def call_openai_api(cv_text, company, job_description, additional_feedback=None, report=None):
+    """Call OpenAI API to tailor the resume
+
+    In structured output mode the reply is a JSON resume, validated here so
+    that malformed output is never cached or rendered.
+    """
+    try:
+        request_prompt, options = _output_options()
+        messages = build_messages(cv_text, company, job_description, additional_feedback, report, request_prompt)
+        response = _create_completion(messages, report, **options)
+        content = response.choices[0].message.content.strip()
+        if looks_structured(content):
+            parse_structured_resume(content)
+
+        return content
+
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        raise ValueError(f"OpenAI API call failed: {str(e)}")
+
+
+def stream_openai_api(cv_text, company, job_description, additional_feedback=None, report=None):
+    """Call OpenAI API in streaming mode, yielding text chunks as they arrive
+
+    In structured output mode the chunks are pieces of the JSON resume, which
+    is validated once the stream ends.
+    """
+    try:
+        client = get_openai_client()
+        request_prompt, options = _output_options()
+        messages = build_messages(cv_text, company, job_description, additional_feedback, report, request_prompt)
+
+        # The call holds its concurrency slot until the stream is fully read
+        with guarded_call(_estimated_tokens(messages)):
+            started = time.monotonic()
+            stream = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                max_tokens=OPENAI_MAX_TOKENS,
+                temperature=OPENAI_TEMPERATURE,
+                stream=True,
+                # Ask for a final chunk carrying token usage
+                stream_options={"include_usage": True},
+                **options
+            )
+
+            chunks = []
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    chunks.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+                if getattr(chunk, 'usage', None):
+                    _record_usage(report, chunk.usage, started)
+
+        content = ''.join(chunks)
+        if looks_structured(content):
+            parse_structured_resume(content)
+
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        raise ValueError(f"OpenAI API call failed: {str(e)}")
+
+
+def _merge_usage(usages):
+    """Combine usage dicts of concurrent calls; latency is that of the slowest call"""
+    usages = [usage for usage in usages if usage]
+    if not usages:
+        return None
+    return {
+        'prompt_tokens': sum(usage['prompt_tokens'] or 0 for usage in usages),
+        'completion_tokens': sum(usage['completion_tokens'] or 0 for usage in usages),
+        'cached_prompt_tokens': sum(usage['cached_prompt_tokens'] for usage in usages),
+        'latency_ms': max(usage['latency_ms'] for usage in usages),
+    }
+
+
+def generate_section(cv_text, company, job_description, section, additional_feedback=None, report=None):
+    """Generate the body of one resume section with its own model call"""
+    try:
+        messages = build_messages(
+            cv_text, company, job_description, additional_feedback, report, request_prompt=section_request(section)
+        )
+        response = _create_completion(messages, report, max_tokens=SECTION_MAX_TOKENS[section])
+        return clean_section(section, response.choices[0].message.content or '')
+
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        raise ValueError(f"OpenAI API call failed for {section}: {str(e)}")
+
+
+def iter_generated_sections(cv_text, company, job_description, additional_feedback=None, report=None):
+    """Generate every section in GENERATED_SECTIONS concurrently, yielding (section, text) as each completes"""
+    reports = {section: {} for section in GENERATED_SECTIONS}
+    with ThreadPoolExecutor(max_workers=len(GENERATED_SECTIONS), thread_name_prefix='tailoring-section') as executor:
+        futures = {
+            executor.submit(
+                generate_section, cv_text, company, job_description, section, additional_feedback, reports[section]
+            ): section
+            for section in GENERATED_SECTIONS
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    if report is not None:
+        # Every section shares the same compacted inputs
+        report['prompt'] = reports[GENERATED_SECTIONS[0]].get('prompt')
+        report['usage'] = _merge_usage(section_report.get('usage') for section_report in reports.values())
+
+
+def generate_resume_by_sections(cv_text, company, job_description, additional_feedback=None, report=None):
+    """Generate the tailored resume section by section and merge it in layout order"""
+    generated = dict(iter_generated_sections(cv_text, company, job_description, additional_feedback, report))
+    return merge_sections(cv_text, generated)
+
+
+def _cache_key(cv_text, company, job_description, additional_feedback):
+    return tailoring_cache.make_cache_key(
+        cv_text, company, job_description, additional_feedback,
+        OPENAI_MODEL, OPENAI_TEMPERATURE, PROMPT_VERSION, _prompt_options()
+    )
+
+
+def get_cached_resume(cv_text, company, job_description, additional_feedback=None, regenerate=False):
+    """Return a cached tailored resume for these inputs, or None"""
+    if not tailoring_cache.is_enabled():
+        return None
+    if regenerate:
+        tailoring_cache.record_bypass()
+        return None
+    return tailoring_cache.get(_cache_key(cv_text, company, job_description, additional_feedback))
+
+
+def store_cached_resume(cv_text, company, job_description, additional_feedback, tailored_resume):
+    """Remember a freshly generated tailored resume for identical future requests"""
+    if not tailoring_cache.is_enabled():
+        return
+    try:
+        tailoring_cache.set(
+            _cache_key(cv_text, company, job_description, additional_feedback),
+            tailored_resume, OPENAI_MODEL, PROMPT_VERSION
+        )
+    except Exception as e:
+        print(f"Warning: Could not store tailoring cache entry: {e}")
+
+
+def _wait_for_other_worker(key):
+    """Poll the result cache while another process holds the generation lock for key"""
+    deadline = time.monotonic() + settings.TAILORING_SINGLE_FLIGHT_TIMEOUT
+    while time.monotonic() < deadline:
+        tailored_resume = tailoring_cache.peek(key)
+        if tailored_resume is not None:
+            return tailored_resume
+        if not is_locked(f'tailoring:{key}'):
+            # The other worker finished or gave up; one last look before computing ourselves
+            return tailoring_cache.peek(key)
+        time.sleep(SINGLE_FLIGHT_POLL_INTERVAL)
+    return None
+
+
+def generate_tailored_resume(cv_text, company, job_description, additional_feedback=None, regenerate=False,
+                             report=None):
+    """Return (tailored_text, cached), calling the model only on a cache miss
+
+    report, if given, collects details of the model call (see build_messages).
+    """
+    cached = get_cached_resume(cv_text, company, job_description, additional_feedback, regenerate)
+    if cached is not None:
+        return cached, True
+
+    key = _cache_key(cv_text, company, job_description, additional_feedback)
+    with distributed_lock(f'tailoring:{key}', settings.TAILORING_SINGLE_FLIGHT_TIMEOUT) as acquired:
+        if not acquired and tailoring_cache.is_enabled() and not regenerate:
+            # Someone else is generating exactly this resume; reuse their result
+            tailored_resume = _wait_for_other_worker(key)
+            if tailored_resume is not None:
+                return tailored_resume, True
+
+        if settings.TAILORING_SECTION_MODE:
+            tailored_resume = generate_resume_by_sections(cv_text, company, job_description, additional_feedback, report)
+        else:
+            tailored_resume = call_openai_api(cv_text, company, job_description, additional_feedback, report)
+        store_cached_resume(cv_text, company, job_description, additional_feedback, tailored_resume)
+    return tailored_resume, False
+
+
+def usage_fields(usage):
+    """TailoredResume field values for a usage dict (see llm_client.usage_to_dict)"""
+    if not usage:
+        return {}
+    return {
+        'prompt_tokens': usage['prompt_tokens'],
+        'completion_tokens': usage['completion_tokens'],
+        'cached_prompt_tokens': usage['cached_prompt_tokens'],
+        'llm_latency_ms': usage['latency_ms'],
+    }
+
+
+def render_tailored_resume(content, lazy=False, sections=None):
+    """Render model output (resume text or a JSON resume) to PDF; returns (resume_text, sections, file_path, pdf_bytes)
+
+    sections are the structured sections of a JSON resume, or those passed
+    in for resume text whose sections are already known (None otherwise);
+    they are saved with the resume so later renders need not re-parse the
+    text. With lazy=True nothing is rendered: file_path is where the PDF
+    will be cached once it is first viewed, and pdf_bytes is None.
+    """
+    tailored_resume = content
+    if sections is None and looks_structured(content):
+        sections = parse_structured_resume(content)
+        tailored_resume = resume_to_text(sections)
+    if lazy:
+        return tailored_resume, sections, rendered_pdf_path(tailored_resume, sections=sections), None
+    return (tailored_resume, sections, *get_rendered_pdf(tailored_resume, sections))
+
+
+def pdf_size(pdf_bytes):
+    """Value for TailoredResume.pdf_size: None while the PDF is not rendered yet"""
+    return len(pdf_bytes) if pdf_bytes is not None else None
+
+
+def record_rendered_pdf(tailored_resume_id, file_path, pdf_bytes):
+    """Point a saved TailoredResume at its default-template PDF and record the PDF's size
+
+    Lazily rendered resumes learn their size on first view; rows saved
+    before a PDF_TEMPLATE_VERSION bump move to the newly rendered file.
+    """
+    TailoredResume.objects.filter(pk=tailored_resume_id).exclude(
+        file_path=file_path, pdf_size=len(pdf_bytes)
+    ).update(file_path=file_path, pdf_size=len(pdf_bytes))
+
+
+def finalize_tailoring(tailored_resume, company, usage=None):
+    """Render the tailored text to PDF and store it against the matching job
+
+    Returns a dict with the tailored text, its structured sections (None
+    unless the model replied with a JSON resume), the relative PDF path, the
+    PDF bytes and the id of the saved TailoredResume (None when no matching
+    job exists). With PDF_LAZY_RENDERING the PDF of a saved resume is only
+    rendered when first viewed, and the bytes are None.
+    """
+    # Find the job by company name
+    job = None
+    try:
+        job = Job.objects.filter(company__name__icontains=company).first()
+    except Exception as e:
+        print(f"Warning: Could not look up job: {e}")
+
+    # Without a saved record there is nothing to view later, so render now
+    lazy = settings.PDF_LAZY_RENDERING and job is not None
+    tailored_resume, sections, tailored_resume_path, pdf_bytes = render_tailored_resume(tailored_resume, lazy)
+
+    # Save to database
+    tailored_resume_id = None
+    if job:
+        try:
+            tailored_resume_obj = TailoredResume.objects.create(
+                job=job,
+                file_path=tailored_resume_path,
+                pdf_size=pdf_size(pdf_bytes),
+                tailored_content=tailored_resume,
+                structured_content=sections,
+                **usage_fields(usage)
+            )
+            tailored_resume_id = tailored_resume_obj.id
+        except Exception as e:
+            print(f"Warning: Could not save to database: {e}")
+
+    return {
+        'tailored_resume': tailored_resume,
+        'sections': sections,
+        'file_path': tailored_resume_path,
+        'pdf': pdf_bytes,
+        'tailored_resume_id': tailored_resume_id,
+    }
+
+
+def run_tailoring(cv_text, company, job_description, additional_feedback='', regenerate=False):
+    """Run the full tailoring pipeline for already-extracted CV text
+
+    Identical requests running at the same time in this process share one
+    result (flagged with coalesced=True) instead of repeating the work.
+    """
+    def pipeline():
+        report = {}
+        tailored_resume, cached = generate_tailored_resume(
+            cv_text, company, job_description, additional_feedback, regenerate, report
+        )
+        result = finalize_tailoring(tailored_resume, company, report.get('usage'))
+        result['cached'] = cached
+        result['prompt'] = report.get('prompt')
+        result['usage'] = report.get('usage')
+        return result
+
+    key = (_cache_key(cv_text, company, job_description, additional_feedback), regenerate)
+    result, shared = _in_flight.do(key, pipeline)
+    return dict(result, coalesced=shared)
+
+
+def job_description_for(job):
+    """Build the job description text sent to the model from a Job row"""
+    parts = [job.title, job.description or '']
+    if job.requirements:
+        parts.append(f"Requirements:\n{job.requirements}")
+    return '\n\n'.join(part.strip() for part in parts if part and part.strip())
+
+
+def _tailor_for_job(cv_text, job, additional_feedback, regenerate):
+    """Generate and render one batch item; runs in a pool thread"""
+    try:
+        report = {}
+        tailored_resume, cached = generate_tailored_resume(
+            cv_text, job.company.name, job_description_for(job), additional_feedback, regenerate, report
+        )
+        tailored_resume, sections, file_path, pdf_bytes = render_tailored_resume(
+            tailored_resume, settings.PDF_LAZY_RENDERING
+        )
+        return {
+            'tailored_resume': tailored_resume,
+            'sections': sections,
+            'file_path': file_path,
+            'pdf_size': pdf_size(pdf_bytes),
+            'cached': cached,
+            'prompt': report.get('prompt'),
+            'usage': report.get('usage'),
+        }
+    finally:
+        # Each pool thread has its own database connection
+        connections.close_all()
+
+
+def run_batch_tailoring(cv_text, jobs, additional_feedback='', regenerate=False):
+    """Tailor one CV for many jobs concurrently and store the results in one bulk insert
+
+    Returns (results, failures): results pairs each saved TailoredResume row
+    with its outcome dict (cache flag, prompt report, usage), failures maps job id
+    to an error message.
+    """
+    concurrency = max(1, min(settings.TAILORING_BATCH_CONCURRENCY, len(jobs)))
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tailoring-batch') as executor:
+        futures = {
+            job.id: executor.submit(_tailor_for_job, cv_text, job, additional_feedback, regenerate)
+            for job in jobs
+        }
+        for job_id, future in futures.items():
+            try:
+                outcomes[job_id] = future.result()
+            except Exception as e:
+                outcomes[job_id] = e
+
+    failures = {job_id: str(outcome) for job_id, outcome in outcomes.items() if isinstance(outcome, Exception)}
+    succeeded = [job for job in jobs if job.id not in failures]
+    rows = TailoredResume.objects.bulk_create([
+        TailoredResume(
+            job=job,
+            file_path=outcomes[job.id]['file_path'],
+            pdf_size=outcomes[job.id]['pdf_size'],
+            tailored_content=outcomes[job.id]['tailored_resume'],
+            structured_content=outcomes[job.id]['sections'],
+            **usage_fields(outcomes[job.id]['usage'])
+        )
+        for job in succeeded
+    ])
+    results = [(row, outcomes[row.job_id]) for row in rows]
+    return results, failures
+
+
+# Revision mode: edit an existing tailored resume instead of regenerating it
+REVISION_MAX_TOKENS = 800
+
+REVISION_SYSTEM_PROMPT = """You revise an existing tailored resume according to the user's feedback. Change only what the feedback asks for and keep everything else exactly as it is.
+
+Reply with a JSON object of the form {"edits": [{"find": "...", "replace": "..."}]}:
+- "find" is an exact excerpt of the current resume, ideally a whole line or bullet, long enough to be unique.
+- "replace" is the new text for that excerpt; use an empty string to delete it.
+- To add content, put the line it should follow in "find" and repeat that line at the start of "replace".
+- Output nothing but the JSON object."""
+
+
+def parse_revision_edits(content):
+    """Validate the model's JSON reply and return its list of {'find', 'replace'} edits"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Model returned invalid JSON: {str(e)}")
+    edits = data.get('edits') if isinstance(data, dict) else None
+    if not isinstance(edits, list):
+        raise ValueError("Model reply has no 'edits' list")
+    return [
+        {'find': edit['find'], 'replace': edit.get('replace') or ''}
+        for edit in edits
+        if isinstance(edit, dict) and isinstance(edit.get('find'), str) and edit['find'].strip()
+        and isinstance(edit.get('replace', ''), (str, type(None)))
+    ]
+
+
+class RevisionUnchanged(ValueError):
+    """The model's reply would save a revision identical to the resume it revises"""
+
+
+def _tidy_seam(text, start, end):
+    """Collapse blank lines an edit left around text[start:end]; the rest of the text is not touched"""
+    left = start
+    while left > 0 and text[left - 1] == '\n':
+        left -= 1
+    right = end
+    while right < len(text) and text[right] == '\n':
+        right += 1
+    seam = re.sub(r'\n{3,}', '\n\n', text[left:right])
+    if left == 0:
+        seam = seam.lstrip('\n')
+    if right == len(text):
+        seam = seam.rstrip('\n')
+    return text[:left] + seam + text[right:]
+
+
+def apply_revision_edits(text, edits):
+    """Apply find/replace edits in order; returns (text, applied_count, skipped_edits)
+
+    An edit is skipped, with a 'reason', when its excerpt is not in the text
+    or occurs more than once, since it cannot say which copy it means.
+    """
+    applied = 0
+    skipped = []
+    for edit in edits:
+        find = edit['find']
+        if find not in text:
+            # Models often drop leading/trailing whitespace of the excerpt
+            find = find.strip()
+        if not find or find not in text:
+            skipped.append(dict(edit, reason='not found'))
+            continue
+        if text.count(find) > 1:
+            skipped.append(dict(edit, reason='ambiguous'))
+            continue
+        start = text.index(find)
+        end = start + len(find)
+        replace = edit['replace']
+        if not replace and (start == 0 or text[start - 1] == '\n') and text[end:end + 1] == '\n':
+            # Deleting a whole line takes its line break with it
+            end += 1
+        text = _tidy_seam(text[:start] + replace + text[end:], start, start + len(replace))
+        applied += 1
+    return text, applied, skipped
+
+
+def revision_sections(parent, revised):
+    """Structured sections of a revision of parent, or None when parent has none or they cannot be kept"""
+    if parent.structured_content is None:
+        return None
+    sections = sections_from_text(revised, parent.structured_content)
+    if sections is None:
+        print(f"Warning: Revision of tailored resume {parent.pk} lost its structured sections; rendering it from text")
+    return sections
+
+
+def revise_tailored_resume(parent, feedback):
+    """Apply feedback to an existing TailoredResume and store the result as a new revision
+
+    Only the previous output and the feedback are sent; the model answers with
+    compact find/replace edits rather than the whole resume. Returns
+    (revision, outcome) where outcome holds the edit counts and usage.
+    """
+    report = {}
+    messages = [
+        {"role": "system", "content": REVISION_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Current resume:\n{parent.tailored_content}"},
+        {"role": "user", "content": f"Feedback:\n{feedback.strip()}"}
+    ]
+    try:
+        response = _create_completion(
+            messages, report, max_tokens=REVISION_MAX_TOKENS, response_format={"type": "json_object"}
+        )
+    except LLMUnavailable:
+        raise
+    except Exception as e:
+        raise ValueError(f"OpenAI API call failed: {str(e)}")
+
+    edits = parse_revision_edits(response.choices[0].message.content)
+    if not edits:
+        raise RevisionUnchanged("The model suggested no edits")
+    revised, applied, skipped = apply_revision_edits(parent.tailored_content, edits)
+    if not applied:
+        raise RevisionUnchanged("None of the suggested edits matched the current resume")
+    if revised == parent.tailored_content:
+        raise RevisionUnchanged("The suggested edits leave the resume unchanged")
+
+    _, sections, file_path, pdf_bytes = render_tailored_resume(
+        revised, settings.PDF_LAZY_RENDERING, revision_sections(parent, revised)
+    )
+    revision = TailoredResume.objects.create(
+        job=parent.job,
+        parent=parent,
+        revision_feedback=feedback.strip(),
+        file_path=file_path,
+        pdf_size=pdf_size(pdf_bytes),
+        tailored_content=revised,
+        structured_content=sections,
+        **usage_fields(report.get('usage'))
+    )
+    return revision, {
+        'edits_applied': applied,
+        'edits_skipped': skipped,
+        'usage': report.get('usage'),
+    }
+
+
+def regenerate_resume_section(tailored, section, cv_text=None, additional_feedback=None):
+    """Regenerate one section of a TailoredResume and store the result as a new revision
+
+    The section is generated from cv_text when given, otherwise from the
+    tailored resume itself. Returns (revision, report).
+    """
+    report = {}
+    job = tailored.job
+    body = generate_section(
+        cv_text or tailored.tailored_content, job.company.name, job_description_for(job), section,
+        additional_feedback, report
+    )
+    revised = replace_section(tailored.tailored_content, section, body)
+
+    _, sections, file_path, pdf_bytes = render_tailored_resume(
+        revised, settings.PDF_LAZY_RENDERING, revision_sections(tailored, revised)
+    )
+    revision = TailoredResume.objects.create(
+        job=job,
+        parent=tailored,
+        revision_feedback=(additional_feedback or '').strip() or f"Regenerated {SECTION_TITLES[section]} section",
+        file_path=file_path,
+        pdf_size=pdf_size(pdf_bytes),
+        tailored_content=revised,
+        structured_content=sections,
+        **usage_fields(report.get('usage'))
+    )
+    return revision, report
@@ -0,0 +1,150 @@
+"""Background execution of tailoring tasks and CV text extraction
+
+Tasks are stored as TailoringTask rows, which are the source of truth for
+their status. Depending on TAILORING_TASK_BACKEND they are run by an
+in-process thread pool, a Celery worker, or `manage.py run_tailoring_worker`
+polling the database. Text extraction of uploaded CVs goes through the same
+backend, with its status kept on the BaseCV row.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .extraction import claim_extraction, extract_base_cv, run_claimed_extraction
+from .models import BaseCV, TailoringTask
+from .tailoring import run_tailoring
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional
+    shared_task = None
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Lazily create the process-wide thread pool used by the 'thread' backend"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.TAILORING_WORKERS,
+                    thread_name_prefix='tailoring'
+                )
+    return _executor
+
+
+def claim_task(task_id):
+    """Atomically move a queued task to running; returns False if another worker got it"""
+    claimed = TailoringTask.objects.filter(
+        pk=task_id, status=TailoringTask.STATUS_QUEUED
+    ).update(status=TailoringTask.STATUS_RUNNING, started_at=timezone.now())
+    return claimed == 1
+
+
+def _run_claimed_task(task_id):
+    """Execute the pipeline for a task this worker has claimed"""
+    task = TailoringTask.objects.get(pk=task_id)
+    try:
+        result = run_tailoring(
+            task.cv_text, task.company, task.job_description, task.additional_feedback,
+            regenerate=task.regenerate
+        )
+    except Exception as e:
+        task.status = TailoringTask.STATUS_FAILED
+        task.error = str(e)
+    else:
+        task.status = TailoringTask.STATUS_DONE
+        task.tailored_content = result['tailored_resume']
+        task.file_path = result['file_path']
+        task.tailored_resume_id = result['tailored_resume_id']
+    task.finished_at = timezone.now()
+    task.save()
+
+
+def execute_task(task_id):
+    """Run a queued tailoring task and record its outcome on the task row"""
+    close_old_connections()
+    try:
+        if claim_task(task_id):
+            _run_claimed_task(task_id)
+    finally:
+        close_old_connections()
+
+
+def run_next_queued_task():
+    """Claim and run the oldest queued task; returns False when the queue is empty"""
+    queued_ids = TailoringTask.objects.filter(
+        status=TailoringTask.STATUS_QUEUED
+    ).order_by('created_at').values_list('id', flat=True)[:10]
+    for task_id in queued_ids:
+        if claim_task(task_id):
+            _run_claimed_task(task_id)
+            return True
+    return False
+
+
+def enqueue_task(task):
+    """Hand a freshly created task to the configured backend once it is committed"""
+    backend = settings.TAILORING_TASK_BACKEND
+    if backend == 'db':
+        # Picked up by `manage.py run_tailoring_worker`
+        return
+    if backend == 'celery':
+        if shared_task is None:
+            raise ValueError("TAILORING_TASK_BACKEND is 'celery' but Celery is not installed")
+        transaction.on_commit(lambda: run_tailoring_task.delay(str(task.pk)))
+        return
+    transaction.on_commit(lambda: _get_executor().submit(execute_task, task.pk))
+
+
+def execute_extraction(base_cv_id):
+    """Extract the text of an uploaded CV in a background worker"""
+    close_old_connections()
+    try:
+        extract_base_cv(base_cv_id)
+    finally:
+        close_old_connections()
+
+
+def run_next_pending_extraction():
+    """Claim and run the oldest pending extraction; returns False when there is none"""
+    pending_ids = BaseCV.objects.filter(
+        extraction_status=BaseCV.EXTRACTION_PENDING
+    ).order_by('uploaded_at').values_list('id', flat=True)[:10]
+    for base_cv_id in pending_ids:
+        if claim_extraction(base_cv_id):
+            run_claimed_extraction(base_cv_id)
+            return True
+    return False
+
+
+def enqueue_extraction(base_cv):
+    """Extract a freshly uploaded CV off the request path once it is committed"""
+    backend = settings.TAILORING_TASK_BACKEND
+    if backend == 'db':
+        # Picked up by `manage.py run_tailoring_worker`
+        return
+    if backend == 'celery':
+        if shared_task is None:
+            raise ValueError("TAILORING_TASK_BACKEND is 'celery' but Celery is not installed")
+        transaction.on_commit(lambda: extract_cv_text_task.delay(base_cv.pk))
+        return
+    transaction.on_commit(lambda: _get_executor().submit(execute_extraction, base_cv.pk))
+
+
+if shared_task is not None:
+    @shared_task(name='resumes.run_tailoring_task')
+    def run_tailoring_task(task_id):
+        """Celery entry point for a tailoring task"""
+        execute_task(task_id)
+
+    @shared_task(name='resumes.extract_cv_text_task')
+    def extract_cv_text_task(base_cv_id):
+        """Celery entry point for extracting an uploaded CV's text"""
+        execute_extraction(base_cv_id)
@@ -1,3 +1,549 @@
-from django.test import TestCase
+import io
+import json
+import multiprocessing
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import openai
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from companies.models import Company
+from jobs.models import Job
+
+from . import llm_guard, worker_pool
+from .llm_guard import AdaptiveLimiter, CircuitBreaker, LLMUnavailable, guarded_call
+from .models import BaseCV, CVUploadSession, TailoredResume
+from .parsing import parse_resume_sections
+from .sections import clean_section, merge_sections, replace_section
+from .prompting import estimate_tokens
+from .structured import parse_structured_resume, resume_to_text
+from .tailoring import (
+    apply_revision_edits, build_messages, finalize_tailoring, regenerate_resume_section, revise_tailored_resume
+)
+
+CV = """John Doe
+john.doe@email.com | (555) 123-4567
+
+SUMMARY
+Experienced software engineer.
+
+EXPERIENCE
+Senior Software Engineer | TechCorp Inc. | 2020 - 2023
+- Developed web applications in Python and Django
+- Led a team of five engineers
+
+EDUCATION
+BSc Computer Science | UC Berkeley | 2018
+
+SKILLS
+Python, Django, React
+"""
+
+LONG_CV = CV + '\n'.join(f"- Ran marketing campaign number {i} for a florist shop" for i in range(300))
+
+
+@override_settings(PROMPT_COMPACTION_ENABLED=True, PROMPT_TOKEN_BUDGET=600)
+class BuildMessagesTests(SimpleTestCase):
+
+    @override_settings(PROMPT_LAYOUT='prefix')
+    def test_prefix_layout_compacts_cv_identically_for_every_job(self):
+        first_report, second_report = {}, {}
+        first = build_messages(LONG_CV, 'Acme', 'Python engineer for APIs.', report=first_report)
+        second = build_messages(LONG_CV, 'Shoply', 'Marketing lead for florists.', report=second_report)
+
+        self.assertEqual(first[1], second[1])
+        self.assertLess(estimate_tokens(first[1]['content']), estimate_tokens(LONG_CV))
+        self.assertGreater(first_report['prompt']['cv_lines_dropped'], 0)
+        self.assertFalse(first_report['prompt']['over_budget'])
+        self.assertFalse(second_report['prompt']['over_budget'])
+
+    @override_settings(PROMPT_LAYOUT='classic')
+    def test_classic_layout_stays_within_budget(self):
+        report = {}
+        build_messages(LONG_CV, 'Acme', 'Python engineer for APIs.', report=report)
+
+        self.assertGreater(report['prompt']['cv_lines_dropped'], 0)
+        self.assertFalse(report['prompt']['over_budget'])
+
+
+def connection_error():
+    return openai.APIConnectionError(request=httpx.Request('POST', 'https://api.openai.com/v1/chat/completions'))
+
+
+@override_settings(
+    LLM_CONCURRENCY_INITIAL=2, LLM_QUEUE_TIMEOUT=0.01, LLM_RPM_LIMIT=0, LLM_TPM_LIMIT=0,
+    LLM_BREAKER_FAILURE_THRESHOLD=2, LLM_BREAKER_COOLDOWN=30.0
+)
+class GuardedCallTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.delete(CircuitBreaker.OPEN_UNTIL_KEY)
+        patchers = [
+            mock.patch.object(llm_guard, 'limiter', AdaptiveLimiter()),
+            mock.patch.object(llm_guard, 'breaker', CircuitBreaker()),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(cache.delete, CircuitBreaker.OPEN_UNTIL_KEY)
+
+    def in_flight(self):
+        return llm_guard.limiter.stats()['in_flight']
+
+    def test_success_releases_slot(self):
+        with guarded_call(10):
+            self.assertEqual(self.in_flight(), 1)
+        self.assertEqual(self.in_flight(), 0)
+        self.assertEqual(llm_guard.breaker.state(), 'closed')
+
+    def test_failure_releases_slot_and_counts_towards_breaker(self):
+        for _ in range(2):
+            with self.assertRaises(openai.APIConnectionError):
+                with guarded_call(10):
+                    raise connection_error()
+        self.assertEqual(self.in_flight(), 0)
+        self.assertEqual(llm_guard.breaker.state(), 'open')
+        with self.assertRaises(LLMUnavailable):
+            with guarded_call(10):
+                pass
+
+    def test_closed_generator_releases_slot(self):
+        def stream():
+            with guarded_call(10):
+                yield 'chunk'
+                yield 'chunk'
+
+        # More disconnected streams than there are slots
+        for _ in range(4):
+            events = stream()
+            next(events)
+            events.close()
+        self.assertEqual(self.in_flight(), 0)
+        with guarded_call(10):
+            pass
+
+    def open_breaker_past_cooldown(self):
+        cache.set(CircuitBreaker.OPEN_UNTIL_KEY, time.time() - 1)
+        self.assertEqual(llm_guard.breaker.state(), 'half-open')
+
+    def test_breaker_open_half_open_closed(self):
+        for _ in range(2):
+            with self.assertRaises(openai.APIConnectionError):
+                with guarded_call(10):
+                    raise connection_error()
+        self.assertEqual(llm_guard.breaker.state(), 'open')
+
+        self.open_breaker_past_cooldown()
+        with guarded_call(10):
+            # Only the trial call is let through while half-open
+            with self.assertRaisesMessage(LLMUnavailable, 'recovering'):
+                with guarded_call(10):
+                    pass
+        self.assertEqual(llm_guard.breaker.state(), 'closed')
+
+    def test_failed_trial_reopens_breaker(self):
+        self.open_breaker_past_cooldown()
+        with self.assertRaises(openai.APIConnectionError):
+            with guarded_call(10):
+                raise connection_error()
+        self.assertEqual(llm_guard.breaker.state(), 'open')
+
+    def test_trial_not_admitted_lets_next_call_try(self):
+        self.open_breaker_past_cooldown()
+        with mock.patch.object(llm_guard.limiter, 'acquire', side_effect=LLMUnavailable('busy', 1)):
+            with self.assertRaises(LLMUnavailable):
+                with guarded_call(10):
+                    pass
+        with guarded_call(10):
+            pass
+        self.assertEqual(llm_guard.breaker.state(), 'closed')
+
+    def test_cancelled_trial_lets_next_call_try(self):
+        self.open_breaker_past_cooldown()
+
+        def stream():
+            with guarded_call(10):
+                yield 'chunk'
+
+        events = stream()
+        next(events)
+        events.close()
+        self.assertEqual(llm_guard.breaker.state(), 'half-open')
+        with guarded_call(10):
+            pass
+        self.assertEqual(llm_guard.breaker.state(), 'closed')
+
+
+class ApplyRevisionEditsTests(SimpleTestCase):
+
+    def test_applies_edits_in_order(self):
+        text, applied, skipped = apply_revision_edits(CV, [
+            {'find': 'Experienced software engineer.', 'replace': 'Backend engineer with eight years of Python.'},
+            {'find': 'Python, Django, React', 'replace': 'Python, Django, PostgreSQL'},
+        ])
+        self.assertEqual((applied, skipped), (2, []))
+        self.assertIn('Backend engineer with eight years of Python.', text)
+        self.assertIn('Python, Django, PostgreSQL', text)
+
+    def test_excerpt_with_extra_whitespace_still_matches(self):
+        text, applied, _ = apply_revision_edits(CV, [{'find': '- Led a team of five engineers  ', 'replace': '- Led a team of eight engineers'}])
+        self.assertEqual(applied, 1)
+        self.assertIn('\n- Led a team of eight engineers\n', text)
+
+    def test_missing_excerpt_is_skipped(self):
+        edit = {'find': 'Kubernetes', 'replace': 'Nomad'}
+        text, applied, skipped = apply_revision_edits(CV, [edit])
+        self.assertEqual((text, applied), (CV, 0))
+        self.assertEqual(skipped, [dict(edit, reason='not found')])
+
+    def test_ambiguous_excerpt_is_skipped(self):
+        edit = {'find': 'Python', 'replace': 'Go'}
+        text, applied, skipped = apply_revision_edits(CV, [edit])
+        self.assertEqual((text, applied), (CV, 0))
+        self.assertEqual(skipped, [dict(edit, reason='ambiguous')])
+
+    def test_no_edits_change_nothing(self):
+        self.assertEqual(apply_revision_edits(CV, []), (CV, 0, []))
+
+    def test_deleting_a_line_removes_its_line_break(self):
+        text, applied, _ = apply_revision_edits(CV, [{'find': '- Led a team of five engineers', 'replace': ''}])
+        self.assertEqual(applied, 1)
+        self.assertEqual(text, CV.replace('- Led a team of five engineers\n', ''))
+
+    def test_deleting_a_section_collapses_only_its_own_blank_lines(self):
+        text = "Jane\n\n\n\nSUMMARY\nShort.\n\nSKILLS\nPython\n\nEDUCATION\nBSc"
+        text, applied, _ = apply_revision_edits(text, [{'find': 'SKILLS\nPython', 'replace': ''}])
+        self.assertEqual(applied, 1)
+        # The blank lines an author left under the name are not the edit's business
+        self.assertEqual(text, "Jane\n\n\n\nSUMMARY\nShort.\n\nEDUCATION\nBSc")
+
+
+def completion(content):
+    message = mock.Mock(content=content)
+    return mock.Mock(choices=[mock.Mock(message=message)], usage=None)
+
+
+class ReviseTailoredResumeTests(TestCase):
+
+    def setUp(self):
+        job = Job.objects.create(title='SWE', company=Company.objects.create(name='Google'))
+        self.tailored = TailoredResume.objects.create(job=job, file_path='', tailored_content=CV)
+        self.url = f'/api/resumes/tailored-resumes/{self.tailored.pk}/revise/'
+        self.client = APIClient()
+
+    def revise(self, reply):
+        with mock.patch('resumes.tailoring._create_completion', return_value=completion(reply)):
+            return self.client.post(self.url, {'feedback': 'Tighten it up'}, format='json')
+
+    def test_no_op_replies_are_rejected(self):
+        replies = [
+            '{"edits": []}',
+            '{"edits": [{"find": "Kubernetes", "replace": "Nomad"}]}',
+            '{"edits": [{"find": "Led a team", "replace": "Led a team"}]}',
+        ]
+        for reply in replies:
+            with self.subTest(reply=reply):
+                response = self.revise(reply)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(TailoredResume.objects.count(), 1)
+
+    def test_revision_is_saved(self):
+        response = self.revise('{"edits": [{"find": "Python, Django, React", "replace": "Python, Django, Go"}]}')
+        self.assertEqual(response.status_code, 201)
+        revision = TailoredResume.objects.get(pk=response.data['id'])
+        self.assertEqual(revision.parent, self.tailored)
+        self.assertIn('Python, Django, Go', revision.tailored_content)
+
+
+class WorkerPoolTests(SimpleTestCase):
+
+    def tearDown(self):
+        worker_pool.terminate_pool('test')
+
+    def test_timeout_retires_the_pool_without_killing_other_tasks(self):
+        stuck = worker_pool.submit('test', time.sleep, (30,), 2)
+        other = worker_pool.submit('test', time.sleep, (1,), 2)
+        retired = worker_pool._pools['test']
+        with self.assertRaises(multiprocessing.TimeoutError):
+            stuck.get(0.1)
+        # New work goes to a fresh pool while the old one finishes what it was given
+        self.assertIsNot(worker_pool._pools.get('test'), retired)
+        self.assertEqual(worker_pool.submit('test', pow, (2, 10), 2).get(30), 1024)
+        self.assertIsNone(other.get(30))
+
+        deadline = time.monotonic() + 10
+        while retired in worker_pool._retired and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertNotIn(retired, worker_pool._retired)
+
+    def test_pool_is_replaced_when_its_configuration_changes(self):
+        self.assertEqual(worker_pool.submit('test', pow, (2, 3), 1).get(30), 8)
+        self.assertEqual(worker_pool.pool_size('test'), 1)
+        self.assertEqual(worker_pool.submit('test', pow, (2, 4), 2).get(30), 16)
+        self.assertEqual(worker_pool.pool_size('test'), 2)
+
+
+STRUCTURED_REPLY = json.dumps({
+    'name': 'John Doe',
+    'contact': ['john.doe@email.com'],
+    'summary': 'Backend engineer.',
+    'skills': ['Python', 'CI-CD', 'Kubernetes'],
+    'experience': [{'title': 'Senior Engineer', 'company': 'TechCorp Inc.', 'dates': '2020 - 2023',
+                    'bullets': ['Built the deploy pipeline']}],
+    'education': [{'degree': 'BSc Computer Science', 'school': 'UC Berkeley', 'year': '2018'}],
+    'projects': [],
+    'additional_sections': [],
+})
+
+
+class ParseStructuredResumeTests(SimpleTestCase):
+
+    def test_additional_sections_cannot_take_over_reserved_keys(self):
+        sections = parse_structured_resume(json.dumps({
+            'summary': 'x',
+            'additional_sections': [
+                {'title': 'Name', 'items': ['a']},
+                {'title': 'Experience', 'items': ['Volunteer mentor']},
+                {'title': 'Awards', 'items': ['Hackathon winner']},
+            ],
+        }))
+        self.assertEqual(sections, {
+            'summary': ['x'],
+            'additional name': ['a'],
+            'additional experience': ['Volunteer mentor'],
+            'awards': ['Hackathon winner'],
+        })
+        self.assertIn('ADDITIONAL EXPERIENCE\n- Volunteer mentor', resume_to_text(sections))
+
+
+@override_settings(PDF_RENDER_WORKERS=0, PDF_ASYNC_WRITES=False, PDF_LAZY_RENDERING=True)
+class StructuredRenderTests(TestCase):
+
+    def setUp(self):
+        Job.objects.create(title='SWE', company=Company.objects.create(name='Google'))
+        self.sections = parse_structured_resume(STRUCTURED_REPLY)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        layout = {'pages': 1, 'natural_pages': 1, 'adjustments': None}
+        patcher = mock.patch('resumes.pdf.render_sections', return_value=(b'%PDF-1.4 fake', layout))
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def viewed_sections(self, tailored_resume_id):
+        """Sections handed to the renderer when a saved resume is first viewed"""
+        self.render.reset_mock()
+        response = self.client.get(f"/api/resumes/tailored-resumes/{tailored_resume_id}/view/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.render.call_count, 1)
+        return self.render.call_args.args[0]
+
+    def test_lazy_and_eager_renders_use_the_same_sections(self):
+        # The text form alone loses the dates and splits the hyphenated skill
+        text = resume_to_text(self.sections)
+        self.assertNotEqual(parse_resume_sections([line.strip() for line in text.split('\n')]), self.sections)
+
+        with override_settings(PDF_LAZY_RENDERING=False):
+            finalize_tailoring(STRUCTURED_REPLY, 'Google')
+        self.assertEqual(self.render.call_args.args[0], self.sections)
+        shutil.rmtree(settings.MEDIA_ROOT)
+
+        result = finalize_tailoring(STRUCTURED_REPLY, 'Google')
+        self.assertEqual(self.viewed_sections(result['tailored_resume_id']), self.sections)
+        self.assertEqual(TailoredResume.objects.first().structured_content, self.sections)
+
+    def test_edited_content_is_what_gets_rendered(self):
+        tailored_resume_id = finalize_tailoring(STRUCTURED_REPLY, 'Google')['tailored_resume_id']
+        self.viewed_sections(tailored_resume_id)
+        url = f"/api/resumes/tailored-resumes/{tailored_resume_id}/"
+        text = resume_to_text(self.sections)
+
+        response = self.client.patch(url, {'tailored_content': text.replace('2020 - 2023', '2019 - 2023')}, format='json')
+        self.assertEqual(response.status_code, 200)
+        rendered = self.viewed_sections(tailored_resume_id)
+        self.assertEqual(rendered['experience'][0]['dates'], '2019 - 2023')
+        self.assertEqual(rendered['skills'], ['Python', 'CI-CD', 'Kubernetes'])
+        self.assertEqual(response.data['structured_content'], rendered)
+
+        # Text that no longer reads back into the sections is rendered from the text itself
+        edited = text.replace('Backend engineer.', 'Backend engineer.\nNow leading platform work.')
+        response = self.client.patch(url, {'tailored_content': edited}, format='json')
+        self.assertIsNone(response.data['structured_content'])
+        self.assertIn('Now leading platform work.', json.dumps(self.viewed_sections(tailored_resume_id)))
+
+    def test_edit_invalidates_if_modified_since(self):
+        tailored_resume_id = finalize_tailoring(STRUCTURED_REPLY, 'Google')['tailored_resume_id']
+        TailoredResume.objects.filter(pk=tailored_resume_id).update(updated_at=timezone.now() - timedelta(hours=1))
+        url = f"/api/resumes/tailored-resumes/{tailored_resume_id}/"
+        last_modified = self.client.get(url + 'view/')['Last-Modified']
+        self.assertEqual(self.client.get(url + 'view/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        text = resume_to_text(self.sections).replace('2020 - 2023', '2019 - 2023')
+        self.client.patch(url, {'tailored_content': text}, format='json')
+        response = self.client.get(url + 'view/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+    def test_revisions_keep_the_structured_sections(self):
+        parent = TailoredResume.objects.get(pk=finalize_tailoring(STRUCTURED_REPLY, 'Google')['tailored_resume_id'])
+        reply = '{"edits": [{"find": "Built the deploy pipeline", "replace": "Built the release pipeline"}]}'
+        with mock.patch('resumes.tailoring._create_completion', return_value=completion(reply)):
+            revision, _ = revise_tailored_resume(parent, 'Say release')
+        expected = json.loads(json.dumps(self.sections))
+        expected['experience'][0]['description'] = ['Built the release pipeline']
+        self.assertEqual(revision.structured_content, expected)
+        self.assertEqual(self.viewed_sections(revision.pk), expected)
+
+        with mock.patch('resumes.tailoring.generate_section', return_value='Go, CI-CD'):
+            regenerated, _ = regenerate_resume_section(revision, 'skills')
+        expected['skills'] = ['Go', 'CI-CD']
+        self.assertEqual(regenerated.structured_content, expected)
+        self.assertEqual(self.viewed_sections(regenerated.pk)['experience'][0]['dates'], '2020 - 2023')
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        job = Job.objects.create(title='SWE', company=Company.objects.create(name='Google'))
+        self.good = TailoredResume.objects.create(job=job, file_path='', tailored_content=CV)
+        self.bad = TailoredResume.objects.create(job=job, file_path='', tailored_content=CV + '\nBroken')
+
+    def export(self, query):
+        def load(file_path, tailored_resume, template, sections):
+            if 'Broken' in tailored_resume:
+                raise ValueError('Failed to save tailored resume: boom')
+            return 'tailored_resumes/rendered/good.pdf', b'%PDF-1.4 fake'
+
+        with mock.patch('resumes.export.load_tailored_pdf', side_effect=load), \
+                mock.patch('resumes.export.record_rendered_pdf'):
+            response = APIClient().get(f'/api/resumes/tailored-resumes/export/{query}')
+            self.assertEqual(response.status_code, 200)
+            return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_failed_renders_are_listed_without_a_manifest(self):
+        archive = self.export(f'?ids={self.good.pk},{self.bad.pk}')
+        self.assertEqual(archive.namelist(), [f'google-swe-{self.good.pk}.pdf', 'failures.txt'])
+        self.assertEqual(
+            archive.read('failures.txt').decode(), f'{self.bad.pk}: Failed to save tailored resume: boom\n'
+        )
+
+    def test_manifest_records_the_error_too(self):
+        archive = self.export(f'?ids={self.good.pk},{self.bad.pk}&manifest=true')
+        self.assertEqual(archive.namelist()[-2:], ['failures.txt', 'manifest.jsonl'])
+        lines = {line['id']: line for line in map(json.loads, archive.read('manifest.jsonl').decode().splitlines())}
+        self.assertIsNone(lines[self.bad.pk]['pdf'])
+        self.assertIn('boom', lines[self.bad.pk]['error'])
+
+    def test_clean_export_has_no_failures_file(self):
+        self.assertEqual(self.export(f'?ids={self.good.pk}').namelist(), [f'google-swe-{self.good.pk}.pdf'])
+
+
+class ReplaceSectionTests(SimpleTestCase):
+
+    def test_replaces_body_and_keeps_the_resume_heading(self):
+        text = replace_section(CV, 'skills', 'Go, Kubernetes')
+        self.assertTrue(text.endswith('SKILLS\nGo, Kubernetes'))
+        self.assertNotIn('Python, Django, React', text)
+        # Everything else is carried over unchanged
+        self.assertTrue(text.startswith(CV.split('SKILLS')[0]))
+
+    def test_keeps_a_differently_worded_heading(self):
+        resume = "Jane\n\nProfessional Summary\nEngineer who has shipped payment systems since 2015.\n\nSkills\nPython"
+        text = replace_section(resume, 'summary', 'New summary.')
+        self.assertEqual(text, "Jane\n\nProfessional Summary\nNew summary.\n\nSkills\nPython")
+
+    def test_inserts_missing_section_in_layout_order(self):
+        resume = "Jane\n\nSUMMARY\nShort.\n\nEDUCATION\nBSc"
+        text = replace_section(resume, 'experience', 'Engineer | Acme | 2020\n- Built things')
+        self.assertEqual(
+            text, "Jane\n\nSUMMARY\nShort.\n\nEXPERIENCE\nEngineer | Acme | 2020\n- Built things\n\nEDUCATION\nBSc"
+        )
+
+    def test_appends_section_that_comes_last(self):
+        text = replace_section(CV, 'projects', '- Side project')
+        self.assertTrue(text.endswith('Python, Django, React\n\nPROJECTS\n- Side project'))
+
+    def test_merge_and_clean_sections(self):
+        generated = {
+            'summary': clean_section('summary', 'SUMMARY:\nBackend engineer.\n'),
+            'skills': 'Python',
+            'experience': 'Engineer | Acme | 2020\n- Built things',
+            'projects': '',
+        }
+        self.assertEqual(merge_sections(CV, generated), (
+            "John Doe\njohn.doe@email.com | (555) 123-4567\n\nSUMMARY\nBackend engineer.\n\nSKILLS\nPython\n\n"
+            "EXPERIENCE\nEngineer | Acme | 2020\n- Built things\n\nEDUCATION\nBSc Computer Science | UC Berkeley | 2018"
+        ))
+
+
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=f'{temp_dir}/media', CV_UPLOAD_TEMP_DIR=f'{temp_dir}/partial', CV_UPLOAD_CHUNK_SIZE=2048
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.client = APIClient()
+        # Long enough that the first chunk can carry the bytes sniffed for the file type
+        self.data = (CV * 10).encode('utf-8')
+        response = self.client.post('/api/resumes/cv-uploads/', {'filename': 'cv.txt', 'size': len(self.data)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.url = f"/api/resumes/cv-uploads/{response.data['id']}/"
+
+    def put_chunk(self, offset, chunk):
+        return self.client.generic(
+            'PUT', self.url + 'chunk/', chunk, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_upload_in_chunks_and_complete(self):
+        self.assertEqual(self.put_chunk(0, self.data[:1200]).data['offset'], 1200)
+        response = self.put_chunk(1200, self.data[1200:])
+        self.assertEqual(response['Upload-Offset'], str(len(self.data)))
+
+        with mock.patch('resumes.views.enqueue_extraction'):
+            response = self.client.post(self.url + 'complete/')
+        self.assertEqual(response.status_code, 201)
+        base_cv = BaseCV.objects.get(pk=response.data['id'])
+        with base_cv.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+
+    def test_wrong_offset_is_a_conflict(self):
+        self.put_chunk(0, self.data[:1200])
+        response = self.put_chunk(1000, self.data[1000:2000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 1200)
+        self.assertEqual(response['Upload-Offset'], '1200')
+
+    def test_chunk_past_declared_size_is_rejected(self):
+        self.put_chunk(0, self.data[:1200])
+        response = self.put_chunk(1200, self.data[1200:] + b'extra')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('declared file size', response.data['error'])
+        self.assertEqual(CVUploadSession.objects.get().offset, 1200)
+
+    def test_chunk_over_chunk_size_is_rejected(self):
+        response = self.put_chunk(0, self.data[:2049])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CVUploadSession.objects.get().offset, 0)
+
+    def test_complete_before_all_bytes_arrived(self):
+        self.put_chunk(0, self.data[:1200])
+        response = self.client.post(self.url + 'complete/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(f'1200 of {len(self.data)} bytes', response.data['error'])
+        self.assertFalse(BaseCV.objects.exists())
@@ -0,0 +1,273 @@
+"""Content-addressed storage of uploaded CV files
+
+Every uploaded file is hashed (SHA-256) by ChecksumUploadHandler while the
+request body streams in. Base CVs are stored under a path derived from that
+hash, so re-uploading the same file creates a new BaseCV row that shares the
+stored file and the text already extracted from it.
+
+Large files can also be sent in chunks through a CVUploadSession. Chunks are
+appended to a temporary file at the offset the client names, so an upload
+interrupted by a disconnect resumes from the last byte the server received.
+"""
+import hashlib
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.uploadhandler import FileUploadHandler
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from .extractors import SNIFF_BYTES, detect_format, require_extractor, sniff_format
+from .models import BaseCV, CVUploadSession, cv_upload_path
+
+# Size of the reads from the request stream when writing a chunk
+STREAM_READ_SIZE = 64 * 1024
+
+# Session id -> (running SHA-256, bytes hashed) for uploads whose chunks reached this process
+_hashers = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadOffsetMismatch(Exception):
+    """A chunk was sent for an offset other than the one the upload has reached"""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+# How long text extracted from a CV uploaded with a tailoring request is kept
+UPLOADED_TEXT_CACHE_TIMEOUT = 24 * 3600
+
+
+class ChecksumUploadHandler(FileUploadHandler):
+    """Hash each uploaded file as its chunks arrive, passing the data on unchanged
+
+    Must come before the handlers that store the file. Digests are left on
+    request.upload_checksums, keyed by form field name.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_checksums'):
+            self.request.upload_checksums = {}
+        self.request.upload_checksums[self.field_name] = self.sha256.hexdigest()
+        # Let the next handler build the file object
+        return None
+
+
+def upload_checksum(request, field_name, uploaded_file):
+    """SHA-256 of an uploaded file, computed during upload or, failing that, from its chunks"""
+    checksum = getattr(request, 'upload_checksums', {}).get(field_name)
+    if checksum:
+        return checksum
+    sha256 = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in uploaded_file.chunks():
+        sha256.update(chunk)
+    uploaded_file.seek(0)
+    return sha256.hexdigest()
+
+
+def create_base_cv(uploaded_file, checksum):
+    """Create a BaseCV, storing the file only if identical content is not stored already"""
+    base_cv = BaseCV(filename=os.path.basename(uploaded_file.name), content_checksum=checksum)
+    name = cv_upload_path(base_cv, uploaded_file.name)
+    if base_cv.file.storage.exists(name):
+        base_cv.file.name = name
+    else:
+        base_cv.file = uploaded_file
+
+    # Reuse the text of an earlier upload of the same file instead of extracting it again
+    extracted = BaseCV.objects.filter(
+        content_checksum=checksum, extraction_status=BaseCV.EXTRACTION_DONE
+    ).order_by('-extracted_at').first()
+    if extracted is not None:
+        base_cv.raw_text = extracted.raw_text
+        base_cv.extraction_status = BaseCV.EXTRACTION_DONE
+        base_cv.extracted_at = extracted.extracted_at
+
+    base_cv.save()
+    return base_cv
+
+
+def uploaded_text_cache_key(checksum):
+    return f'cv_text:{checksum}'
+
+
+def get_cached_uploaded_text(checksum):
+    """Text previously extracted from a file with this checksum, or None"""
+    text = BaseCV.objects.filter(
+        content_checksum=checksum, extraction_status=BaseCV.EXTRACTION_DONE
+    ).values_list('raw_text', flat=True).first()
+    if text is not None:
+        return text
+    return cache.get(uploaded_text_cache_key(checksum))
+
+
+def cache_uploaded_text(checksum, text):
+    """Remember text extracted from a file that was not stored as a BaseCV"""
+    cache.set(uploaded_text_cache_key(checksum), text, UPLOADED_TEXT_CACHE_TIMEOUT)
+
+
+def session_temp_path(session):
+    """Path of the partial file of an upload session"""
+    return os.path.join(settings.CV_UPLOAD_TEMP_DIR, f'{session.pk}.part')
+
+
+def _discard_session_file(session):
+    with _hashers_lock:
+        _hashers.pop(session.pk, None)
+    try:
+        os.remove(session_temp_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def delete_upload_session(session):
+    """Delete an upload session and its partial file"""
+    _discard_session_file(session)
+    session.delete()
+
+
+def prune_upload_sessions():
+    """Delete sessions, and their partial files, older than CV_UPLOAD_SESSION_TTL"""
+    cutoff = timezone.now() - timedelta(seconds=settings.CV_UPLOAD_SESSION_TTL)
+    for session in CVUploadSession.objects.filter(created_at__lt=cutoff):
+        delete_upload_session(session)
+
+
+def start_upload_session(filename, size):
+    """Create an upload session with an empty partial file"""
+    prune_upload_sessions()
+    session = CVUploadSession.objects.create(filename=os.path.basename(filename), size=size)
+    os.makedirs(settings.CV_UPLOAD_TEMP_DIR, exist_ok=True)
+    open(session_temp_path(session), 'wb').close()
+    with _hashers_lock:
+        _hashers[session.pk] = (hashlib.sha256(), 0)
+    return session
+
+
+def _read_stream(stream, length):
+    """Yield up to length bytes from a request stream, stopping early if the client disconnects"""
+    remaining = length
+    while remaining > 0:
+        try:
+            data = stream.read(min(STREAM_READ_SIZE, remaining))
+        except (UnreadablePostError, OSError):
+            return
+        if not data:
+            return
+        remaining -= len(data)
+        yield data
+
+
+def write_upload_chunk(session, offset, stream, length):
+    """Append length bytes from stream at offset and return the new offset
+
+    The first chunk must contain the file's leading bytes so its type is
+    checked before anything else is accepted. Whatever arrives before a
+    disconnect is kept, and the client resumes from the returned offset.
+    """
+    if session.is_complete:
+        raise ValueError("Upload is already complete")
+    if offset != session.offset:
+        raise UploadOffsetMismatch(f"Expected a chunk at offset {session.offset}, got {offset}", session.offset)
+    if length <= 0:
+        raise ValueError("Chunk is empty")
+    if length > settings.CV_UPLOAD_CHUNK_SIZE:
+        raise ValueError(f"Chunk size cannot exceed {settings.CV_UPLOAD_CHUNK_SIZE} bytes")
+    if offset + length > session.size:
+        raise ValueError(f"Chunk ends past the declared file size of {session.size} bytes")
+
+    chunks = _read_stream(stream, length)
+    head = b''
+    if offset == 0:
+        # Validate the magic bytes before writing anything
+        for data in chunks:
+            head += data
+            if len(head) >= min(SNIFF_BYTES, session.size):
+                break
+        if len(head) < min(SNIFF_BYTES, session.size):
+            raise ValueError(f"The first chunk must contain at least the first {SNIFF_BYTES} bytes of the file")
+        file_format = sniff_format(head, session.filename)
+        if file_format is None:
+            raise ValueError("File content is not a PDF, DOCX, DOC or UTF-8 text file")
+        require_extractor(file_format)
+        CVUploadSession.objects.filter(pk=session.pk).update(file_format=file_format)
+        session.file_format = file_format
+
+    with _hashers_lock:
+        hasher, hashed = _hashers.pop(session.pk, (None, None))
+    if hashed != offset:
+        # Earlier chunks went to another process; hash the whole file on completion instead
+        hasher = None
+
+    written = 0
+    with open(session_temp_path(session), 'r+b') as partial:
+        partial.seek(offset)
+        for data in _prepend(head, chunks):
+            partial.write(data)
+            if hasher is not None:
+                hasher.update(data)
+            written += len(data)
+        partial.truncate()
+
+    new_offset = offset + written
+    advanced = CVUploadSession.objects.filter(pk=session.pk, offset=offset).update(
+        offset=new_offset, updated_at=timezone.now()
+    )
+    if not advanced:
+        current = CVUploadSession.objects.values_list('offset', flat=True).get(pk=session.pk)
+        raise UploadOffsetMismatch("Another chunk was written at the same offset", current)
+    if hasher is not None:
+        with _hashers_lock:
+            _hashers[session.pk] = (hasher, new_offset)
+    session.offset = new_offset
+    return new_offset
+
+
+def _prepend(head, chunks):
+    if head:
+        yield head
+    yield from chunks
+
+
+def _session_checksum(session):
+    with _hashers_lock:
+        hasher, hashed = _hashers.pop(session.pk, (None, None))
+    if hasher is not None and hashed == session.size:
+        return hasher.hexdigest()
+    sha256 = hashlib.sha256()
+    with open(session_temp_path(session), 'rb') as partial:
+        for data in iter(lambda: partial.read(STREAM_READ_SIZE), b''):
+            sha256.update(data)
+    return sha256.hexdigest()
+
+
+def complete_upload_session(session):
+    """Turn a fully received upload into a BaseCV; completing twice returns the same BaseCV"""
+    if session.is_complete:
+        return session.base_cv
+    if session.offset != session.size:
+        raise ValueError(f"Upload is incomplete: {session.offset} of {session.size} bytes received")
+
+    checksum = _session_checksum(session)
+    with open(session_temp_path(session), 'rb') as partial:
+        # Structural checks that need the whole file, e.g. that a zip is a Word document
+        detect_format(partial, session.filename)
+        base_cv = create_base_cv(File(partial, name=session.filename), checksum)
+    session.base_cv = base_cv
+    session.save(update_fields=['base_cv', 'updated_at'])
+    _discard_session_file(session)
+    return base_cv
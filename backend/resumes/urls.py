@@ -1,12 +1,17 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import BaseCVViewSet, TailoredResumeViewSet
+from .views import BaseCVViewSet, CVUploadViewSet, TailoredResumeViewSet, TailoringTaskViewSet
 
 router = DefaultRouter()
 router.register(r'base-cv', BaseCVViewSet)
 router.register(r'tailored-resumes', TailoredResumeViewSet)
+router.register(r'tailor-tasks', TailoringTaskViewSet)
+router.register(r'cv-uploads', CVUploadViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('tailor-resume/', BaseCVViewSet.as_view({'post': 'tailor_resume'}), name='tailor-resume'),
+    # Pass each action's initkwargs so its renderer/parser overrides apply on these routes too
+    path('tailor-resume/stream/', BaseCVViewSet.as_view({'post': 'tailor_resume_stream'}, **BaseCVViewSet.tailor_resume_stream.kwargs), name='tailor-resume-stream'),
+    path('tailor-resume/batch/', BaseCVViewSet.as_view({'post': 'tailor_batch'}, **BaseCVViewSet.tailor_batch.kwargs), name='tailor-resume-batch'),
 ]
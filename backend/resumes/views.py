@@ -1,24 +1,70 @@
-from rest_framework import viewsets, status
+import json
+import os
+import time
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import FileResponse
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from rest_framework.renderers import JSONRenderer, BrowsableAPIRenderer
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.conf import settings
-import os
-import PyPDF2
-import io
-from openai import OpenAI
-from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, KeepTogether
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from .models import BaseCV, TailoredResume
-from .serializers import BaseCVSerializer, BaseCVUploadSerializer, TailorResumeSerializer, TailoredResumeSerializer as TailoredResumeModelSerializer
+from django.db.models import Avg, Count, Sum
+from django.urls import reverse
+from . import cache as tailoring_cache
+from .llm_client import connection_stats, usage_stats
+from .llm_guard import LLMUnavailable, stats as llm_guard_stats
+from .models import BaseCV, CVUploadSession, TailoredResume, TailoringTask
+from .serializers import BaseCVSerializer, BaseCVUploadSerializer, BatchTailorSerializer, CVUploadSessionSerializer, RegenerateSectionSerializer, ReviseTailoredResumeSerializer, TailorResumeSerializer, TailoredResumeSerializer as TailoredResumeModelSerializer, TailoringTaskSerializer
+from .sse import EventStreamRenderer, event_stream_response, format_event
+from .export import iter_export_zip
+from .extraction import get_base_cv_text, get_uploaded_cv_text
+from .tailoring import (
+    RevisionUnchanged, finalize_tailoring, get_cached_resume, record_rendered_pdf, run_batch_tailoring,
+    iter_generated_sections, regenerate_resume_section, revise_tailored_resume, run_tailoring, store_cached_resume,
+    stream_openai_api
+)
+from .pdf import get_rendered_pdf, load_tailored_pdf, pdf_layout, render_key
+from .pdf_render import DEFAULT_TEMPLATE, TEMPLATES, render_stats
+from .sections import merge_sections
+from .tasks import enqueue_extraction, enqueue_task
+from .uploads import (
+    UploadOffsetMismatch, complete_upload_session, delete_upload_session, upload_checksum, write_upload_chunk
+)
 from jobs.models import Job
-from django.conf import settings
+
+
+def llm_unavailable_response(error, message):
+    """503 telling the client when the LLM backend is worth retrying"""
+    return Response({
+        'error': f'{message}: {str(error)}',
+        'retry_after': error.retry_after
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': str(error.retry_after)})
+
+def tailored_pdf_url(tailored_resume_id, template=DEFAULT_TEMPLATE):
+    """URL that renders and serves a saved tailored resume's PDF, or None if it was not saved"""
+    if tailored_resume_id is None:
+        return None
+    url = reverse('tailoredresume-view', kwargs={'pk': tailored_resume_id})
+    if template != DEFAULT_TEMPLATE:
+        url += f'?template={template}'
+    return url
+
+def unknown_template_response(template):
+    """400 for a ?template= that is not one of TEMPLATES, or None when it is"""
+    if template in TEMPLATES:
+        return None
+    return Response({
+        'error': f"Unknown template '{template}'. Available: {', '.join(sorted(TEMPLATES))}"
+    }, status=status.HTTP_400_BAD_REQUEST)
+
+def set_layout_headers(response, layout):
+    """Report a PDF's page count and any one-page fit adjustments in response headers"""
+    response['X-PDF-Pages'] = str(layout['pages'])
+    if 'adjustments' in layout:
+        response['X-PDF-Fit'] = json.dumps(layout['adjustments']) if layout['adjustments'] else 'none'
 
 class BaseCVViewSet(viewsets.ModelViewSet):
     """ViewSet for managing base CV uploads"""
@@ -37,7 +83,11 @@ class BaseCVViewSet(viewsets.ModelViewSet):
         """Upload a new base CV file"""
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            base_cv = serializer.save()
+            checksum = upload_checksum(request, 'file', serializer.validated_data['file'])
+            base_cv = serializer.save(content_checksum=checksum)
+            # Extract the text once, off the request path, unless this file was seen before
+            if base_cv.extraction_status == BaseCV.EXTRACTION_PENDING:
+                enqueue_extraction(base_cv)
             response_serializer = BaseCVSerializer(base_cv)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -92,6 +142,16 @@ class BaseCVViewSet(viewsets.ModelViewSet):
             'message': f'Total CVs uploaded: {total_cvs}'
         })
     
+    @action(detail=False, methods=['get'])
+    def tailoring_cache(self, request):
+        """Get tailoring cache statistics"""
+        return Response(tailoring_cache.stats())
+    
+    @action(detail=False, methods=['get'])
+    def llm_stats(self, request):
+        """Get LLM connection pool, token usage and admission control statistics"""
+        return Response(dict(connection_stats(), usage=usage_stats(), admission=llm_guard_stats()))
+    
     @action(detail=True, methods=['get'])
     def extract_text(self, request, pk=None):
         """Extract plain text from the CV for user verification"""
@@ -107,21 +167,28 @@ class BaseCVViewSet(viewsets.ModelViewSet):
                     'is_corrected': True
                 })
             
-            # Otherwise, extract from the original file
-            file_path = base_cv.file.path
-            if not os.path.exists(file_path):
+            # Otherwise, return the text extracted at upload time
+            if base_cv.extraction_status in (BaseCV.EXTRACTION_PENDING, BaseCV.EXTRACTION_RUNNING):
+                if base_cv.extraction_status == BaseCV.EXTRACTION_PENDING:
+                    # Uploaded before background extraction existed, or never picked up
+                    enqueue_extraction(base_cv)
+                return Response({
+                    'filename': base_cv.filename,
+                    'extraction_status': base_cv.extraction_status,
+                    'message': 'Text extraction in progress',
+                    'is_corrected': False
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            if base_cv.extraction_status == BaseCV.EXTRACTION_FAILED:
                 return Response(
-                    {'error': 'File not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
+                    {'error': f'Failed to extract text: {base_cv.extraction_error}'}, 
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            # Extract text from the CV file
-            with open(file_path, 'rb') as file:
-                extracted_text = self._extract_text_from_cv(file)
-            
             return Response({
-                'text': extracted_text,
+                'text': base_cv.raw_text or '',
                 'filename': base_cv.filename,
+                'extraction_status': base_cv.extraction_status,
                 'message': 'Text extracted from original file',
                 'is_corrected': False
             })
@@ -180,477 +247,194 @@ class BaseCVViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Get CV text either from file or directly from text field
-            cv_file = serializer.validated_data.get('cv')
-            cv_text_input = serializer.validated_data.get('cv_text')
-            company = serializer.validated_data['company']
-            job_description = serializer.validated_data['job_description']
-            additional_feedback = serializer.validated_data.get('additional_feedback', '')
-            
-            # Extract text from CV based on input type
-            if cv_text_input:
-                cv_text = cv_text_input
-            else:
-                cv_text = self._extract_text_from_cv(cv_file)
-            
-            # Call OpenAI API
-            tailored_resume = self._call_openai_api(cv_text, company, job_description, additional_feedback)
-            
-            # Save tailored resume to file
-            tailored_resume_path = self._save_tailored_resume(tailored_resume, company)
-            
-            # Find the job by company name and save to database
-            try:
-                job = Job.objects.filter(company__name__icontains=company).first()
-                if job:
-                    tailored_resume_obj = TailoredResume.objects.create(
-                        job=job,
-                        file_path=tailored_resume_path,
-                        tailored_content=tailored_resume
-                    )
-            except Exception as e:
-                print(f"Warning: Could not save to database: {e}")
+            cv_text, company, job_description, additional_feedback = self._get_tailoring_input(serializer)
+            regenerate = serializer.validated_data.get('regenerate', False)
+            template = serializer.validated_data.get('template', DEFAULT_TEMPLATE)
+            
+            if serializer.validated_data.get('run_async'):
+                # Queue the expensive part and let the client poll the task
+                task = TailoringTask.objects.create(
+                    company=company,
+                    job_description=job_description,
+                    additional_feedback=additional_feedback or '',
+                    cv_text=cv_text,
+                    regenerate=regenerate
+                )
+                enqueue_task(task)
+                return Response({
+                    'task_id': str(task.id),
+                    'status': task.status,
+                    'status_url': reverse('tailoringtask-detail', kwargs={'pk': task.id}),
+                    'events_url': reverse('tailoringtask-events', kwargs={'pk': task.id}),
+                    'company': company,
+                    'message': 'Resume tailoring queued'
+                }, status=status.HTTP_202_ACCEPTED)
+            
+            result = run_tailoring(cv_text, company, job_description, additional_feedback, regenerate)
+            
+            if serializer.validated_data.get('response_format') == 'pdf':
+                # Send the rendered bytes directly; the file may still be being written in the background
+                pdf_path, pdf_bytes = get_rendered_pdf(result['tailored_resume'], result['sections'], template)
+                if result['tailored_resume_id'] is not None and template == DEFAULT_TEMPLATE:
+                    record_rendered_pdf(result['tailored_resume_id'], pdf_path, pdf_bytes)
+                response = HttpResponse(pdf_bytes, content_type='application/pdf')
+                response['Content-Disposition'] = 'inline; filename="tailored_resume.pdf"'
+                response['X-File-Path'] = result['file_path']
+                response['X-Tailored-Resume-Id'] = str(result['tailored_resume_id'] or '')
+                response['X-Cached'] = str(result['cached']).lower()
+                set_layout_headers(response, pdf_layout(pdf_path, pdf_bytes))
+                return response
             
             return Response({
-                'tailored_resume': tailored_resume,
-                'file_path': tailored_resume_path,
+                'tailored_resume': result['tailored_resume'],
+                'file_path': result['file_path'],
+                'tailored_resume_id': result['tailored_resume_id'],
+                'pdf_url': tailored_pdf_url(result['tailored_resume_id'], template),
                 'company': company,
+                'cached': result['cached'],
+                'coalesced': result['coalesced'],
+                'prompt': result['prompt'],
+                'usage': result['usage'],
                 'message': 'Resume tailored successfully'
             }, status=status.HTTP_200_OK)
             
+        except LLMUnavailable as e:
+            return llm_unavailable_response(e, 'Failed to tailor resume')
         except Exception as e:
             return Response({
                 'error': f'Failed to tailor resume: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _extract_text_from_cv(self, cv_file):
-        """Extract text from uploaded CV file"""
-        try:
-            # Reset file pointer to beginning
-            cv_file.seek(0)
-            
-            # Get file extension
-            file_extension = cv_file.name.split('.')[-1].lower()
-            
-            if file_extension == 'pdf':
-                # Extract text from PDF using PyPDF2
-                pdf_reader = PyPDF2.PdfReader(cv_file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip()
-            
-            elif file_extension == 'txt':
-                # Read text file directly
-                text = cv_file.read().decode('utf-8')
-                return text.strip()
-            
-            else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
-                
-        except Exception as e:
-            raise ValueError(f"Failed to extract text from CV: {str(e)}")
-    
-    def _call_openai_api(self, cv_text, company, job_description, additional_feedback=None):
-        """Call OpenAI API to tailor the resume"""
-        try:
-            # Initialize OpenAI client with explicit http_client to avoid proxy issues
-            import httpx
-            http_client = httpx.Client()
-            client = OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
-            
-            # System prompt for resume tailoring
-            system_prompt = """You are an expert resume writer. Create a concise, ATS-friendly, single-page resume tailored to the target role and company, based on the format of the candidate's CV, using keywords from the job description and the candidate's CV. Keep it within one page, prioritize relevant achievements with quantified impact, and use clean sections.
-
-Instructions:
-- Output ONLY the final resume text (no commentary).
-- Keep it to one page.
-- Use strong, quantified bullet points where possible.
-- Emphasize keywords from the job description.
-- Include sections like Summary, Skills, Experience, Education (and Projects if relevant).
-- Remove irrelevant details."""
-            
-            # User prompt with CV text and job description
-            user_prompt = f"""Target Company: {company}
-
-Job Description:
-{job_description}
-
-Candidate's Current CV:
-{cv_text}"""
-
-            # Add additional feedback if provided
-            if additional_feedback and additional_feedback.strip():
-                user_prompt += f"""
-
-Additional Feedback for this version:
-{additional_feedback.strip()}"""
-
-            user_prompt += "\n\nPlease create a tailored resume for this position."
-            
-            # Call OpenAI API using the new format
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            raise ValueError(f"OpenAI API call failed: {str(e)}")
-    
-    def _save_tailored_resume(self, tailored_resume, company):
-        """Save tailored resume to a professionally formatted PDF file"""
+    @action(detail=False, methods=['post'], renderer_classes=[EventStreamRenderer, JSONRenderer, BrowsableAPIRenderer])
+    def tailor_resume_stream(self, request):
+        """Tailor resume and stream the generated text as server-sent events"""
+        serializer = TailorResumeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
         try:
-            # Create tailored_resumes directory if it doesn't exist
-            tailored_resumes_dir = os.path.join(settings.MEDIA_ROOT, 'tailored_resumes')
-            os.makedirs(tailored_resumes_dir, exist_ok=True)
-            
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            safe_company = "".join(c for c in company if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_company = safe_company.replace(' ', '_')
-            filename = f"tailored_resume_{safe_company}_{timestamp}.pdf"
-            
-            # Create PDF file with margins
-            file_path = os.path.join(tailored_resumes_dir, filename)
-            doc = SimpleDocTemplate(
-                file_path, 
-                pagesize=letter,
-                rightMargin=0.75*inch,
-                leftMargin=0.75*inch,
-                topMargin=0.75*inch,
-                bottomMargin=0.75*inch
-            )
-            
-            # Create professional styles
-            name_style = ParagraphStyle(
-                'NameStyle',
-                fontSize=20,
-                textColor=colors.HexColor('#2E4057'),
-                spaceAfter=4,
-                alignment=TA_CENTER,
-                fontName='Helvetica-Bold'
-            )
-            
-            contact_style = ParagraphStyle(
-                'ContactStyle',
-                fontSize=10,
-                textColor=colors.HexColor('#666666'),
-                spaceAfter=20,
-                alignment=TA_CENTER,
-                fontName='Helvetica'
-            )
-            
-            section_header_style = ParagraphStyle(
-                'SectionHeaderStyle',
-                fontSize=14,
-                textColor=colors.HexColor('#2E4057'),
-                spaceAfter=8,
-                spaceBefore=16,
-                fontName='Helvetica-Bold',
-                borderWidth=0,
-                borderColor=colors.HexColor('#2E4057'),
-                underlineProportion=0.3,
-                underlineGap=2
-            )
-            
-            subsection_style = ParagraphStyle(
-                'SubsectionStyle',
-                fontSize=11,
-                textColor=colors.black,
-                spaceAfter=4,
-                spaceBefore=8,
-                fontName='Helvetica-Bold'
-            )
-            
-            body_style = ParagraphStyle(
-                'BodyStyle',
-                fontSize=10,
-                textColor=colors.black,
-                spaceAfter=6,
-                leading=14,
-                fontName='Helvetica',
-                alignment=TA_JUSTIFY
-            )
-            
-            bullet_style = ParagraphStyle(
-                'BulletStyle',
-                fontSize=10,
-                textColor=colors.black,
-                spaceAfter=4,
-                leading=14,
-                fontName='Helvetica',
-                leftIndent=20,
-                bulletIndent=10
-            )
-            
-            # Parse the tailored resume text into structured sections
-            story = []
-            lines = [line.strip() for line in tailored_resume.split('\n')]
-            
-            # Extract structured information
-            sections = self._parse_resume_sections(lines)
-            
-            # Build the PDF with professional formatting
-            
-            # Header - Name and Contact Info
-            if 'name' in sections:
-                story.append(Paragraph(sections['name'], name_style))
-            
-            if 'contact' in sections:
-                contact_info = ' | '.join(sections['contact'])
-                story.append(Paragraph(contact_info, contact_style))
-            
-            # Professional Summary
-            if 'summary' in sections:
-                story.append(Paragraph('<u>PROFESSIONAL SUMMARY</u>', section_header_style))
-                summary_text = ' '.join(sections['summary'])
-                story.append(Paragraph(summary_text, body_style))
-            
-            # Skills Section with organized layout
-            if 'skills' in sections:
-                story.append(Paragraph('<u>CORE COMPETENCIES</u>', section_header_style))
-                skills_text = ', '.join(sections['skills'])
-                story.append(Paragraph(skills_text, body_style))
-            
-            # Experience Section with proper formatting
-            if 'experience' in sections:
-                story.append(Paragraph('<u>PROFESSIONAL EXPERIENCE</u>', section_header_style))
-                for exp in sections['experience']:
-                    if 'title' in exp and 'company' in exp:
-                        title_company = f"<b>{exp['title']}</b> | {exp['company']}"
-                        if 'dates' in exp:
-                            title_company += f" | {exp['dates']}"
-                        story.append(Paragraph(title_company, subsection_style))
-                    
-                    if 'description' in exp:
-                        for bullet in exp['description']:
-                            story.append(Paragraph(f"• {bullet}", bullet_style))
-                    
-                    story.append(Spacer(1, 6))
-            
-            # Education Section
-            if 'education' in sections:
-                story.append(Paragraph('<u>EDUCATION</u>', section_header_style))
-                for edu in sections['education']:
-                    edu_text = f"<b>{edu.get('degree', '')}</b>"
-                    if 'school' in edu:
-                        edu_text += f" | {edu['school']}"
-                    if 'year' in edu:
-                        edu_text += f" | {edu['year']}"
-                    story.append(Paragraph(edu_text, body_style))
-            
-            # Projects Section
-            if 'projects' in sections:
-                story.append(Paragraph('<u>KEY PROJECTS</u>', section_header_style))
-                for project in sections['projects']:
-                    if isinstance(project, dict):
-                        if 'name' in project:
-                            story.append(Paragraph(f"<b>{project['name']}</b>", subsection_style))
-                        if 'description' in project:
-                            for desc in project['description']:
-                                story.append(Paragraph(f"• {desc}", bullet_style))
-                    else:
-                        story.append(Paragraph(f"• {project}", bullet_style))
-            
-            # Additional sections (Certifications, etc.)
-            for section_name, section_content in sections.items():
-                if section_name not in ['name', 'contact', 'summary', 'skills', 'experience', 'education', 'projects']:
-                    story.append(Paragraph(f'<u>{section_name.upper()}</u>', section_header_style))
-                    if isinstance(section_content, list):
-                        for item in section_content:
-                            story.append(Paragraph(f"• {item}", bullet_style))
-                    else:
-                        story.append(Paragraph(str(section_content), body_style))
-            
-            # Build PDF
-            doc.build(story)
-            
-            # Return relative path for API response
-            return os.path.join('tailored_resumes', filename)
-            
+            cv_text, company, job_description, additional_feedback = self._get_tailoring_input(serializer)
+            regenerate = serializer.validated_data.get('regenerate', False)
+            template = serializer.validated_data.get('template', DEFAULT_TEMPLATE)
         except Exception as e:
-            raise ValueError(f"Failed to save tailored resume: {str(e)}")
-    
-    def _parse_resume_sections(self, lines):
-        """Parse resume text into structured sections"""
-        sections = {}
-        current_section = None
-        current_content = []
-        
-        # Common section keywords
-        section_keywords = {
-            'summary': ['summary', 'profile', 'objective', 'overview'],
-            'experience': ['experience', 'work', 'employment', 'career'],
-            'education': ['education', 'academic', 'degree'],
-            'skills': ['skills', 'competencies', 'technologies', 'technical'],
-            'projects': ['projects', 'portfolio'],
-            'certifications': ['certifications', 'certificates', 'licenses']
-        }
-        
-        name_found = False
-        contact_info = []
-        
-        for i, line in enumerate(lines):
-            if not line:
-                continue
-            
-            # First non-empty line is likely the name
-            if not name_found and line and not any(keyword in line.lower() for keywords in section_keywords.values() for keyword in keywords):
-                sections['name'] = line
-                name_found = True
-                continue
-            
-            # Detect contact information (email, phone, address)
-            if not current_section and (
-                '@' in line or 
-                any(char.isdigit() for char in line) and ('(' in line or '-' in line) or
-                any(word in line.lower() for word in ['street', 'ave', 'rd', 'blvd', 'city', 'state'])
-            ):
-                contact_info.append(line)
-                continue
-            
-            # Detect section headers
-            is_section_header = False
-            for section, keywords in section_keywords.items():
-                if any(keyword in line.lower() for keyword in keywords) and (line.isupper() or line.startswith('**') or len(line.split()) <= 3):
-                    # Save previous section
-                    if current_section and current_content:
-                        sections[current_section] = self._process_section_content(current_section, current_content)
-                    
-                    current_section = section
-                    current_content = []
-                    is_section_header = True
-                    break
-            
-            if not is_section_header:
-                if current_section:
-                    current_content.append(line)
-                elif contact_info:
-                    # If we have contact info, this might be additional contact details
-                    if len(contact_info) < 3:  # Limit contact info lines
-                        contact_info.append(line)
-        
-        # Save the last section
-        if current_section and current_content:
-            sections[current_section] = self._process_section_content(current_section, current_content)
-        
-        # Add contact info if found
-        if contact_info:
-            sections['contact'] = contact_info
+            return Response({
+                'error': f'Failed to tailor resume: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-        return sections
-    
-    def _process_section_content(self, section_type, content):
-        """Process content based on section type"""
-        if section_type == 'experience':
-            return self._parse_experience_entries(content)
-        elif section_type == 'education':
-            return self._parse_education_entries(content)
-        elif section_type == 'projects':
-            return self._parse_project_entries(content)
-        elif section_type == 'skills':
-            # Join skills and split by common delimiters
-            skills_text = ' '.join(content)
-            skills = [skill.strip() for skill in skills_text.replace('•', ',').replace('-', ',').split(',') if skill.strip()]
-            return skills
-        else:
-            # For summary and other sections, return as list
-            return content
+        return event_stream_response(
+            self._tailoring_events(cv_text, company, job_description, additional_feedback, regenerate, template)
+        )
     
-    def _parse_experience_entries(self, content):
-        """Parse experience section into structured entries"""
-        entries = []
-        current_entry = {}
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def tailor_batch(self, request):
+        """Tailor one base CV for many jobs with bounded concurrency"""
+        serializer = BatchTailorSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        for line in content:
-            # Check if line contains job title and company (usually bold or structured)
-            if '|' in line or (' at ' in line and not line.startswith('•') and not line.startswith('-')):
-                # Save previous entry
-                if current_entry:
-                    entries.append(current_entry)
-                
-                # Parse new entry
-                current_entry = {}
-                parts = line.split('|') if '|' in line else line.split(' at ')
-                current_entry['title'] = parts[0].strip()
-                if len(parts) > 1:
-                    company_and_date = parts[1].strip()
-                    # Try to extract dates (look for years)
-                    import re
-                    date_pattern = r'\d{4}[-–]\d{4}|\d{4}[-–]Present|Present|\d{4}'
-                    dates = re.findall(date_pattern, company_and_date)
-                    if dates:
-                        current_entry['dates'] = dates[0]
-                        current_entry['company'] = re.sub(date_pattern, '', company_and_date).strip(' |-')
-                    else:
-                        current_entry['company'] = company_and_date
-            elif line.startswith('•') or line.startswith('-') or line.startswith('*'):
-                # Bullet point - add to current entry description
-                if 'description' not in current_entry:
-                    current_entry['description'] = []
-                bullet_text = line.lstrip('•-* ').strip()
-                if bullet_text:
-                    current_entry['description'].append(bullet_text)
-            elif current_entry and not line.strip().isupper():
-                # Continuation of description or additional info
-                if 'description' not in current_entry:
-                    current_entry['description'] = []
-                current_entry['description'].append(line)
+        base_cv = serializer.validated_data['base_cv']
+        job_ids = serializer.validated_data['job_ids']
+        jobs_by_id = Job.objects.select_related('company').in_bulk(job_ids)
+        jobs = [jobs_by_id[job_id] for job_id in job_ids if job_id in jobs_by_id]
+        failures = {job_id: 'Job not found' for job_id in job_ids if job_id not in jobs_by_id}
         
-        # Add last entry
-        if current_entry:
-            entries.append(current_entry)
+        try:
+            # Extract the CV text once for the whole batch
+            cv_text = get_base_cv_text(base_cv)
+            results, batch_failures = run_batch_tailoring(
+                cv_text,
+                jobs,
+                serializer.validated_data.get('additional_feedback', ''),
+                serializer.validated_data.get('regenerate', False)
+            ) if jobs else ([], {})
+        except Exception as e:
+            return Response({
+                'error': f'Failed to tailor resumes: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        failures.update(batch_failures)
         
-        return entries
-    
-    def _parse_education_entries(self, content):
-        """Parse education section"""
-        entries = []
-        for line in content:
-            if line and not line.startswith('•'):
-                entry = {}
-                # Try to parse degree | school | year format
-                if '|' in line:
-                    parts = [part.strip() for part in line.split('|')]
-                    entry['degree'] = parts[0]
-                    if len(parts) > 1:
-                        entry['school'] = parts[1]
-                    if len(parts) > 2:
-                        entry['year'] = parts[2]
-                else:
-                    entry['degree'] = line
-                entries.append(entry)
-        return entries
-    
-    def _parse_project_entries(self, content):
-        """Parse projects section"""
-        entries = []
-        current_project = {}
+        return Response({
+            'base_cv': base_cv.id,
+            'results': [
+                dict(TailoredResumeModelSerializer(tailored).data, cached=outcome['cached'], prompt=outcome['prompt'])
+                for tailored, outcome in results
+            ],
+            'failures': [
+                {'job_id': job_id, 'error': error} for job_id, error in failures.items()
+            ],
+            'message': f'Tailored {len(results)} of {len(job_ids)} resumes'
+        }, status=status.HTTP_200_OK)
+    
+    def _get_tailoring_input(self, serializer):
+        """Return (cv_text, company, job_description, additional_feedback) from a valid serializer"""
+        # Get CV text from a stored base CV, an uploaded file, or the text field
+        base_cv = serializer.validated_data.get('base_cv')
+        cv_file = serializer.validated_data.get('cv')
+        cv_text_input = serializer.validated_data.get('cv_text')
+        company = serializer.validated_data['company']
+        job_description = serializer.validated_data['job_description']
+        additional_feedback = serializer.validated_data.get('additional_feedback', '')
         
-        for line in content:
-            if not line.startswith('•') and not line.startswith('-') and line:
-                # New project
-                if current_project:
-                    entries.append(current_project)
-                current_project = {'name': line, 'description': []}
-            elif (line.startswith('•') or line.startswith('-')) and current_project:
-                # Project description
-                desc = line.lstrip('•- ').strip()
-                if desc:
-                    current_project['description'].append(desc)
+        # Extract text from CV based on input type
+        if cv_text_input:
+            cv_text = cv_text_input
+        elif base_cv:
+            cv_text = get_base_cv_text(base_cv)
+        else:
+            cv_text = get_uploaded_cv_text(cv_file, upload_checksum(self.request, 'cv', cv_file))
         
-        if current_project:
-            entries.append(current_project)
+        return cv_text, company, job_description, additional_feedback
+    
+    def _tailoring_events(self, cv_text, company, job_description, additional_feedback, regenerate=False,
+                          template=DEFAULT_TEMPLATE):
+        """Forward model output as 'token' events ('section' events in section mode), then render and save"""
+        report = {}
+        try:
+            tailored_resume = get_cached_resume(cv_text, company, job_description, additional_feedback, regenerate)
+            cached = tailored_resume is not None
+            if cached:
+                # Cache hit: send the whole text as a single token
+                yield format_event('token', {'text': tailored_resume})
+            elif settings.TAILORING_SECTION_MODE:
+                # Sections are generated concurrently; send each one as it completes
+                generated = {}
+                for section, text in iter_generated_sections(cv_text, company, job_description, additional_feedback, report):
+                    generated[section] = text
+                    yield format_event('section', {'section': section, 'text': text})
+                tailored_resume = merge_sections(cv_text, generated)
+                store_cached_resume(cv_text, company, job_description, additional_feedback, tailored_resume)
+            else:
+                chunks = []
+                for text in stream_openai_api(cv_text, company, job_description, additional_feedback, report):
+                    chunks.append(text)
+                    yield format_event('token', {'text': text})
+                tailored_resume = ''.join(chunks).strip()
+                store_cached_resume(cv_text, company, job_description, additional_feedback, tailored_resume)
+            
+            yield format_event('status', {'stage': 'rendering'})
+            result = finalize_tailoring(tailored_resume, company, report.get('usage'))
+        except LLMUnavailable as e:
+            yield format_event('error', {
+                'error': f'Failed to tailor resume: {str(e)}',
+                'retry_after': e.retry_after
+            })
+            return
+        except Exception as e:
+            yield format_event('error', {'error': f'Failed to tailor resume: {str(e)}'})
+            return
         
-        return entries
-
+        yield format_event('done', {
+            'tailored_resume': result['tailored_resume'],
+            'file_path': result['file_path'],
+            'tailored_resume_id': result['tailored_resume_id'],
+            'pdf_url': tailored_pdf_url(result['tailored_resume_id'], template),
+            'company': company,
+            'cached': cached,
+            'prompt': report.get('prompt'),
+            'usage': report.get('usage'),
+            'message': 'Resume tailored successfully'
+        })
+    
 class TailoredResumeViewSet(viewsets.ModelViewSet):
     """ViewSet for retrieving and managing tailored resumes"""
     queryset = TailoredResume.objects.all()
@@ -669,8 +453,9 @@ class TailoredResumeViewSet(viewsets.ModelViewSet):
         try:
             instance = self.get_object()
             
-            # Delete the physical file if it exists
-            if instance.file_path:
+            # Delete the physical file if it exists and no other resume shares it
+            shared = TailoredResume.objects.filter(file_path=instance.file_path).exclude(pk=instance.pk).exists()
+            if instance.file_path and not shared:
                 file_path = os.path.join(settings.MEDIA_ROOT, instance.file_path)
                 if os.path.exists(file_path):
                     os.remove(file_path)
@@ -690,28 +475,245 @@ class TailoredResumeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def render_stats(self, request):
+        """Get PDF render pool queue depth and render counts, and the size of the rendered PDFs"""
+        sizes = TailoredResume.objects.filter(pdf_size__isnull=False).aggregate(
+            rendered=Count('id'), total_bytes=Sum('pdf_size'), average_bytes=Avg('pdf_size')
+        )
+        sizes['total_bytes'] = sizes['total_bytes'] or 0
+        sizes['average_bytes'] = round(sizes['average_bytes'] or 0)
+        return Response(dict(render_stats(), configured_workers=settings.PDF_RENDER_WORKERS, pdf_sizes=sizes))
+    
+    @action(detail=True, methods=['post'], parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def revise(self, request, pk=None):
+        """Apply feedback to this tailored resume and save the result as a new revision"""
+        serializer = ReviseTailoredResumeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        parent = self.get_object()
+        try:
+            revision, outcome = revise_tailored_resume(parent, serializer.validated_data['feedback'])
+        except LLMUnavailable as e:
+            return llm_unavailable_response(e, 'Failed to revise resume')
+        except RevisionUnchanged as e:
+            return Response({'error': f'Failed to revise resume: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({
+                'error': f'Failed to revise resume: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response(dict(
+            self.get_serializer(revision).data,
+            edits_applied=outcome['edits_applied'],
+            edits_skipped=outcome['edits_skipped'],
+            usage=outcome['usage'],
+            message='Resume revised successfully'
+        ), status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'], parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def regenerate_section(self, request, pk=None):
+        """Regenerate one section of this tailored resume and save the result as a new revision"""
+        serializer = RegenerateSectionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        tailored = self.get_object()
+        base_cv = serializer.validated_data.get('base_cv')
+        try:
+            cv_text = get_base_cv_text(base_cv) if base_cv else None
+            revision, report = regenerate_resume_section(
+                tailored,
+                serializer.validated_data['section'],
+                cv_text,
+                serializer.validated_data.get('additional_feedback', '')
+            )
+        except LLMUnavailable as e:
+            return llm_unavailable_response(e, 'Failed to regenerate section')
+        except Exception as e:
+            return Response({
+                'error': f'Failed to regenerate section: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response(dict(
+            self.get_serializer(revision).data,
+            section=serializer.validated_data['section'],
+            usage=report.get('usage'),
+            message='Section regenerated successfully'
+        ), status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['get'])
+    def templates(self, request):
+        """List the PDF templates view/ and download/ accept as ?template="""
+        return Response({
+            'default': DEFAULT_TEMPLATE,
+            'templates': [
+                {'name': name, 'description': builder.__doc__}
+                for name, builder in sorted(TEMPLATES.items())
+            ]
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream a ZIP of the PDFs of the resumes picked by ?job_id= and/or ?ids=1,2,3
+
+        ?template= picks the look and ?manifest=true adds a manifest.jsonl
+        with each resume's tailored_content. Resumes that could not be
+        rendered are listed in a failures.txt.
+        """
+        template = request.query_params.get('template', DEFAULT_TEMPLATE)
+        error_response = unknown_template_response(template)
+        if error_response is not None:
+            return error_response
+        
+        queryset = self.get_queryset()
+        ids = request.query_params.get('ids')
+        if ids:
+            try:
+                queryset = queryset.filter(pk__in=[int(value) for value in ids.split(',') if value.strip()])
+            except ValueError:
+                return Response({'error': 'ids must be a comma-separated list of tailored resume ids'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        elif not request.query_params.get('job_id'):
+            return Response({'error': 'Pass job_id or ids to choose the resumes to export'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        manifest = request.query_params.get('manifest', '').lower() in ('1', 'true', 'yes')
+        
+        response = StreamingHttpResponse(iter_export_zip(queryset, template, manifest), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="tailored_resumes.zip"'
+        # Stop nginx and similar proxies from buffering the archive
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
     @action(detail=True, methods=['get'])
     def view(self, request, pk=None):
         """Serve the tailored resume file for viewing"""
+        response = self._pdf_response(request, self.get_object(), 'inline')
+        response['X-Frame-Options'] = 'SAMEORIGIN'
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Serve the tailored resume file as an attachment"""
+        return self._pdf_response(request, self.get_object(), 'attachment')
+    
+    def _pdf_response(self, request, tailored_resume, disposition):
+        """Serve the PDF in the ?template= look, rendering it on first use, with ETag and Last-Modified"""
+        template = request.query_params.get('template', DEFAULT_TEMPLATE)
+        error_response = unknown_template_response(template)
+        if error_response is not None:
+            return error_response
+        
+        # The render key changes whenever the content does (e.g. after a PUT/PATCH), so it is a strong validator
+        etag = f'"{render_key(tailored_resume.tailored_content, template, tailored_resume.structured_content)}"'
+        last_modified = int(tailored_resume.updated_at.timestamp())
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+        
         try:
-            tailored_resume = self.get_object()
-            file_path = os.path.join(settings.MEDIA_ROOT, tailored_resume.file_path)
-            
-            if os.path.exists(file_path):
-                response = FileResponse(
-                    open(file_path, 'rb'),
-                    content_type='application/pdf'
-                )
-                response['Content-Disposition'] = 'inline; filename="tailored_resume.pdf"'
-                response['X-Frame-Options'] = 'SAMEORIGIN'
-                return response
-            else:
-                return Response(
-                    {'error': 'File not found'}, 
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        except TailoredResume.DoesNotExist:
+            pdf_path, pdf_bytes = load_tailored_pdf(
+                tailored_resume.file_path, tailored_resume.tailored_content, template, tailored_resume.structured_content
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if template == DEFAULT_TEMPLATE and (tailored_resume.file_path, tailored_resume.pdf_size) != (pdf_path, len(pdf_bytes)):
+            record_rendered_pdf(tailored_resume.pk, pdf_path, pdf_bytes)
+        
+        response = HttpResponse(pdf_bytes, content_type='application/pdf')
+        response['Content-Disposition'] = f'{disposition}; filename="tailored_resume.pdf"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        set_layout_headers(response, pdf_layout(pdf_path, pdf_bytes))
+        return response
+
+
+class TailoringTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for polling the status of async tailoring tasks"""
+    queryset = TailoringTask.objects.all()
+    serializer_class = TailoringTaskSerializer
+    
+    # How often the event stream re-reads the task and how long it stays open
+    EVENTS_POLL_INTERVAL = 0.5
+    EVENTS_TIMEOUT = 300
+    
+    @action(detail=True, methods=['get'], renderer_classes=[EventStreamRenderer, JSONRenderer, BrowsableAPIRenderer])
+    def events(self, request, pk=None):
+        """Stream task status changes as server-sent events until it finishes"""
+        task = self.get_object()
+        return event_stream_response(self._status_events(task.pk))
+    
+    def _status_events(self, task_id):
+        """Yield a status event whenever the task changes state"""
+        last_status = None
+        deadline = time.monotonic() + self.EVENTS_TIMEOUT
+        while time.monotonic() < deadline:
+            task = TailoringTask.objects.filter(pk=task_id).first()
+            if task is None:
+                yield format_event('error', {'error': 'Task not found'})
+                return
+            if task.status != last_status:
+                last_status = task.status
+                yield format_event('status', TailoringTaskSerializer(task).data)
+            if task.is_finished:
+                return
+            time.sleep(self.EVENTS_POLL_INTERVAL)
+        yield format_event('timeout', {'status': last_status})
+
+
+class CVUploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    """Chunked, resumable CV uploads
+    
+    POST the file name and size to start, PUT raw chunks to chunk/ with an
+    Upload-Offset header, GET the session to find where to resume, then POST
+    complete/ to turn it into a BaseCV.
+    """
+    queryset = CVUploadSession.objects.all()
+    serializer_class = CVUploadSessionSerializer
+    
+    def perform_destroy(self, instance):
+        delete_upload_session(instance)
+    
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, pk=None):
+        """Append the raw request body at the offset given in the Upload-Offset header"""
+        session = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
             return Response(
-                {'error': 'Tailored resume not found'}, 
-                status=status.HTTP_404_NOT_FOUND
+                {'error': 'Upload-Offset and Content-Length headers are required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # Read the body straight from the request stream; request.data would buffer it
+            new_offset = write_upload_chunk(session, offset, request.stream, length)
+        except UploadOffsetMismatch as e:
+            return Response(
+                {'error': str(e), 'offset': e.offset}, 
+                status=status.HTTP_409_CONFLICT, headers={'Upload-Offset': str(e.offset)}
             )
+        except ValueError as e:
+            return Response({'error': f'Failed to store chunk: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            {'offset': new_offset, 'size': session.size, 'file_format': session.file_format}, 
+            headers={'Upload-Offset': str(new_offset)}
+        )
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Create the BaseCV once every byte has been received"""
+        session = self.get_object()
+        try:
+            base_cv = complete_upload_session(session)
+        except ValueError as e:
+            return Response({'error': f'Failed to complete upload: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if base_cv.extraction_status == BaseCV.EXTRACTION_PENDING:
+            enqueue_extraction(base_cv)
+        return Response(BaseCVSerializer(base_cv).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,156 @@
+"""Worker process pools shared by the PDF modules, one per purpose
+
+pdf_text parses untrusted uploads and pdf_render lays out resumes in pools
+of 'spawn'ed processes with a capped address space. Each purpose (e.g.
+'pdf_text') has its own pool, replaced when its configuration changes. A
+worker that overruns its timeout cannot be interrupted, so its pool is
+retired rather than killed outright: new tasks go to a fresh pool while the
+old one finishes the tasks other callers are still waiting for, and is then
+terminated together with the stuck worker. Like the modules using it, this
+imports nothing from Django.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; workers then run without a memory cap
+    resource = None
+
+# Longest a retired pool is kept running for tasks whose callers set no timeout
+RETIRE_GRACE_SECONDS = 300
+
+# Purpose -> current _Pool, and pools retired but not yet terminated
+_pools = {}
+_retired = set()
+_lock = threading.Lock()
+
+
+def limit_worker_memory(memory_limit_mb):
+    """Cap the address space of a worker process so a hostile PDF cannot exhaust memory"""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class _Pool:
+    """A process pool and the number of its tasks that a caller is still waiting for"""
+
+    def __init__(self, purpose, key):
+        _, workers, memory_limit_mb, max_tasks = key
+        self.purpose = purpose
+        self.key = key
+        self.pool = multiprocessing.get_context('spawn').Pool(
+            processes=workers,
+            initializer=limit_worker_memory,
+            initargs=(memory_limit_mb,),
+            maxtasksperchild=max_tasks
+        )
+        self.waiting = 0
+        self.changed = threading.Condition()
+
+    def reap(self):
+        """Terminate the pool once no caller waits on it (or after RETIRE_GRACE_SECONDS)"""
+        deadline = time.monotonic() + RETIRE_GRACE_SECONDS
+        with self.changed:
+            while self.waiting > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.changed.wait(remaining)
+        self.pool.terminate()
+        with _lock:
+            _retired.discard(self)
+
+
+class Task:
+    """A function call sent to a worker pool by submit()"""
+
+    def __init__(self, owner):
+        self._owner = owner
+        self._settled = False
+        self._result = None
+
+    def _settle(self, _=None):
+        with self._owner.changed:
+            if not self._settled:
+                self._settled = True
+                self._owner.waiting -= 1
+                self._owner.changed.notify_all()
+
+    def get(self, timeout=None):
+        """Return the call's result, raising what it raised
+
+        After timeout seconds the worker is presumed stuck: its pool is
+        retired and multiprocessing.TimeoutError is raised.
+        """
+        try:
+            return self._result.get(timeout=timeout)
+        except multiprocessing.TimeoutError:
+            self.abandon()
+            _retire(self._owner)
+            raise
+
+    def abandon(self):
+        """Stop waiting for the call, so a retired pool is not kept running for it"""
+        self._settle()
+
+
+def _retire(owner):
+    with _lock:
+        if _pools.get(owner.purpose) is owner:
+            del _pools[owner.purpose]
+        if owner in _retired or owner.key[0] != os.getpid():
+            return
+        _retired.add(owner)
+    owner.pool.close()
+    threading.Thread(target=owner.reap, name=f'{owner.purpose}-reaper', daemon=True).start()
+
+
+def submit(purpose, func, args, workers, memory_limit_mb=None, max_tasks=None):
+    """Run func(*args) in the pool for purpose, (re)creating it if the configuration changed; returns a Task
+
+    max_tasks recycles each worker process after that many calls.
+    """
+    key = (os.getpid(), workers, memory_limit_mb, max_tasks)
+    with _lock:
+        owner = _pools.get(purpose)
+        if owner is None or owner.key != key:
+            previous = owner
+            owner = _pools[purpose] = _Pool(purpose, key)
+        else:
+            previous = None
+        task = Task(owner)
+        with owner.changed:
+            owner.waiting += 1
+        task._result = owner.pool.apply_async(func, args, callback=task._settle, error_callback=task._settle)
+    if previous is not None:
+        # Tasks already sent to the old configuration still complete
+        _retire(previous)
+    return task
+
+
+def pool_size(purpose):
+    """Number of worker processes in this process's pool for purpose (0 if it has none)"""
+    with _lock:
+        owner = _pools.get(purpose)
+        return owner.key[1] if owner is not None and owner.key[0] == os.getpid() else 0
+
+
+def terminate_pool(purpose=None):
+    """Kill the worker processes of one purpose, or of all of them, without waiting (used at exit)"""
+    with _lock:
+        owners = [owner for owner in (*_pools.values(), *_retired) if purpose in (None, owner.purpose)]
+        for owner in owners:
+            if _pools.get(owner.purpose) is owner:
+                del _pools[owner.purpose]
+            _retired.discard(owner)
+    for owner in owners:
+        if owner.key[0] == os.getpid():
+            owner.pool.terminate()
+
+
+atexit.register(terminate_pool)
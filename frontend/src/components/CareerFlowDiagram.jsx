@@ -322,6 +322,7 @@ export default function CareerFlowDiagram() {
         version: versionNumber,
         backendData: {
           file_path: resume.file_path,
+          pdf_url: resume.pdf_url,
           tailored_resume: resume.tailored_content,
           company: resume.company_name,
           created_at: resume.created_at
@@ -692,6 +693,7 @@ export default function CareerFlowDiagram() {
           id: payload.id,
           job: parentRoleNodeId.replace('job_', ''),
           file_path: payload.file_path,
+          pdf_url: payload.pdf_url,
           tailored_content: payload.tailored_resume,
           created_at: payload.created_at
         }]
@@ -179,6 +179,7 @@ export default function ControlPanel({
         addTailoredResumeNode(selectedNode, {
           tailored_resume: result.tailored_resume,
           file_path: normalizedPath,
+          pdf_url: result.pdf_url,
           company: result.company,
           created_at: Date.now()
         });
@@ -665,7 +666,7 @@ export default function ControlPanel({
                   onClick={() => {
                     const node = nodes.find(n => n.id === selectedNode);
                     if (node && node.backendData && node.backendData.file_path) {
-                      const resumeUrl = `http://localhost:8000/media/${node.backendData.file_path}`;
+                      const resumeUrl = apiService.tailoredResumeUrl(node.backendData);
                       setResumeUrl(resumeUrl);
                       setShowResumePopup(true);
                     }
@@ -680,7 +681,7 @@ export default function ControlPanel({
                     const node = nodes.find(n => n.id === selectedNode);
                     if (node && node.backendData && node.backendData.file_path) {
                       const link = document.createElement('a');
-                      link.href = `http://localhost:8000/media/${node.backendData.file_path}`;
+                      link.href = apiService.tailoredResumeUrl(node.backendData);
                       link.target = '_blank';
                       link.click();
                     }
@@ -695,7 +696,7 @@ export default function ControlPanel({
                     const node = nodes.find(n => n.id === selectedNode);
                     if (node && node.backendData && node.backendData.file_path) {
                       try {
-                        const response = await fetch(`http://localhost:8000/media/${node.backendData.file_path}`);
+                        const response = await fetch(apiService.tailoredResumeUrl(node.backendData));
                         const blob = await response.blob();
                         const url = window.URL.createObjectURL(blob);
                         const link = document.createElement('a');
@@ -792,6 +793,7 @@ export default function ControlPanel({
                         addTailoredResumeNode(roleNode.id, {
                           tailored_resume: result.tailored_resume,
                           file_path: normalizedPath,
+                          pdf_url: result.pdf_url,
                           company: result.company,
                           created_at: Date.now()
                         });
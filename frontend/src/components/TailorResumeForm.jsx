@@ -18,6 +18,7 @@ import { useForm } from '@mantine/form';
 import { notifications } from '@mantine/notifications';
 import { FaUpload, FaExclamationTriangle, FaCheck, FaDownload, FaEye } from 'react-icons/fa';
 import axios from 'axios';
+import apiService from '../services/api';
 
 const TailorResumeForm = () => {
   const [loading, setLoading] = useState(false);
@@ -83,7 +84,7 @@ const TailorResumeForm = () => {
 
   const downloadTailoredResume = () => {
     if (result?.file_path) {
-      const downloadUrl = `http://localhost:8000/media/${result.file_path}`;
+      const downloadUrl = apiService.tailoredResumeUrl(result);
       window.open(downloadUrl, '_blank');
       notifications.show({
         title: 'Download Started',
@@ -189,7 +190,7 @@ const TailorResumeForm = () => {
                   variant="outline"
                   onClick={() => {
                     if (result?.file_path) {
-                      const previewUrl = `http://localhost:8000/media/${result.file_path}`;
+                      const previewUrl = apiService.tailoredResumeUrl(result);
                       window.open(previewUrl, '_blank');
                     }
                   }}
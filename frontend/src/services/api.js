@@ -227,6 +227,14 @@ class ApiService {
       method: 'DELETE',
     });
   }
+
+  // Saved resumes are rendered on first view, so prefer pdf_url over the media file path
+  tailoredResumeUrl({ pdf_url, file_path }) {
+    if (pdf_url) {
+      return `${this.baseURL.replace(/\/api$/, '')}${pdf_url}`;
+    }
+    return `${this.baseURL.replace(/\/api$/, '')}/media/${file_path}`;
+  }
 }
 
 // Create and export a singleton instance